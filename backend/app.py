@@ -1,16 +1,44 @@
-from flask import Flask, request, jsonify, url_for
+from flask import Flask, Response, request, jsonify, stream_with_context, url_for
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
 import os
 import json
 import base64
-from datetime import datetime
-from google import genai
-from google.genai import types
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import TimeoutError as FutureTimeout, wait
+from database import DB_CREATE_TABLES, configure_database, create_missing_tables, register_pragmas, register_tracing
+from auth_tokens import load_secret_key, issue_token, verify_token
+from password_hashing import HashPoolBusy, hash_password, verify_password, needs_rehash, has_capacity
+import metrics
+import tracing
+import llm
+import llm_scheduler
+import model_routing
+import json_repair
+import cancellation
+import background
+from interview_turns import TURN_PROMPT, SCORE_FIELDS, turn_hash, log_turns, build_turn_prompt, parse_turn_result, aggregate_turns
+from conversation_compaction import compact_conversation_cached
+from resume_text import get_resume_text
+from skills import canonical_skill, skill_fingerprint
+import job_catalog
+from resume_index import ResumeIndex, rank
+from text_features import term_counts
+import resume_scoring
+import score_tables
+import cache_versions
+import cache_files
+import near_duplicates
+import dashboard_sections
+from question_bank import (
+    QUESTION_BANK_COVERAGE, fingerprint_topics, question_hash, coverage,
+    build_generate_prompt, parse_generated, pick_questions, format_questions,
+)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -18,9 +46,11 @@ app = Flask(__name__)
 # Enable CORS for all routes and all origins
 CORS(app, supports_credentials=True)
 
-app.config['SECRET_KEY'] = os.urandom(24)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///auth.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Stable secret key shared by all workers, used for sessions and auth tokens
+app.config['SECRET_KEY'] = load_secret_key(app.instance_path)
+
+# Database configuration (URL, pool settings, SQLite pragmas)
+configure_database(app)
 
 # File upload configuration
 UPLOAD_FOLDER = 'uploads'
@@ -41,6 +71,10 @@ os.environ["GEMINI_API_KEY"] = GEMINI_API_KEY
 # Initialize SQLAlchemy
 db = SQLAlchemy(app)
 
+with app.app_context():
+    register_pragmas(db.engine)
+    register_tracing(db.engine, db.session)
+
 # Initialize Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -61,10 +95,19 @@ class User(UserMixin, db.Model):
     interview_responses = db.relationship('InterviewResponse', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        # Hashed in the dedicated hashing pool, not on the request thread
+        self.password_hash = hash_password(password)
         
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def rehash_password_if_needed(self, password):
+        # Upgrade hashes made with old KDF parameters, but only when the
+        # hashing pool has room so login bursts aren't slowed down
+        if needs_rehash(self.password_hash) and has_capacity():
+            self.set_password(password)
+            return True
+        return False
     
     def to_dict(self):
         return {
@@ -77,6 +120,10 @@ class User(UserMixin, db.Model):
 # Resume File model
 class ResumeFile(db.Model):
     __tablename__ = 'resume_file'  # Explicitly define table name
+    __table_args__ = (
+        # Serves the per-user "newest first" listing and keyset pagination
+        db.Index('ix_resume_file_user_upload', 'user_id', 'upload_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
@@ -130,6 +177,178 @@ class InterviewResponse(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+# Interview Turn model, one answered question posted during a mock interview
+class InterviewTurn(db.Model):
+    __tablename__ = 'interview_turn'
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'turn_index', name='uq_interview_turn_session_index'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    session_id = db.Column(db.String(64), nullable=False, index=True)
+    turn_index = db.Column(db.Integer, nullable=False)
+    question = db.Column(db.Text, nullable=False)
+    answer = db.Column(db.Text, nullable=False)
+    turn_hash = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'session_id': self.session_id,
+            'turn_index': self.turn_index,
+            'turn_hash': self.turn_hash,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+# Cached evaluation of one question/answer pair, shared across sessions
+class InterviewTurnEvaluation(db.Model):
+    __tablename__ = 'interview_turn_evaluation'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    turn_hash = db.Column(db.String(64), unique=True, nullable=False)
+    result = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Question Bank model, interview questions shared by resumes with the same skills
+class QuestionBankEntry(db.Model):
+    __tablename__ = 'question_bank_entry'
+    __table_args__ = (
+        db.UniqueConstraint('topic', 'question_hash', name='uq_question_bank_topic_question'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # A skill ("react") or a role bucket ("role:frontend developer")
+    topic = db.Column(db.String(100), nullable=False, index=True)
+    question = db.Column(db.Text, nullable=False)
+    question_hash = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Term counts of a resume's text, the source of the recruiter search index
+class ResumeTerms(db.Model):
+    __tablename__ = 'resume_terms'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_file_id = db.Column(db.Integer, db.ForeignKey('resume_file.id'), unique=True, nullable=False)
+    terms = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Ready-made interview question set, waiting to be served for a resume
+class InterviewQuestionSet(db.Model):
+    __tablename__ = 'interview_question_set'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    resume_file_id = db.Column(db.Integer, db.ForeignKey('resume_file.id'), nullable=False, index=True)
+    analysis = db.Column(db.Text, nullable=False)
+    source = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# MinHash signature of a resume's text, for finding near-duplicate uploads
+class ResumeSignature(db.Model):
+    __tablename__ = 'resume_signature'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_file_id = db.Column(db.Integer, db.ForeignKey('resume_file.id'), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# LSH bucket of a resume signature; resumes sharing a bucket are candidates
+class ResumeSignatureBand(db.Model):
+    __tablename__ = 'resume_signature_band'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_file_id = db.Column(db.Integer, db.ForeignKey('resume_file.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    bucket = db.Column(db.String(40), nullable=False, index=True)
+
+# Cached part of a dashboard analysis, keyed by the resume sections it was built from
+class DashboardPart(db.Model):
+    __tablename__ = 'dashboard_part'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'part', 'input_hash', name='uq_dashboard_part_input'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    part = db.Column(db.String(30), nullable=False)
+    input_hash = db.Column(db.String(64), nullable=False, index=True)
+    result = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Estimated model tokens used by a user per UTC day, for llm_scheduler quotas
+class LlmUsage(db.Model):
+    __tablename__ = 'llm_usage'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_llm_usage_user_day'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    tokens = db.Column(db.Integer, nullable=False, default=0)
+
+# One score of an analysis result, for analytics and score history
+class ResumeScore(db.Model):
+    __tablename__ = 'resume_score'
+    __table_args__ = (
+        db.UniqueConstraint('source', 'source_ref', 'category', name='uq_resume_score_source_category'),
+        db.Index('ix_resume_score_category_created', 'category', 'created_at'),
+        db.Index('ix_resume_score_user_created', 'user_id', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    resume_file_id = db.Column(db.Integer, db.ForeignKey('resume_file.id'), nullable=True)
+    # 'analysis', 'dashboard' or 'interview', and what within it: the resume
+    # id, or the interview response / session
+    source = db.Column(db.String(20), nullable=False)
+    source_ref = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(40), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    issues = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'resume_file_id': self.resume_file_id,
+            'source': self.source,
+            'category': self.category,
+            'score': self.score,
+            'issues': self.issues,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+# Prompt, model and schema version a cached result file was made with
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_version'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'ref', name='uq_cache_version_kind_ref'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # 'dashboard' (ref is the resume id) or 'interview' (the interview response id)
+    kind = db.Column(db.String(30), nullable=False)
+    ref = db.Column(db.String(100), nullable=False)
+    version = db.Column(db.String(16), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Last failure of a background artifact job, so polls report it instead of
+# starting the job again and again
+class ArtifactJobFailure(db.Model):
+    __tablename__ = 'artifact_job_failure'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Job handle, "<kind>:<resume id>"
+    job = db.Column(db.String(64), unique=True, nullable=False)
+    error = db.Column(db.Text, nullable=False)
+    # Failures in a row, for the backoff
+    failures = db.Column(db.Integer, nullable=False, default=1)
+    failed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -145,6 +364,135 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def get_bearer_token():
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[len('Bearer '):].strip()
+    return None
+
+def authenticate(data):
+    """Resolve the user ID for the current request.
+
+    A valid bearer token is trusted as-is, so no database lookup is needed.
+    Without a token, falls back to looking the user up by the email in data.
+    Returns (user_id, None) on success or (None, error_response).
+    """
+    token = get_bearer_token()
+    
+    if token:
+        user_id = verify_token(app.config['SECRET_KEY'], token)
+        if user_id is None:
+            return None, (jsonify({'error': 'Invalid or expired token'}), 401)
+        llm_scheduler.set_user(user_id)
+        return user_id, None
+    
+    if not data or not data.get('email'):
+        return None, (jsonify({'error': 'Email is required'}), 400)
+    
+    # Find user by email
+    user_id = db.session.query(User.id).filter_by(email=data.get('email')).scalar()
+    
+    if not user_id:
+        return None, (jsonify({'error': 'User not found'}), 404)
+    
+    llm_scheduler.set_user(user_id)
+    return user_id, None
+
+def server_busy():
+    response = jsonify({'error': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def seconds_until_utc_midnight():
+    now = datetime.utcnow()
+    return int((datetime(now.year, now.month, now.day) - now).total_seconds()) + 86400
+
+def model_unavailable(e):
+    """Response for a model call the scheduler refused or timed out"""
+    db.session.rollback()
+    if isinstance(e, llm_scheduler.QuotaExceeded):
+        response = jsonify({'error': 'Daily model usage limit reached, please try again tomorrow'})
+        response.headers['Retry-After'] = str(seconds_until_utc_midnight())
+        return response, 429
+    if isinstance(e, llm_scheduler.GenerationTimeout):
+        return jsonify({'error': 'The model took too long to answer, please try again'}), 504
+    if isinstance(e, llm_scheduler.Cancelled):
+        # Nobody is listening; 499 marks these in the access logs
+        return jsonify({'error': 'Request cancelled'}), 499
+    return server_busy()
+
+def check_llm_quota(user_id):
+    """429 response if the user has no model tokens left today, else None"""
+    try:
+        llm_scheduler.check_quota(user_id)
+    except llm_scheduler.QuotaExceeded as e:
+        return model_unavailable(e)
+    return None
+
+def llm_tokens_today(user_id):
+    with db.engine.connect() as connection:
+        tokens = connection.execute(
+            db.select(LlmUsage.tokens).where(LlmUsage.user_id == user_id, LlmUsage.day == datetime.utcnow().date())
+        ).scalar()
+    return tokens or 0
+
+def add_llm_tokens(user_id, tokens):
+    # Own transaction, so it never commits a request's pending changes
+    day = datetime.utcnow().date()
+    try:
+        with db.engine.begin() as connection:
+            updated = connection.execute(
+                db.update(LlmUsage)
+                .where(LlmUsage.user_id == user_id, LlmUsage.day == day)
+                .values(tokens=LlmUsage.tokens + tokens)
+            ).rowcount
+            if not updated:
+                connection.execute(db.insert(LlmUsage).values(user_id=user_id, day=day, tokens=tokens))
+    except IntegrityError:
+        # Another worker inserted today's row first
+        with db.engine.begin() as connection:
+            connection.execute(
+                db.update(LlmUsage)
+                .where(LlmUsage.user_id == user_id, LlmUsage.day == day)
+                .values(tokens=LlmUsage.tokens + tokens)
+            )
+    except Exception as e:
+        print(f"Error recording model usage: {str(e)}")
+
+llm_scheduler.set_usage_store(llm_tokens_today, add_llm_tokens)
+
+@app.before_request
+def reset_llm_context():
+    # Request threads are reused; model calls belong to this request only
+    llm_scheduler.set_context()
+
+@app.before_request
+def watch_client():
+    # Model calls of this request are given up if its client disconnects
+    cancellation.watch(request.environ)
+
+@app.before_request
+def start_trace():
+    tracing.start(request.method, request.path)
+
+@app.after_request
+def finish_trace(response):
+    trace = tracing.current()
+    if trace is not None and not trace.finished:
+        if tracing.SERVER_TIMING:
+            response.headers['Server-Timing'] = tracing.server_timing(trace)
+            # Lets the frontend read the header across origins
+            response.headers['Timing-Allow-Origin'] = '*'
+        tracing.finish(trace, response.status_code, request.endpoint, llm_scheduler.current()[0])
+    return response
+
+@app.teardown_request
+def end_trace(error):
+    # Requests that raised never reach after_request
+    trace = tracing.current()
+    if trace is not None and not trace.finished:
+        tracing.finish(trace, 500, request.endpoint, llm_scheduler.current()[0])
+
 @app.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
@@ -172,8 +520,12 @@ def signup():
         
         return jsonify({
             'message': 'User created successfully',
-            'user': user.to_dict()
+            'user': user.to_dict(),
+            'token': issue_token(app.config['SECRET_KEY'], user.id)
         }), 201
+    except HashPoolBusy:
+        db.session.rollback()
+        return server_busy()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -191,45 +543,48 @@ def login():
     # Find user by email
     user = User.query.filter_by(email=email).first()
     
-    if user and user.check_password(password):
+    try:
+        password_ok = user is not None and user.check_password(password)
+        
+        if password_ok and user.rehash_password_if_needed(password):
+            db.session.commit()
+    except HashPoolBusy:
+        db.session.rollback()
+        return server_busy()
+    
+    if password_ok:
         login_user(user)
         return jsonify({
             'message': 'Login successful',
             'email': user.email,
-            'user': user.to_dict()
+            'user': user.to_dict(),
+            'token': issue_token(app.config['SECRET_KEY'], user.id)
         }), 200
     else:
         return jsonify({'error': 'Invalid email or password'}), 401
 
 @app.route('/logout', methods=['POST'])
 def logout():
-    data = request.get_json()
-    
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
-    
-    email = data.get('email')
-    
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    data = request.get_json(silent=True)
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
     
     logout_user()
     return jsonify({'message': 'Logout successful'}), 200
 
 @app.route('/me', methods=['POST'])
 def get_user():
-    data = request.get_json()
+    data = request.get_json(silent=True)
     
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
     
-    email = data.get('email')
-    
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    user = db.session.get(User, user_id)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -238,17 +593,10 @@ def get_user():
 
 @app.route('/upload/resume', methods=['POST'])
 def upload_resume():
-    # Get email from form data
-    email = request.form.get('email')
-    
-    if not email:
-        return jsonify({'error': 'Email is required'}), 400
-    
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
-    
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    # Resolve the user from the bearer token, or by the email in the form data
+    user_id, error = authenticate(request.form)
+    if error:
+        return error
     
     # Check if the post request has the file part
     if 'file' not in request.files:
@@ -276,12 +624,22 @@ def upload_resume():
         # Create a new record in the database
         resume_file = ResumeFile(
             filename=filename,
-            user_id=user.id
+            user_id=user_id
         )
         
         db.session.add(resume_file)
         db.session.commit()
         
+        # Only the latest resume keeps a question pool
+        InterviewQuestionSet.query.filter(
+            InterviewQuestionSet.user_id == user_id,
+            InterviewQuestionSet.resume_file_id != resume_file.id,
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        submit_question_pool_refill(resume_file.id)
+        submit_resume_indexing(resume_file.id)
+        submit_resume_signing(resume_file.id)
+        
         return jsonify({
             'message': 'File uploaded successfully',
             'file': resume_file.to_dict()
@@ -289,43 +647,326 @@ def upload_resume():
     
     return jsonify({'error': 'File type not allowed'}), 400
 
+# Pagination for /user/resumes
+RESUME_PAGE_DEFAULT = 50
+RESUME_PAGE_MAX = 200
+RESUME_FIELDS = {
+    'id': ResumeFile.id,
+    'filename': ResumeFile.filename,
+    'upload_date': ResumeFile.upload_date,
+    'user_id': ResumeFile.user_id,
+}
+
+def encode_resume_cursor(upload_date, resume_id):
+    raw = f"{upload_date.isoformat()}|{resume_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_resume_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    upload_date, resume_id = raw.split('|', 1)
+    return datetime.fromisoformat(upload_date), int(resume_id)
+
 @app.route('/user/resumes', methods=['POST'])
 def get_user_resumes():
-    data = request.get_json()
+    data = request.get_json(silent=True)
     
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
     
-    email = data.get('email')
+    # Page size
+    try:
+        limit = int(data.get('limit', RESUME_PAGE_DEFAULT)) if data else RESUME_PAGE_DEFAULT
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, RESUME_PAGE_MAX))
+    
+    # Optional field selection, as a list or a comma separated string
+    fields = data.get('fields') if data else None
+    if fields:
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            return jsonify({'error': 'fields must be a list or a comma separated string'}), 400
+        unknown = [field for field in fields if field not in RESUME_FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    else:
+        fields = list(RESUME_FIELDS)
     
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    # Only load the requested columns, plus the ones the cursor needs
+    columns = {name: RESUME_FIELDS[name] for name in fields}
+    columns.setdefault('id', ResumeFile.id)
+    columns.setdefault('upload_date', ResumeFile.upload_date)
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    query = db.session.query(*columns.values()).filter(ResumeFile.user_id == user_id)
+    
+    # Keyset pagination on (upload_date, id), newest first
+    cursor = data.get('cursor') if data else None
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_resume_cursor(cursor)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            ResumeFile.upload_date < cursor_date,
+            and_(ResumeFile.upload_date == cursor_date, ResumeFile.id < cursor_id)
+        ))
+    
+    # Fetch one extra row to know if there is a next page
+    rows = query.order_by(ResumeFile.upload_date.desc(), ResumeFile.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    resumes = []
+    for row in rows:
+        values = dict(zip(columns.keys(), row))
+        resume = {}
+        for field in fields:
+            value = values[field]
+            resume[field] = value.isoformat() if isinstance(value, datetime) else value
+        resumes.append(resume)
+    
+    next_cursor = None
+    if has_more:
+        last = dict(zip(columns.keys(), rows[-1]))
+        next_cursor = encode_resume_cursor(last['upload_date'], last['id'])
     
-    resumes = ResumeFile.query.filter_by(user_id=user.id).order_by(ResumeFile.upload_date.desc()).all()
     return jsonify({
-        'resumes': [resume.to_dict() for resume in resumes]
+        'resumes': resumes,
+        'next_cursor': next_cursor
     }), 200
 
-@app.route('/analyze/resume', methods=['POST'])
-def analyze_resume():
-    data = request.get_json()
+# Recruiter search over all stored resumes. Only these emails (comma
+# separated) may use it; when unset the endpoint is disabled.
+RECRUITER_EMAILS = {
+    email.strip().lower() for email in os.environ.get('RECRUITER_EMAILS', '').split(',') if email.strip()
+}
+RANK_PAGE_DEFAULT = 20
+RANK_PAGE_MAX = 100
+
+# This worker's copy of the index, caught up from resume_terms on each search
+resume_index = ResumeIndex()
+# Seconds a resume_terms id missing from the sequence is looked for again
+RESUME_INDEX_GAP_SECONDS = float(os.environ.get('RESUME_INDEX_GAP_SECONDS', 300))
+_resume_backfill_started = False
+
+def index_resume(resume_id):
+    """Store the term counts of a resume for the recruiter index"""
+    if db.session.query(ResumeTerms.id).filter_by(resume_file_id=resume_id).scalar():
+        return
+    resume = db.session.get(ResumeFile, resume_id)
+    if resume is None:
+        return
+    
+    text = get_resume_text(os.path.join(app.config['UPLOAD_FOLDER'], resume.filename))
+    try:
+        db.session.add(ResumeTerms(resume_file_id=resume_id, terms=json.dumps(term_counts(text))))
+        db.session.commit()
+    except IntegrityError:
+        # Already indexed by another worker
+        db.session.rollback()
+
+def submit_resume_indexing(resume_id):
+    background.submit(app, f"resume-index:{resume_id}", index_resume, resume_id)
+
+def backfill_resume_terms():
+    """Index resumes uploaded before the recruiter index existed"""
+    missing = db.session.query(ResumeFile.id).outerjoin(
+        ResumeTerms, ResumeTerms.resume_file_id == ResumeFile.id
+    ).filter(ResumeTerms.id.is_(None)).all()
+    for (resume_id,) in missing:
+        index_resume(resume_id)
+    return len(missing)
+
+def sync_resume_index(batch_size=5000):
+    """Add resume_terms rows this worker hasn't seen yet to its index"""
+    global _resume_backfill_started
+    if not _resume_backfill_started:
+        _resume_backfill_started = True
+        background.submit(app, 'resume-index-backfill', backfill_resume_terms)
+    
+    start = time.time()
+    query = db.session.query(
+        ResumeTerms.id, ResumeTerms.resume_file_id, ResumeTerms.terms, ResumeTerms.created_at,
+        ResumeFile.user_id, ResumeFile.upload_date,
+    ).join(ResumeFile, ResumeFile.id == ResumeTerms.resume_file_id)
+    
+    # Rows passed over by earlier syncs that may have been committed since
+    skipped = resume_index.skipped_rows(start - RESUME_INDEX_GAP_SECONDS)
+    for i in range(0, len(skipped), 500):
+        for row_id, resume_id, terms, _, owner_id, upload_date in query.filter(ResumeTerms.id.in_(skipped[i:i + 500])):
+            resume_index.add(resume_id, owner_id, posix_time(upload_date), json.loads(terms), row_id=row_id)
+    
+    recent = datetime.utcnow() - timedelta(seconds=RESUME_INDEX_GAP_SECONDS)
+    while True:
+        rows = query.filter(
+            ResumeTerms.id > resume_index.last_row_id
+        ).order_by(ResumeTerms.id).limit(batch_size).all()
+        for row_id, resume_id, terms, created_at, owner_id, upload_date in rows:
+            # A gap before a recent row may be a transaction not committed
+            # yet; gaps before old rows are deleted or rolled back rows
+            if row_id > resume_index.last_row_id + 1 and created_at and created_at > recent:
+                resume_index.skip_rows(range(max(resume_index.last_row_id + 1, row_id - 1000), row_id), start)
+            resume_index.add(resume_id, owner_id, posix_time(upload_date), json.loads(terms), row_id=row_id)
+        if len(rows) < batch_size:
+            break
+    metrics.observe('resume_index_sync_seconds', time.time() - start)
+    metrics.set_gauge('resume_index_documents', len(resume_index))
+
+def posix_time(value):
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+def encode_rank_cursor(score, resume_id):
+    raw = f"{score!r}|{resume_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_rank_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    score, resume_id = raw.split('|', 1)
+    return float(score), int(resume_id)
+
+@app.route('/recruiter/rank', methods=['POST'])
+def recruiter_rank():
+    data = request.get_json(silent=True)
     
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
     
-    email = data.get('email')
+    email = db.session.query(User.email).filter_by(id=user_id).scalar()
+    if not email or email.lower() not in RECRUITER_EMAILS:
+        return jsonify({'error': 'Recruiter access required'}), 403
     
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    job_description = (data or {}).get('jobDescription')
+    if not job_description or not isinstance(job_description, str):
+        return jsonify({'error': 'jobDescription is required'}), 400
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    # Page size
+    try:
+        limit = int(data.get('limit', RANK_PAGE_DEFAULT))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, RANK_PAGE_MAX))
+    
+    # Filters: newest resume per candidate only (default), required skills,
+    # uploaded after a date
+    latest_only = bool(data.get('latestOnly', True))
+    skills = data.get('skills') or []
+    if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+        return jsonify({'error': 'skills must be a list of strings'}), 400
+    # Canonical names, as indexed: "ReactJS" finds resumes saying "React.js"
+    required_skills = [canonical_skill(skill) for skill in skills if skill.strip()]
+    uploaded_after = None
+    if data.get('uploadedAfter'):
+        try:
+            uploaded_after = posix_time(datetime.fromisoformat(data['uploadedAfter']))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'uploadedAfter must be an ISO date'}), 400
+    
+    # Keyset pagination on (score, resume id)
+    after = None
+    if data.get('cursor'):
+        try:
+            after = decode_rank_cursor(data['cursor'])
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    sync_resume_index()
+    mask = resume_index.filter_mask(
+        latest_only=latest_only,
+        required_terms=[f"skill:{skill}" for skill in required_skills],
+        uploaded_after=uploaded_after,
+    )
+    query = term_counts(job_description)
+    # Fetch one extra result to know if there is a next page
+    with tracing.span('rank'):
+        page, total = rank(resume_index, query, mask, limit + 1, after)
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    # Load the page's resumes, owners and skills in one query
+    resume_ids = [resume_id for resume_id, _ in page]
+    rows = db.session.query(ResumeFile, User, ResumeTerms.terms).join(
+        User, User.id == ResumeFile.user_id
+    ).join(
+        ResumeTerms, ResumeTerms.resume_file_id == ResumeFile.id
+    ).filter(ResumeFile.id.in_(resume_ids)).all()
+    by_id = {resume.id: (resume, user, terms) for resume, user, terms in rows}
+    
+    job_skills = {term for term in query if term.startswith('skill:')}
+    results = []
+    for resume_id, score in page:
+        if resume_id not in by_id:
+            continue
+        resume, user, terms = by_id[resume_id]
+        resume_skills = {term for term in json.loads(terms) if term.startswith('skill:')}
+        results.append({
+            'resume': resume.to_dict(),
+            'candidate': {'id': user.id, 'name': user.name, 'email': user.email},
+            'score': round(score, 4),
+            'matchedSkills': sorted(term[len('skill:'):] for term in resume_skills & job_skills),
+        })
+    
+    next_cursor = None
+    if has_more:
+        last_id, last_score = page[-1]
+        next_cursor = encode_rank_cursor(last_score, last_id)
+    
+    return jsonify({
+        'results': results,
+        'total': total,
+        'next_cursor': next_cursor
+    }), 200
+
+# Ask the model for the narrative categories (content quality, structure,
+# visual appeal); the others are always scored locally
+RESUME_NARRATIVE = os.environ.get('RESUME_NARRATIVE', '1') == '1'
+
+def wants_stream(data):
+    """Whether the client asked for a progressive response, with "stream"
+    in the body or an NDJSON Accept header. Never the default: clients
+    that read a single JSON document would break."""
+    return bool((data or {}).get('stream')) or 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def progressive_response(preview, refine):
+    """Stream a preview result at once and refine()'s result when it is
+    ready, as two lines of JSON (application/x-ndjson). Each line has
+    "preview" set, true for the first one."""
+    def lines():
+        yield json.dumps(dict(preview, preview=True)) + '\n'
+        try:
+            refined = refine()
+        except llm_scheduler.ModelUnavailable as e:
+            refined = {'error': str(e)}
+        except Exception as e:
+            db.session.rollback()
+            refined = {'error': f'Error refining the result: {str(e)}'}
+        yield json.dumps(dict(refined, preview=False)) + '\n'
+    
+    metrics.incr('progressive_streams')
+    response = Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+    # Keep proxies from holding the preview back until the end
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response, 200
+
+@app.route('/analyze/resume', methods=['POST'])
+def analyze_resume():
+    data = request.get_json(silent=True)
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    error = check_llm_quota(user_id)
+    if error:
+        return error
     
     # Get the latest resume
-    latest_resume = ResumeFile.query.filter_by(user_id=user.id).order_by(ResumeFile.upload_date.desc()).first()
+    latest_resume = ResumeFile.query.filter_by(user_id=user_id).order_by(ResumeFile.upload_date.desc()).first()
     
     if not latest_resume:
         return jsonify({'error': 'No resume found for this user'}), 404
@@ -336,29 +977,44 @@ def analyze_resume():
     if not os.path.exists(file_path):
         return jsonify({'error': 'Resume file not found'}), 404
     
-    try:
-        # Initialize Gemini client using the correct API format
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
+    # Score what can be checked deterministically from the extracted text
+    text = get_resume_text(file_path)
+    if text.strip():
+        local = resume_scoring.analyze(text, latest_resume.filename)
+        
+        def result(analysis, source):
+            return {
+                'message': 'Resume analyzed successfully',
+                'analysis': json.dumps(analysis),
+                'source': source,
+                'filename': latest_resume.filename,
+                'upload_date': latest_resume.upload_date.isoformat()
+            }
         
-        # Read the text content of the resume if it's a text file
-        # client.files.upload(file=file_path)
-        files = [
-        # Please ensure that the file is available in local system working direrctory or change the file path.
-        client.files.upload(file=file_path),
-    ]
-        # resume_text = ""
-        # if file_path.lower().endswith('.txt'):
-        #     with open(file_path, 'r', encoding='utf-8') as f:
-        #         resume_text = f.read()
-        # else:
-        #     # For non-text files, we'll just mention the file type
-        #     resume_text = f"[Resume file: {os.path.basename(file_path)}]"
+        def analyze_narrative():
+            narrative = None
+            source = 'local'
+            if RESUME_NARRATIVE:
+                try:
+                    response_text = model_routing.generate('analyze', resume_scoring.NARRATIVE_PROMPT, file_path=file_path)
+                    narrative = resume_scoring.parse_model_result(response_text, 'narrative')
+                    source = 'local+model'
+                except Exception as e:
+                    # The local categories are still worth returning
+                    print(f"Narrative analysis failed, returning local scores only: {str(e)}")
+            
+            analysis = resume_scoring.build_analysis(local, narrative)
+            record_scores('analysis', latest_resume.id, user_id, latest_resume.id, score_tables.analysis_scores(analysis))
+            return result(analysis, source)
         
-        # Define the model
-        model = "gemini-2.0-flash"
+        # Progressive: the local scores go out at once, the model's
+        # categories follow on the same response when they are ready
+        if RESUME_NARRATIVE and wants_stream(data):
+            return progressive_response(result(resume_scoring.build_analysis(local, None), 'local'), analyze_narrative)
         
+        return jsonify(analyze_narrative()), 200
+    
+    try:
         # Prepare the prompt
         analysis_prompt = """
         Analyze this resume and provide feedback in JSON format with the following structure:
@@ -603,118 +1259,181 @@ layout: "list" // Layout style
 
         ppt= "give the text content of the resume"
         
-        # Create the content structure
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_uri(
-                        file_uri=files[0].uri,
-                        mime_type=files[0].mime_type,
-                    ),
-                    types.Part.from_text(text=f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure, alos provide suggestion in some text, with the same structure by comparing the resume original text and the new better text that can be used to improve the resume, if the provided file is not a resume, then give extermly bad and worse response"),
-                ],
-            ),
-        ]
-        
-        # Set response configuration
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-        )
-        
         # Generate content
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
+        response_text = model_routing.generate(
+            'analyze',
+            f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure, alos provide suggestion in some text, with the same structure by comparing the resume original text and the new better text that can be used to improve the resume, if the provided file is not a resume, then give extermly bad and worse response",
+            file_path=file_path,
         )
         print("response")
         
-        #in response.text, remove the ```json from start and end ```
-        # response.text = response.text.replace("```json", "").replace("```", "")
-        print(response.text)
+        #in response_text, remove the ```json from start and end ```
+        # response_text = response_text.replace("```json", "").replace("```", "")
+        print(response_text)
+        # Repaired locally if malformed, or by a short fix call to the model
+        analysis = json_repair.parse(response_text, 'analysis', {'scoreCategories': list}, fix=model_routing.fixer('analyze'))
+        record_scores('analysis', latest_resume.id, user_id, latest_resume.id, score_tables.analysis_scores(analysis))
         # Return the response
         return jsonify({
             'message': 'Resume analyzed successfully',
-            'analysis': response.text,
+            'analysis': json.dumps(analysis),
+            'source': 'model',
             'filename': latest_resume.filename,
             'upload_date': latest_resume.upload_date.isoformat()
         }), 200
         #print the response
         
     
+    except llm_scheduler.ModelUnavailable as e:
+        return model_unavailable(e)
     except Exception as e:
         return jsonify({'error': f'Error analyzing resume: {str(e)}'}), 500
 
 
 
-@app.route('/dashboard/v1', methods=['POST'])
-def dashboard_v1():
-    data = request.get_json()
-    
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
-    
-    email = data.get('email')
-    
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
-    
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
-    # Get the latest resume
-    latest_resume = ResumeFile.query.filter_by(user_id=user.id).order_by(ResumeFile.upload_date.desc()).first()
-    
-    if not latest_resume:
-        return jsonify({'error': 'No resume found for this user'}), 404
-    
-    # Check if we have a cached response for this resume
-    existing_response = ResumeResponse.query.filter_by(resume_file_id=latest_resume.id).first()
-    
-    if existing_response:
-        # If response exists, load it from the file
-        response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, existing_response.response_file)
-        
-        if os.path.exists(response_file_path):
-            try:
-                with open(response_file_path, 'r', encoding='utf-8') as f:
-                    cached_response = f.read()
-                
-                return jsonify({
-                    'message': 'Resume analysis retrieved from cache',
-                    'analysis': cached_response,
-                    'filename': latest_resume.filename,
-                    'upload_date': latest_resume.upload_date.isoformat(),
-                    'cached': True
-                }), 200
-            except Exception as e:
-                # If there's an error reading the cache, we'll regenerate
-                print(f"Error reading cached response: {str(e)}")
-    
-    # If we get here, we need to generate a new response
-    # Get the file path
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], latest_resume.filename)
-    
-    if not os.path.exists(file_path):
-        return jsonify({'error': 'Resume file not found'}), 404
-    
+# Serve a near-duplicate resume's analysis while the real one is generated
+NEAR_DUPLICATE_REFRESH = os.environ.get('NEAR_DUPLICATE_REFRESH', '1') == '1'
+
+def sign_resume(resume_id):
+    """Store the MinHash signature and LSH buckets of a resume. None if
+    the resume is gone or has too little readable text."""
+    existing = ResumeSignature.query.filter_by(resume_file_id=resume_id).first()
+    if existing:
+        return near_duplicates.signature_from_bytes(existing.signature)
+    resume = db.session.get(ResumeFile, resume_id)
+    if resume is None:
+        return None
+    
+    text = get_resume_text(os.path.join(app.config['UPLOAD_FOLDER'], resume.filename))
+    signature = near_duplicates.signature(text)
+    if signature is None:
+        # Too little text to tell resumes apart, never a near-duplicate
+        return None
     try:
-        # Initialize Gemini client using the correct API format
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
-        
-        # Upload the file to Gemini
-        files = [
-            client.files.upload(file=file_path),
-        ]
-        
-        # Define the model
-        model = "gemini-2.0-flash"
-        
-        # Prepare the prompt
-        analysis_prompt = """
+        db.session.add(ResumeSignature(
+            resume_file_id=resume_id,
+            user_id=resume.user_id,
+            signature=near_duplicates.signature_bytes(signature),
+        ))
+        for bucket in near_duplicates.band_keys(signature):
+            db.session.add(ResumeSignatureBand(resume_file_id=resume_id, user_id=resume.user_id, bucket=bucket))
+        db.session.commit()
+    except IntegrityError:
+        # Already signed by another worker
+        db.session.rollback()
+    return signature
+
+def submit_resume_signing(resume_id):
+    background.submit(app, f"resume-sign:{resume_id}", sign_resume, resume_id)
+
+def find_near_duplicate(resume):
+    """The most similar earlier resume of the same user with a cached
+    analysis, as (resume, response, similarity), or None"""
+    signature = sign_resume(resume.id)
+    if signature is None:
+        return None
+    
+    buckets = near_duplicates.band_keys(signature)
+    candidate_ids = db.session.query(ResumeSignatureBand.resume_file_id).filter(
+        ResumeSignatureBand.user_id == resume.user_id,
+        ResumeSignatureBand.bucket.in_(buckets),
+        ResumeSignatureBand.resume_file_id != resume.id,
+    ).distinct().all()
+    if not candidate_ids:
+        return None
+    
+    best = None
+    rows = db.session.query(ResumeSignature, ResumeResponse).join(
+        ResumeResponse, ResumeResponse.resume_file_id == ResumeSignature.resume_file_id
+    ).join(CacheVersion, and_(
+        CacheVersion.kind == 'dashboard',
+        CacheVersion.ref == db.cast(ResumeSignature.resume_file_id, db.String),
+        CacheVersion.version == DASHBOARD_CACHE_VERSION,
+    )).filter(ResumeSignature.resume_file_id.in_([row[0] for row in candidate_ids])).all()
+    for candidate, response in rows:
+        score = near_duplicates.similarity(signature, near_duplicates.signature_from_bytes(candidate.signature))
+        if score >= near_duplicates.NEAR_DUPLICATE_THRESHOLD and (best is None or score > best[2]):
+            best = (candidate.resume_file_id, response, score)
+    if best is None:
+        return None
+    return db.session.get(ResumeFile, best[0]), best[1], best[2]
+
+def refresh_dashboard_analysis(resume_id):
+    """Replace an approximate or stale dashboard analysis with a current one"""
+    if (ResumeResponse.query.filter_by(resume_file_id=resume_id).first()
+            and cached_version('dashboard', resume_id) == DASHBOARD_CACHE_VERSION):
+        return
+    resume = db.session.get(ResumeFile, resume_id)
+    if resume is not None and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)):
+        generate_dashboard_analysis(resume)
+
+def plan_dashboard_parts(resume, file_path, reuse_parts=True):
+    """What is left to generate of a resume's dashboard analysis, as
+    (prompt, finish), or None if the resume has no recognizable sections.
+    
+    prompt asks for the parts whose resume sections changed (all parts
+    without reuse_parts), or is None if every part is cached. finish(response_text) stores the new parts and
+    returns the merged analysis; it raises ValueError if a part is missing.
+    """
+    text = get_resume_text(file_path)
+    sections = dashboard_sections.split_sections(text) if text.strip() else None
+    if sections is None:
+        return None
+    
+    hashes = {
+        part: cache_versions.versioned_key(dashboard_sections.part_hash(part, sections), DASHBOARD_PART_VERSIONS[part])
+        for part in dashboard_sections.DASHBOARD_PARTS
+    }
+    rows = DashboardPart.query.filter(
+        DashboardPart.user_id == resume.user_id,
+        DashboardPart.input_hash.in_(list(hashes.values())),
+    ).all()
+    results = {row.part: json.loads(row.result) for row in rows if hashes.get(row.part) == row.input_hash}
+    if not reuse_parts:
+        results = {}
+    missing = [part for part in dashboard_sections.DASHBOARD_PARTS if part not in results]
+    metrics.incr('dashboard_parts_reused', len(results))
+    
+    def finish(response_text):
+        if missing:
+            generated = dashboard_sections.parse_parts(response_text, missing)
+            metrics.incr('dashboard_parts_generated', len(generated))
+            try:
+                for part, value in generated.items():
+                    if not reuse_parts:
+                        # Replace the cached result
+                        DashboardPart.query.filter_by(
+                            user_id=resume.user_id, part=part, input_hash=hashes[part]
+                        ).delete(synchronize_session=False)
+                    db.session.add(DashboardPart(
+                        user_id=resume.user_id,
+                        part=part,
+                        input_hash=hashes[part],
+                        result=json.dumps(value),
+                    ))
+                db.session.commit()
+            except IntegrityError:
+                # Same sections analyzed by another worker
+                db.session.rollback()
+            results.update(generated)
+        return json.dumps(dashboard_sections.merge_parts(results), indent=2)
+    
+    return (dashboard_sections.build_prompt(missing, sections) if missing else None), finish
+
+def generate_dashboard_parts(resume, file_path, reuse_parts=True):
+    """Build the dashboard analysis from cached parts, asking the model only
+    for parts whose resume sections changed. None if the resume has no
+    recognizable sections."""
+    plan = plan_dashboard_parts(resume, file_path, reuse_parts)
+    if plan is None:
+        return None
+    prompt, finish = plan
+    return finish(model_routing.generate('dashboard', prompt) if prompt else None)
+
+def dashboard_file_prompt():
+    """Prompt for analyzing the whole resume file at once"""
+    # Prepare the prompt
+    analysis_prompt = """
         Analyze this resume and provide feedback in JSON format with the following structure:
         const resumeData = {
     candidate: {
@@ -779,95 +1498,347 @@ def dashboard_v1():
 
         """
 
-        ppt= "give the text content of the resume"
-        
-        # Create the content structure
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_uri(
-                        file_uri=files[0].uri,
-                        mime_type=files[0].mime_type,
-                    ),
-                    types.Part.from_text(text=f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure,do not write extra text, just write the json response,then give extermly bad and worse response"),
-                ],
-            ),
-        ]
-        
-        # Set response configuration
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-        )
-        
-        # Generate content
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        )
-        
-        # Save the response to a file
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        response_filename = f"{timestamp}_{latest_resume.id}.json"
-        response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, response_filename)
-        
-        with open(response_file_path, 'w', encoding='utf-8') as f:
-            f.write(response.text)
+    ppt= "give the text content of the resume"
+    
+    # Generate content
+    return f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure,do not write extra text, just write the json response,then give extermly bad and worse response"
+
+# Model of the dashboard analysis (see model_routing)
+DASHBOARD_MODEL = model_routing.model('dashboard')
+# Cached analyses made with other prompts, models or schemas are stale
+DASHBOARD_CACHE_VERSION = cache_versions.version(
+    DASHBOARD_MODEL,
+    [dashboard_sections.DASHBOARD_PROMPT, dashboard_file_prompt()],
+    [dashboard_sections.DASHBOARD_PARTS, dashboard_sections.RESUME_DATA_KEYS],
+)
+DASHBOARD_PART_VERSIONS = {
+    part: cache_versions.version(DASHBOARD_MODEL, dashboard_sections.DASHBOARD_PROMPT, example)
+    for part, (_, example) in dashboard_sections.DASHBOARD_PARTS.items()
+}
+
+# What the dashboard page needs of a whole-file analysis
+DASHBOARD_SHAPE = {'candidate': dict, 'skillsAnalysis': dict}
+
+def clean_dashboard_analysis(response_text):
+    """A whole-file analysis as JSON text, repaired locally if malformed or
+    by a short fix call to the model. Raises ValueError if neither works."""
+    resume_data = json_repair.parse(response_text, 'dashboard', DASHBOARD_SHAPE, fix=model_routing.fixer('dashboard'))
+    return json.dumps(resume_data, indent=2)
+
+def generate_dashboard_from_file(file_path):
+    """Analyze the whole resume file at once"""
+    return clean_dashboard_analysis(model_routing.generate('dashboard', dashboard_file_prompt(), file_path=file_path))
+
+def generate_dashboard_analysis(resume, reuse_parts=True):
+    """Generate the dashboard analysis for a resume and cache it"""
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)
+    
+    # Only parts whose sections changed since an earlier upload are
+    # generated; resumes without recognizable sections are sent whole
+    with cancellation.cached_work():
+        try:
+            response_text = generate_dashboard_parts(resume, file_path, reuse_parts)
+        except ValueError as e:
+            print(f"Error generating dashboard parts: {str(e)}")
+            response_text = None
+        if response_text is None:
+            response_text = generate_dashboard_from_file(file_path)
+    
+    return save_dashboard_analysis(resume, response_text)
+
+def cached_version(kind, ref):
+    """Version a cached result was made with, None if it predates versioning"""
+    return db.session.query(CacheVersion.version).filter_by(kind=kind, ref=str(ref)).scalar()
+
+def set_cached_version(kind, ref, cache_version):
+    try:
+        updated = CacheVersion.query.filter_by(kind=kind, ref=str(ref)).update(
+            {'version': cache_version, 'created_at': datetime.utcnow()}, synchronize_session=False
+        )
+        if not updated:
+            db.session.add(CacheVersion(kind=kind, ref=str(ref), version=cache_version))
+        db.session.commit()
+    except IntegrityError:
+        # Recorded by another worker at the same time
+        db.session.rollback()
+
+def record_scores(source, source_ref, user_id, resume_file_id, scores, created_at=None):
+    """Replace the resume_score rows of one analysis result"""
+    try:
+        ResumeScore.query.filter_by(source=source, source_ref=str(source_ref)).delete(synchronize_session=False)
+        for category, score, issues in scores:
+            db.session.add(ResumeScore(
+                user_id=user_id,
+                resume_file_id=resume_file_id,
+                source=source,
+                source_ref=str(source_ref),
+                category=category,
+                score=score,
+                issues=issues,
+                created_at=created_at or datetime.utcnow(),
+            ))
+        db.session.commit()
+    except Exception as e:
+        # Analytics are not worth failing the analysis for
+        db.session.rollback()
+        print(f"Error recording scores: {str(e)}")
+
+def record_dashboard_scores(resume, response_text, created_at=None):
+    try:
+        resume_data = json_repair.repair(response_text)
+    except ValueError:
+        return
+    record_scores('dashboard', resume.id, resume.user_id, resume.id, score_tables.dashboard_scores(resume_data), created_at)
+
+def store_cache_entry(model, filters, prefix, content, kind, cache_version, version_ref=None):
+    """Write a result file to RESPONSE_CACHE_FOLDER and point the entry's
+    metadata row (the model's row matching filters) at it. Returns the row.
+    
+    Runs under the entry's cross-process lock, so concurrent writers of one
+    entry take turns. Duplicate rows left by earlier races are merged, and
+    replaced files are removed once no row refers to them.
+    """
+    key = f"{model.__tablename__}:" + ':'.join(str(filters[name]) for name in sorted(filters))
+    with cache_files.lock(RESPONSE_CACHE_FOLDER, key):
+        with tracing.span('cache_write'):
+            filename = cache_files.write(RESPONSE_CACHE_FOLDER, prefix, content)
         
-        # Save the response metadata to the database
-        if existing_response:
-            # Update existing response
-            old_file_path = os.path.join(RESPONSE_CACHE_FOLDER, existing_response.response_file)
-            if os.path.exists(old_file_path):
-                try:
-                    os.remove(old_file_path)
-                except:
-                    pass
-            existing_response.response_file = response_filename
-            existing_response.created_at = datetime.utcnow()
-        else:
-            # Create new response record
-            resume_response = ResumeResponse(
-                resume_file_id=latest_resume.id,
-                response_file=response_filename
+        rows = model.query.filter_by(**filters).order_by(model.id.desc()).all()
+        unused = {row.response_file for row in rows} - {filename}
+        if rows:
+            row = rows[0]
+            # Compare-and-swap, for writers that don't share the lock (e.g.
+            # on another host): the row must still point at what we read
+            updated = model.query.filter_by(id=row.id, response_file=row.response_file).update(
+                {'response_file': filename, 'created_at': datetime.utcnow()}, synchronize_session=False
             )
-            db.session.add(resume_response)
-        
+            if not updated:
+                metrics.incr('cache_write_conflicts')
+                unused.add(filename)
+            for duplicate in rows[1:]:
+                db.session.delete(duplicate)
+        else:
+            row = model(response_file=filename, **filters)
+            db.session.add(row)
         db.session.commit()
+        set_cached_version(kind, row.id if version_ref is None else version_ref, cache_version)
+        
+        for name in unused:
+            if not db.session.query(model.id).filter_by(response_file=name).first():
+                cache_files.remove(RESPONSE_CACHE_FOLDER, name)
+    return row
+
+def save_dashboard_analysis(resume, response_text):
+    """Cache a resume's dashboard analysis in RESPONSE_CACHE_FOLDER"""
+    store_cache_entry(
+        ResumeResponse, {'resume_file_id': resume.id}, f"{resume.id}_", response_text,
+        'dashboard', DASHBOARD_CACHE_VERSION, version_ref=resume.id,
+    )
+    record_dashboard_scores(resume, response_text)
+    
+    return response_text
+
+# Previews from a route's preview model (see model_routing) run on these
+# threads, so a request can stop waiting at its budget. A preview that
+# misses it finishes in the background and is dropped.
+PREVIEW_WORKERS = int(os.environ.get('PREVIEW_WORKERS', 4))
+# Full results replacing a preview are generated on these threads, ahead
+# of other background work
+REFINE_WORKERS = int(os.environ.get('REFINE_WORKERS', 2))
+
+background.add_lane('preview', max(1, PREVIEW_WORKERS), llm_lane='interactive')
+background.add_lane('refine', max(1, REFINE_WORKERS), llm_lane='standard')
+
+def generate_preview(endpoint, prompt, file_path=None):
+    """The endpoint's preview model's answer, or None if the route has no
+    preview model or the answer misses the route's budget"""
+    route = model_routing.route(endpoint)
+    if not route['preview_model']:
+        return None
+    
+    key = f"preview:{endpoint}:{base64.urlsafe_b64encode(os.urandom(9)).decode()}"
+    # The call itself gives up at the budget too, freeing its model slot
+    future = background.submit_to('preview', app, key, llm.generate, prompt, file_path=file_path,
+                                  model=route['preview_model'], deadline=time.monotonic() + route['preview_budget'])
+    start = time.time()
+    try:
+        with tracing.span('preview'):
+            return future.result(timeout=route['preview_budget'])
+    except FutureTimeout:
+        metrics.incr('preview_timeouts')
+        return None
+    except Exception as e:
+        print(f"Preview for {endpoint} failed: {str(e)}")
+        return None
+    finally:
+        metrics.observe('preview_seconds', time.time() - start)
+
+@app.route('/dashboard/v1', methods=['POST'])
+def dashboard_v1():
+    # Users wait on these, so their model calls go ahead of other work
+    llm_scheduler.set_lane('interactive')
+    
+    data = request.get_json(silent=True)
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    error = check_llm_quota(user_id)
+    if error:
+        return error
+    
+    # Get the latest resume
+    latest_resume = ResumeFile.query.filter_by(user_id=user_id).order_by(ResumeFile.upload_date.desc()).first()
+    
+    if not latest_resume:
+        return jsonify({'error': 'No resume found for this user'}), 404
+    
+    # Check if we have a cached response for this resume
+    existing_response = ResumeResponse.query.filter_by(resume_file_id=latest_resume.id).first()
+    
+    if existing_response:
+        # If response exists, load it from the file
+        response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, existing_response.response_file)
+        
+        # Made with an older prompt, model or schema: serve it while a
+        # current one is generated in the background, or regenerate now
+        stale = cached_version('dashboard', latest_resume.id) != DASHBOARD_CACHE_VERSION
+        if stale:
+            cache_versions.record_mismatch('dashboard')
+        
+        if os.path.exists(response_file_path) and (not stale or cache_versions.CACHE_STALE_WHILE_REVALIDATE):
+            try:
+                with tracing.span('cache_read'), open(response_file_path, 'r', encoding='utf-8') as f:
+                    cached_response = f.read()
+                
+                if stale:
+                    background.submit(app, f"dashboard:{latest_resume.id}", refresh_dashboard_analysis, latest_resume.id)
+                
+                return jsonify({
+                    'message': 'Resume analysis retrieved from cache',
+                    'analysis': cached_response,
+                    'filename': latest_resume.filename,
+                    'upload_date': latest_resume.upload_date.isoformat(),
+                    'cached': True,
+                    'stale': stale
+                }), 200
+            except Exception as e:
+                # If there's an error reading the cache, we'll regenerate
+                print(f"Error reading cached response: {str(e)}")
+    
+    # A near-duplicate of an earlier resume reuses that resume's analysis
+    try:
+        with tracing.span('near_duplicate'):
+            duplicate = find_near_duplicate(latest_resume)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error finding near-duplicate resume: {str(e)}")
+        duplicate = None
+    
+    if duplicate:
+        source_resume, source_response, similarity = duplicate
+        response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, source_response.response_file)
+        if os.path.exists(response_file_path):
+            with tracing.span('cache_read'), open(response_file_path, 'r', encoding='utf-8') as f:
+                cached_response = f.read()
+            
+            if NEAR_DUPLICATE_REFRESH:
+                background.submit(app, f"dashboard:{latest_resume.id}", refresh_dashboard_analysis, latest_resume.id)
+            metrics.incr('dashboard_near_duplicate_hits')
+            
+            return jsonify({
+                'message': 'Resume analysis retrieved from a near-identical resume',
+                'analysis': cached_response,
+                'filename': latest_resume.filename,
+                'upload_date': latest_resume.upload_date.isoformat(),
+                'cached': True,
+                'approximate': True,
+                'similarity': round(similarity, 3),
+                'source_resume': {
+                    'id': source_resume.id,
+                    'filename': source_resume.filename,
+                    'upload_date': source_resume.upload_date.isoformat(),
+                },
+            }), 200
+    
+    # If we get here, we need to generate a new response
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], latest_resume.filename)
+    
+    if not os.path.exists(file_path):
+        return jsonify({'error': 'Resume file not found'}), 404
+    
+    # Progressive: the full analysis is generated in the background and
+    # replaces the preview in the cache; the page polls /jobs/status with
+    # the job handle, then asks again. Without a preview in time the
+    # answer is 202 with only the handle.
+    if model_routing.progressive('dashboard'):
+        job = start_artifact_job('dashboard', latest_resume.id, user_id, lane='refine')
+        preview = generate_preview('dashboard', dashboard_file_prompt(), file_path)
+        if preview:
+            # No time for a fix call: a preview that can't be repaired is dropped
+            try:
+                preview = json.dumps(json_repair.parse(preview, 'dashboard_preview', DASHBOARD_SHAPE, complete=False), indent=2)
+            except ValueError:
+                preview = None
+        metrics.incr('dashboard_previews' if preview else 'dashboard_previews_missed')
+        return jsonify({
+            'message': 'Preview analysis, the full one is being generated' if preview else 'Analysis is being generated',
+            'analysis': preview,
+            'filename': latest_resume.filename,
+            'upload_date': latest_resume.upload_date.isoformat(),
+            'cached': False,
+            'preview': True,
+            'job': job.get('job')
+        }), 200 if preview else 202
+    
+    try:
+        response_text = generate_dashboard_analysis(latest_resume)
         
         # Return the response
         return jsonify({
             'message': 'Resume analyzed successfully',
-            'analysis': response.text,
+            'analysis': response_text,
             'filename': latest_resume.filename,
             'upload_date': latest_resume.upload_date.isoformat(),
             'cached': False
         }), 200
     
+    except llm_scheduler.ModelUnavailable as e:
+        return model_unavailable(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Error analyzing resume: {str(e)}'}), 500
 
 
 
+# Ask the model to rerank and explain catalog matches unless the request
+# says otherwise with "explain"
+JOB_LLM_RERANK = os.environ.get('JOB_LLM_RERANK', '0') == '1'
+
 @app.route('/job/v1', methods=['POST'])
 def job_v1():
-    data = request.get_json()
+    data = request.get_json(silent=True)
     
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
     
-    email = data.get('email')
+    error = check_llm_quota(user_id)
+    if error:
+        return error
     
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
-    
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    # Catalog matches returned
+    try:
+        limit = int(data.get('limit', job_catalog.JOB_TOP_K)) if data else job_catalog.JOB_TOP_K
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, 50))
     
     # Get the latest resume
-    latest_resume = ResumeFile.query.filter_by(user_id=user.id).order_by(ResumeFile.upload_date.desc()).first()
+    latest_resume = ResumeFile.query.filter_by(user_id=user_id).order_by(ResumeFile.upload_date.desc()).first()
     
     if not latest_resume:
         return jsonify({'error': 'No resume found for this user'}), 404
@@ -878,29 +1849,43 @@ def job_v1():
     if not os.path.exists(file_path):
         return jsonify({'error': 'Resume file not found'}), 404
     
-    try:
-        # Initialize Gemini client using the correct API format
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
+    # Match against the local job catalog when the resume text is readable
+    index = job_catalog.get_index()
+    text = get_resume_text(file_path) if index is not None else ''
+    
+    if text.strip():
+        jobs = [dict(job, match=int(round(score * 100))) for job, score in index.search(text, limit)]
         
-        # Read the text content of the resume if it's a text file
-        # client.files.upload(file=file_path)
-        files = [
-        # Please ensure that the file is available in local system working direrctory or change the file path.
-        client.files.upload(file=file_path),
-    ]
-        # resume_text = ""
-        # if file_path.lower().endswith('.txt'):
-        #     with open(file_path, 'r', encoding='utf-8') as f:
-        #         resume_text = f.read()
-        # else:
-        #     # For non-text files, we'll just mention the file type
-        #     resume_text = f"[Resume file: {os.path.basename(file_path)}]"
+        def result(ranked, source):
+            return {
+                'message': 'Resume analyzed successfully',
+                'analysis': json.dumps(ranked, ensure_ascii=False),
+                'source': source,
+                'filename': latest_resume.filename,
+                'upload_date': latest_resume.upload_date.isoformat()
+            }
         
-        # Define the model
-        model = "gemini-2.0-flash"
+        # Optional second stage: let the model reorder and explain the shortlist
+        explain = (data or {}).get('explain', JOB_LLM_RERANK)
+        if not (explain and jobs):
+            return jsonify(result(jobs, 'catalog')), 200
         
+        def rerank():
+            try:
+                response_text = model_routing.generate('jobs', job_catalog.build_rerank_prompt(jobs), file_path=file_path)
+                return result(job_catalog.apply_rerank(jobs, response_text), 'catalog+model')
+            except Exception as e:
+                print(f"Job rerank failed, keeping catalog order: {str(e)}")
+                return result(jobs, 'catalog')
+        
+        # Progressive: the catalog order goes out at once, the model's
+        # order follows on the same response
+        if wants_stream(data):
+            return progressive_response(result(jobs, 'catalog'), rerank)
+        
+        return jsonify(rerank()), 200
+    
+    try:
         # Prepare the prompt
         analysis_prompt = """
         give the job suggestions in the same structure, if the provided file is not a resume, then give extermly bad and worse response, do not give any other text, just give the json response
@@ -961,69 +1946,214 @@ def job_v1():
 
         ppt= "give the text content of the resume"
         
-        # Create the content structure
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_uri(
-                        file_uri=files[0].uri,
-                        mime_type=files[0].mime_type,
-                    ),
-                    types.Part.from_text(text=f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure, alos provide suggestion in some text, with the same structure by comparing the resume original text and the new better text that can be used to improve the resume, if the provided file is not a resume, then give extermly bad and worse response"),
-                ],
-            ),
-        ]
-        
-        # Set response configuration
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-        )
-        
         # Generate content
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
+        response_text = model_routing.generate(
+            'jobs',
+            f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure, alos provide suggestion in some text, with the same structure by comparing the resume original text and the new better text that can be used to improve the resume, if the provided file is not a resume, then give extermly bad and worse response",
+            file_path=file_path,
         )
         print("response")
         
-        #in response.text, remove the ```json from start and end ```
-        # response.text = response.text.replace("```json", "").replace("```", "")
-        print(response.text)
+        #in response_text, remove the ```json from start and end ```
+        # response_text = response_text.replace("```json", "").replace("```", "")
+        print(response_text)
+        # Repaired locally if malformed, or by a short fix call to the model
+        jobs = json_repair.parse(response_text, 'jobs', list, fix=model_routing.fixer('jobs'))
         # Return the response
         return jsonify({
             'message': 'Resume analyzed successfully',
-            'analysis': response.text,
+            'analysis': json.dumps(jobs, ensure_ascii=False),
+            'source': 'model',
             'filename': latest_resume.filename,
             'upload_date': latest_resume.upload_date.isoformat()
         }), 200
         #print the response
         
     
+    except llm_scheduler.ModelUnavailable as e:
+        return model_unavailable(e)
     except Exception as e:
         return jsonify({'error': f'Error analyzing resume: {str(e)}'}), 500
 
 
 
 
-@app.route('/interview-content/v1', methods=['POST'])
-def interview_content_v1():
-    data = request.get_json()
+def load_bank_questions(topics):
+    """Questions in the bank for the given topics, grouped by topic"""
+    rows = db.session.query(QuestionBankEntry.topic, QuestionBankEntry.question).filter(
+        QuestionBankEntry.topic.in_(topics)
+    ).all()
+    grouped = {}
+    for topic, question in rows:
+        grouped.setdefault(topic, []).append(question)
+    return grouped
+
+def fill_question_bank(topics):
+    """Generate questions for topics missing from the bank and store them"""
+    with cancellation.cached_work():
+        response_text = model_routing.generate('question_bank', build_generate_prompt(topics))
+        generated = parse_generated(response_text, topics, fix=model_routing.fixer('question_bank'))
+    
+    existing = set(
+        db.session.query(QuestionBankEntry.topic, QuestionBankEntry.question_hash).filter(
+            QuestionBankEntry.topic.in_(list(generated))
+        ).all()
+    )
+    for topic, questions in generated.items():
+        for question in questions:
+            key = (topic, question_hash(question))
+            if key not in existing:
+                existing.add(key)
+                db.session.add(QuestionBankEntry(topic=topic, question=question, question_hash=key[1]))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored some of the same questions first
+        db.session.rollback()
     
-    if not data or 'email' not in data:
-        return jsonify({'error': 'Email is required'}), 400
+    metrics.incr('question_bank_generated_topics', len(generated))
+    return generated
+
+def questions_from_bank(file_path):
+    """Interview questions for a resume, served from the question bank.
+    
+    When enough of the resume's topics are covered the model isn't called
+    at all, and any missing topics are filled in the background for next
+    time. Otherwise only the missing topics are generated, before serving.
+    Returns (questions, source), or None when the resume has no readable
+    text or no known skills.
+    """
+    text = get_resume_text(file_path)
+    if not text.strip():
+        return None
+    
+    fingerprint = skill_fingerprint(text)
+    if not fingerprint['skills']:
+        return None
+    
+    topics = fingerprint_topics(fingerprint)
+    bank = load_bank_questions(topics)
+    covered, missing, share = coverage(topics, {topic: len(questions) for topic, questions in bank.items()})
+    
+    if share >= QUESTION_BANK_COVERAGE:
+        if missing:
+            background.submit(app, f"question-bank:{','.join(missing)}", fill_question_bank, missing)
+        metrics.incr('question_bank_hits')
+        return pick_questions({topic: bank[topic] for topic in covered}), 'bank'
+    
+    metrics.incr('question_bank_misses')
+    for topic, questions in fill_question_bank(missing).items():
+        bank.setdefault(topic, []).extend(questions)
+    if not bank:
+        return None
+    return pick_questions(bank), 'generated'
+
+def generate_question_set(file_path, name):
+    """Build one interview question set for a resume.
     
-    email = data.get('email')
+    Returns (analysis, source) where analysis is the greeting and numbered
+    questions the mock interview page expects.
+    """
+    # Serve questions from the bank for known skill profiles
+    try:
+        bank_result = questions_from_bank(file_path)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Question bank unavailable, generating from the resume: {str(e)}")
+        bank_result = None
+    
+    if bank_result:
+        questions, source = bank_result
+        return format_questions(name, questions), source
+    
+    # Prepare the prompt
+    analysis_prompt = """
+    plz provide the interview questions after reading the resume, provide related questions, first greet the user with name and then provide the interview questions, if the provided file is not a resume, then give extermly bad and worse response
+    """
+    
+    # Generate content
+    response_text = model_routing.generate(
+        'interview_content',
+        f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure,make sure each question length is max 15 words, if the provided file is not a resume, then give extermly bad and worse response",
+        file_path=file_path,
+    )
+    return response_text, 'model'
+
+# Ready question sets kept per latest resume, so starting an interview
+# doesn't wait on generation (0 disables the pool)
+QUESTION_POOL_SIZE = int(os.environ.get('QUESTION_POOL_SIZE', 3))
+# Question sets generated at the same time, across all resumes
+QUESTION_POOL_REFILL_WORKERS = int(os.environ.get('QUESTION_POOL_REFILL_WORKERS', 2))
+
+background.add_lane('question-pool', max(1, QUESTION_POOL_REFILL_WORKERS))
+
+def pop_question_set(resume_id):
+    """Take the oldest ready question set for a resume, or None.
+    
+    Each set is served once: it is deleted as it is taken, and if another
+    worker deletes it first the next one is tried.
+    """
+    while True:
+        question_set = InterviewQuestionSet.query.filter_by(resume_file_id=resume_id).order_by(
+            InterviewQuestionSet.id
+        ).first()
+        if question_set is None:
+            return None
+        
+        analysis, source = question_set.analysis, question_set.source
+        deleted = InterviewQuestionSet.query.filter_by(id=question_set.id).delete(synchronize_session=False)
+        db.session.commit()
+        if deleted:
+            return analysis, source
+
+def refill_question_pool(resume_id):
+    """Generate question sets until the resume's pool is full"""
+    resume = db.session.get(ResumeFile, resume_id)
+    if resume is None:
+        return 0
+    
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)
+    added = 0
+    while InterviewQuestionSet.query.filter_by(resume_file_id=resume_id).count() < QUESTION_POOL_SIZE:
+        # Stop if a newer resume was uploaded meanwhile
+        latest_id = db.session.query(ResumeFile.id).filter_by(user_id=resume.user_id).order_by(
+            ResumeFile.upload_date.desc()
+        ).limit(1).scalar()
+        if latest_id != resume_id:
+            break
+        
+        analysis, source = generate_question_set(file_path, resume.user.name)
+        db.session.add(InterviewQuestionSet(
+            user_id=resume.user_id,
+            resume_file_id=resume_id,
+            analysis=analysis,
+            source=source,
+        ))
+        db.session.commit()
+        added += 1
     
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    metrics.incr('question_pool_refilled', added)
+    return added
+
+def submit_question_pool_refill(resume_id):
+    if QUESTION_POOL_SIZE > 0:
+        background.submit_to('question-pool', app, f"question-pool:{resume_id}", refill_question_pool, resume_id)
+
+@app.route('/interview-content/v1', methods=['POST'])
+def interview_content_v1():
+    data = request.get_json(silent=True)
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    error = check_llm_quota(user_id)
+    if error:
+        return error
     
     # Get the latest resume
-    latest_resume = ResumeFile.query.filter_by(user_id=user.id).order_by(ResumeFile.upload_date.desc()).first()
+    latest_resume = ResumeFile.query.filter_by(user_id=user_id).order_by(ResumeFile.upload_date.desc()).first()
     
     if not latest_resume:
         return jsonify({'error': 'No resume found for this user'}), 404
@@ -1035,148 +2165,178 @@ def interview_content_v1():
         return jsonify({'error': 'Resume file not found'}), 404
     
     try:
-        # Initialize Gemini client using the correct API format
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
-        
-        # Read the text content of the resume if it's a text file
-        # client.files.upload(file=file_path)
-        files = [
-        # Please ensure that the file is available in local system working direrctory or change the file path.
-        client.files.upload(file=file_path),
-    ]
-        # resume_text = ""
-        # if file_path.lower().endswith('.txt'):
-        #     with open(file_path, 'r', encoding='utf-8') as f:
-        #         resume_text = f.read()
-        # else:
-        #     # For non-text files, we'll just mention the file type
-        #     resume_text = f"[Resume file: {os.path.basename(file_path)}]"
-        
-        # Define the model
-        model = "gemini-2.0-flash"
-        
-        # Prepare the prompt
-        analysis_prompt = """
-        plz provide the interview questions after reading the resume, provide related questions, first greet the user with name and then provide the interview questions, if the provided file is not a resume, then give extermly bad and worse response
-        """
-
-        ppt= "give the text content of the resume"
-        
-        # Create the content structure
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_uri(
-                        file_uri=files[0].uri,
-                        mime_type=files[0].mime_type,
-                    ),
-                    types.Part.from_text(text=f"{analysis_prompt}\n\n donot give same response for same resume, provide new response with new text but same structure,make sure each question length is max 15 words, if the provided file is not a resume, then give extermly bad and worse response"),
-                ],
-            ),
-        ]
-        
-        # Set response configuration
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-        )
-        
-        # Generate content
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        )
-        print("response")
+        # Take a ready question set if there is one, else build it now
+        question_set = pop_question_set(latest_resume.id)
+        if question_set:
+            metrics.incr('question_pool_hits')
+            analysis, source = question_set
+        else:
+            metrics.incr('question_pool_misses')
+            user = db.session.get(User, user_id)
+            analysis, source = generate_question_set(file_path, user.name)
         
-        #in response.text, remove the ```json from start and end ```
-        # response.text = response.text.replace("```json", "").replace("```", "")
-        print(response.text)
-        # Return the response
         return jsonify({
             'message': 'Resume analyzed successfully',
-            'analysis': response.text,
+            'analysis': analysis,
+            'source': source,
+            'pooled': question_set is not None,
             'filename': latest_resume.filename,
             'upload_date': latest_resume.upload_date.isoformat()
         }), 200
-        #print the response
-        
     
+    except llm_scheduler.ModelUnavailable as e:
+        return model_unavailable(e)
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': f'Error analyzing resume: {str(e)}'}), 500
+    
+    finally:
+        # Replace what was taken, in the background
+        submit_question_pool_refill(latest_resume.id)
 
-@app.route('/interview-analyze', methods=['POST'])
-def interview_analyze():
-    data = request.get_json()
+# Seconds the final analysis waits for turns that are still being scored
+INTERVIEW_TURN_WAIT = float(os.environ.get('INTERVIEW_TURN_WAIT', 30))
+
+# Turn evaluations are cached under a key that includes this version
+TURN_CACHE_VERSION = cache_versions.version(model_routing.model('interview_turn'), TURN_PROMPT, SCORE_FIELDS)
+
+def turn_key(question, answer):
+    """Cache key of a turn evaluation"""
+    return cache_versions.versioned_key(turn_hash(question, answer), TURN_CACHE_VERSION)
+
+def score_interview_turn(t_hash, question, answer):
+    """Score one question/answer pair and cache the result"""
+    # Interview analysis waits for these, so they don't queue as background work
+    llm_scheduler.set_lane('standard')
+    response_text = model_routing.generate('interview_turn', build_turn_prompt(question, answer))
+    result = parse_turn_result(response_text, fix=model_routing.fixer('interview_turn'))
     
-    if not data or 'email' not in data or 'conversationLog' not in data:
-        return jsonify({'error': 'Email and conversation log are required'}), 400
+    try:
+        db.session.add(InterviewTurnEvaluation(turn_hash=t_hash, result=json.dumps(result)))
+        db.session.commit()
+    except IntegrityError:
+        # Another worker cached the same turn first
+        db.session.rollback()
     
-    email = data.get('email')
-    conversation_log = data.get('conversationLog', [])
+    return result
+
+def submit_turn_scoring(t_hash, question, answer):
+    return background.submit(app, f"interview-turn:{t_hash}", score_interview_turn, t_hash, question, answer)
+
+def aggregate_interview_session(user_id, session_id, conversation_log):
+    """Build the interview analysis from the session's cached turn results.
+
+    The turns are taken from the conversation log, so answers whose turn
+    was never posted are scored now, as are turns not scored yet (or
+    joined if something is already working on them). All of them together
+    get INTERVIEW_TURN_WAIT seconds. Returns None if the session has no
+    posted turns or a turn could not be scored in time, so the caller can
+    fall back to a full analysis.
+    """
+    turns = InterviewTurn.query.filter_by(user_id=user_id, session_id=session_id).order_by(InterviewTurn.turn_index).all()
+    
+    if not turns:
+        return None
+    
+    # Keys are recomputed, so turns posted before a prompt change are scored again
+    pairs = log_turns(conversation_log) or [(turn.question, turn.answer) for turn in turns]
+    keys = [turn_key(question, answer) for question, answer in pairs]
+    results = {
+        evaluation.turn_hash: json.loads(evaluation.result)
+        for evaluation in InterviewTurnEvaluation.query.filter(InterviewTurnEvaluation.turn_hash.in_(set(keys)))
+    }
     
-    # Validate conversation log
-    if not isinstance(conversation_log, list) or len(conversation_log) == 0:
-        return jsonify({'error': 'Invalid conversation log format'}), 400
+    posted = {turn_key(turn.question, turn.answer) for turn in turns}
+    metrics.incr('interview_turns_missing', len(set(keys) - posted))
     
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    futures = {}
+    for (question, answer), t_hash in zip(pairs, keys):
+        if t_hash not in results and t_hash not in futures:
+            futures[t_hash] = submit_turn_scoring(t_hash, question, answer)
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    # One deadline for all of them, not one per turn
+    _, not_done = wait(futures.values(), timeout=INTERVIEW_TURN_WAIT)
+    if not_done:
+        print(f"{len(not_done)} interview turns not scored within {INTERVIEW_TURN_WAIT}s")
+        metrics.incr('interview_turn_wait_timeouts')
+        return None
     
-    # Create a hash of the conversation log to use as a cache key
-    conversation_json = json.dumps(conversation_log, sort_keys=True)
-    import hashlib
-    conversation_hash = hashlib.md5(conversation_json.encode()).hexdigest()
+    for t_hash, future in futures.items():
+        try:
+            results[t_hash] = future.result()
+        except Exception as e:
+            print(f"Error scoring interview turn {t_hash}: {str(e)}")
+            return None
     
-    # Check if we have a cached response for this conversation
-    existing_response = InterviewResponse.query.filter_by(
-        user_id=user.id, 
-        conversation_hash=conversation_hash
-    ).first()
+    metrics.incr('interview_turns_waited', len(futures))
+    return aggregate_turns([(question, answer, results[t_hash]) for (question, answer), t_hash in zip(pairs, keys)])
+
+@app.route('/interview-turn', methods=['POST'])
+def interview_turn():
+    data = request.get_json(silent=True)
     
-    if existing_response:
-        # If response exists, load it from the file
-        response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, existing_response.response_file)
-        
-        if os.path.exists(response_file_path):
-            try:
-                with open(response_file_path, 'r', encoding='utf-8') as f:
-                    cached_response = json.load(f)
-                
-                return jsonify({
-                    'success': True,
-                    'message': 'Interview analysis retrieved from cache',
-                    'analysis': cached_response,
-                    'cached': True
-                }), 200
-            except Exception as e:
-                # If there's an error reading the cache, we'll regenerate
-                print(f"Error reading cached interview response: {str(e)}")
+    if not data or not data.get('sessionId') or 'turnIndex' not in data or 'answer' not in data:
+        return jsonify({'error': 'sessionId, turnIndex and answer are required'}), 400
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    error = check_llm_quota(user_id)
+    if error:
+        return error
     
     try:
-        # Initialize Gemini client
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
-        
-        # Define the model
-        model = "gemini-2.0-flash"
-        
-        # Format the conversation for analysis
-        formatted_conversation = ""
-        for entry in conversation_log:
-            speaker = entry.get('speaker', '')
-            text = entry.get('text', '')
-            entry_type = entry.get('type', '')
-            
-            formatted_conversation += f"{speaker.upper()}: [{entry_type}] {text}\n\n"
-        
-        # Prepare the analysis prompt
-        analysis_prompt = """
+        turn_index = int(data.get('turnIndex'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'turnIndex must be an integer'}), 400
+    
+    session_id = str(data.get('sessionId'))[:64]
+    question = str(data.get('question') or '')
+    answer = str(data.get('answer') or '')
+    t_hash = turn_key(question, answer)
+    
+    # Record the turn, a re-posted turn index replaces the earlier answer
+    turn = InterviewTurn.query.filter_by(session_id=session_id, turn_index=turn_index).first()
+    
+    if turn and turn.user_id != user_id:
+        return jsonify({'error': 'Session belongs to another user'}), 403
+    
+    try:
+        if turn:
+            turn.question = question
+            turn.answer = answer
+            turn.turn_hash = t_hash
+        else:
+            db.session.add(InterviewTurn(
+                user_id=user_id,
+                session_id=session_id,
+                turn_index=turn_index,
+                question=question,
+                answer=answer,
+                turn_hash=t_hash
+            ))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Turn was recorded concurrently, please retry'}), 409
+    
+    # Score the turn in the background unless it is already cached
+    cached = db.session.query(InterviewTurnEvaluation.id).filter_by(turn_hash=t_hash).first() is not None
+    
+    if not cached:
+        submit_turn_scoring(t_hash, question, answer)
+    
+    return jsonify({
+        'message': 'Turn recorded',
+        'turnHash': t_hash,
+        'status': 'scored' if cached else 'pending'
+    }), 202
+
+# Model (see model_routing) and prompt of the one-shot interview analysis
+INTERVIEW_MODEL = model_routing.model('interview_analysis')
+INTERVIEW_ANALYSIS_PROMPT = """
         You are an expert interview coach analyzing an interview conversation.
         Analyze the following interview conversation and provide feedback in JSON format with the following structure:
         
@@ -1229,86 +2389,151 @@ def interview_analyze():
         Do not include any text outside the JSON structure. Only return the JSON object.
         Be fair but constructive in your assessment. Consider both technical accuracy and communication skills.
         """
+# What the mock interview page needs of an analysis
+INTERVIEW_SHAPE = {'metrics': dict}
+INTERVIEW_CACHE_VERSION = cache_versions.version(INTERVIEW_MODEL, INTERVIEW_ANALYSIS_PROMPT, INTERVIEW_SHAPE)
+
+def generate_interview_analysis(conversation_hash, conversation_log):
+    """Analyze a whole interview in one call; returns the analysis. Raises
+    ValueError if the model's JSON can't be repaired."""
+    # Format the conversation for analysis, compacted to the token budget
+    compaction = compact_conversation_cached(conversation_hash, conversation_log)
+    formatted_conversation = compaction['text']
+    
+    if compaction['tokens'] < compaction['original_tokens']:
+        print(f"Interview transcript compacted from {compaction['original_tokens']} to {compaction['tokens']} tokens")
+    
+    # Generate content
+    response_text = model_routing.generate(
+        'interview_analysis',
+        f"{INTERVIEW_ANALYSIS_PROMPT}\n\nInterview Conversation:\n{formatted_conversation}",
+    )
+    
+    # Repaired locally if malformed, or by a short fix call to the model
+    return json_repair.parse(response_text, 'interview', INTERVIEW_SHAPE, fix=model_routing.fixer('interview_analysis'))
+
+def save_interview_analysis(user_id, conversation_hash, analysis_json):
+    """Cache an interview analysis in RESPONSE_CACHE_FOLDER"""
+    saved = store_cache_entry(
+        InterviewResponse, {'user_id': user_id, 'conversation_hash': conversation_hash},
+        f"interview_{user_id}_", json.dumps(analysis_json, ensure_ascii=False, indent=2),
+        'interview', INTERVIEW_CACHE_VERSION,
+    )
+    record_scores('interview', saved.id, user_id, None, score_tables.interview_scores(analysis_json))
+    return saved
+
+def refresh_interview_analysis(user_id, conversation_hash, conversation_log):
+    """Replace a stale cached interview analysis with a current one"""
+    existing_response = InterviewResponse.query.filter_by(user_id=user_id, conversation_hash=conversation_hash).first()
+    if existing_response and cached_version('interview', existing_response.id) == INTERVIEW_CACHE_VERSION:
+        return
+    save_interview_analysis(user_id, conversation_hash, generate_interview_analysis(conversation_hash, conversation_log))
+
+@app.route('/interview-analyze', methods=['POST'])
+def interview_analyze():
+    # Users wait on these, so their model calls go ahead of other work
+    llm_scheduler.set_lane('interactive')
+    
+    data = request.get_json(silent=True)
+    
+    if not data or 'conversationLog' not in data:
+        return jsonify({'error': 'Email and conversation log are required'}), 400
+    
+    conversation_log = data.get('conversationLog', [])
+    
+    # Validate conversation log
+    if not isinstance(conversation_log, list) or len(conversation_log) == 0:
+        return jsonify({'error': 'Invalid conversation log format'}), 400
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    error = check_llm_quota(user_id)
+    if error:
+        return error
+    
+    # Incremental mode: turns were posted and scored during the interview,
+    # so the analysis only aggregates the cached turn results
+    session_id = data.get('sessionId')
+    
+    if session_id:
+        analysis = aggregate_interview_session(user_id, str(session_id)[:64], conversation_log)
         
-        # Create the content structure
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=f"{analysis_prompt}\n\nInterview Conversation:\n{formatted_conversation}"),
-                ],
-            ),
-        ]
-        
-        # Set response configuration
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-        )
-        
-        # Generate content
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        )
+        if analysis is not None:
+            record_scores('interview', f"session:{str(session_id)[:64]}", user_id, None,
+                          score_tables.interview_scores(analysis))
+            return jsonify({
+                'success': True,
+                'message': 'Interview analysis built from per-turn results',
+                'analysis': analysis,
+                'cached': True,
+                'incremental': True
+            }), 200
+    
+    # Create a hash of the conversation log to use as a cache key
+    conversation_json = json.dumps(conversation_log, sort_keys=True)
+    import hashlib
+    conversation_hash = hashlib.md5(conversation_json.encode()).hexdigest()
+    
+    # Check if we have a cached response for this conversation
+    existing_response = InterviewResponse.query.filter_by(
+        user_id=user_id, 
+        conversation_hash=conversation_hash
+    ).first()
+    
+    if existing_response:
+        # If response exists, load it from the file
+        response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, existing_response.response_file)
         
-        # Clean up response to ensure valid JSON
-        result = response.text
-        # Strip any Markdown code block markers if present
-        if result.startswith("```json"):
-            result = result.replace("```json", "", 1)
-        if result.endswith("```"):
-            result = result.replace("```", "", 1)
-        result = result.strip()
+        # Made with an older prompt, model or schema: serve it while a
+        # current one is generated in the background, or regenerate now
+        stale = cached_version('interview', existing_response.id) != INTERVIEW_CACHE_VERSION
+        if stale:
+            cache_versions.record_mismatch('interview')
         
-        # Parse the JSON to validate and return
+        if os.path.exists(response_file_path) and (not stale or cache_versions.CACHE_STALE_WHILE_REVALIDATE):
+            try:
+                with tracing.span('cache_read'), open(response_file_path, 'r', encoding='utf-8') as f:
+                    cached_response = json.load(f)
+                
+                if stale:
+                    background.submit(app, f"interview-analysis:{user_id}:{conversation_hash}",
+                                      refresh_interview_analysis, user_id, conversation_hash, conversation_log)
+                
+                return jsonify({
+                    'success': True,
+                    'message': 'Interview analysis retrieved from cache',
+                    'analysis': cached_response,
+                    'cached': True,
+                    'stale': stale
+                }), 200
+            except Exception as e:
+                # If there's an error reading the cache, we'll regenerate
+                print(f"Error reading cached interview response: {str(e)}")
+    
+    try:
         try:
-            analysis_json = json.loads(result)
-            
-            # Save the response to a file
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            response_filename = f"interview_{timestamp}_{user.id}.json"
-            response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, response_filename)
-            
-            with open(response_file_path, 'w', encoding='utf-8') as f:
-                json.dump(analysis_json, f, ensure_ascii=False, indent=2)
-            
-            # Save the response metadata to the database
-            if existing_response:
-                # Update existing response
-                old_file_path = os.path.join(RESPONSE_CACHE_FOLDER, existing_response.response_file)
-                if os.path.exists(old_file_path):
-                    try:
-                        os.remove(old_file_path)
-                    except:
-                        pass
-                existing_response.response_file = response_filename
-                existing_response.created_at = datetime.utcnow()
-            else:
-                # Create new response record
-                interview_response = InterviewResponse(
-                    user_id=user.id,
-                    conversation_hash=conversation_hash,
-                    response_file=response_filename
-                )
-                db.session.add(interview_response)
-            
-            db.session.commit()
-            
-            return jsonify({
-                "success": True,
-                "message": "Interview analysis completed successfully",
-                "analysis": analysis_json,
-                "cached": False
-            }), 200
-        except json.JSONDecodeError as e:
-            db.session.rollback()
+            with cancellation.cached_work():
+                analysis_json = generate_interview_analysis(conversation_hash, conversation_log)
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "message": f"Error parsing analysis result: {str(e)}",
-                "raw_response": result
+                "message": f"Error parsing analysis result: {str(e)}"
             }), 500
+        
+        save_interview_analysis(user_id, conversation_hash, analysis_json)
+        
+        return jsonify({
+            "success": True,
+            "message": "Interview analysis completed successfully",
+            "analysis": analysis_json,
+            "cached": False
+        }), 200
     
+    except llm_scheduler.ModelUnavailable as e:
+        return model_unavailable(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -1316,10 +2541,382 @@ def interview_analyze():
             "message": f"Error analyzing interview: {str(e)}"
         }), 500
 
+_score_backfill_started = False
+
+def backfill_score_tables():
+    """Parse the scores of analyses cached before the resume_score table existed"""
+    count = 0
+    dashboards = db.session.query(ResumeResponse, ResumeFile).join(
+        ResumeFile, ResumeFile.id == ResumeResponse.resume_file_id
+    ).outerjoin(ResumeScore, and_(
+        ResumeScore.source == 'dashboard',
+        ResumeScore.source_ref == db.cast(ResumeResponse.resume_file_id, db.String),
+    )).filter(ResumeScore.id.is_(None)).all()
+    for response, resume in dashboards:
+        file_path = os.path.join(RESPONSE_CACHE_FOLDER, response.response_file)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            record_dashboard_scores(resume, f.read(), response.created_at)
+        count += 1
+    
+    interviews = db.session.query(InterviewResponse).outerjoin(ResumeScore, and_(
+        ResumeScore.source == 'interview',
+        ResumeScore.source_ref == db.cast(InterviewResponse.id, db.String),
+    )).filter(ResumeScore.id.is_(None)).all()
+    for response in interviews:
+        file_path = os.path.join(RESPONSE_CACHE_FOLDER, response.response_file)
+        if not os.path.exists(file_path):
+            continue
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                analysis = json.load(f)
+        except ValueError:
+            continue
+        record_scores('interview', response.id, response.user_id, None,
+                      score_tables.interview_scores(analysis), response.created_at)
+        count += 1
+    return count
+
+def start_score_backfill():
+    global _score_backfill_started
+    if not _score_backfill_started:
+        _score_backfill_started = True
+        background.submit(app, 'score-backfill', backfill_score_tables)
+
+def parse_date_param(data, name):
+    """An ISO date from the request body, or None; raises ValueError"""
+    if not data.get(name):
+        return None
+    return datetime.fromisoformat(str(data[name]))
+
+@app.route('/analytics/scores', methods=['POST'])
+def analytics_scores():
+    data = request.get_json(silent=True)
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    email = db.session.query(User.email).filter_by(id=user_id).scalar()
+    if not email or email.lower() not in RECRUITER_EMAILS:
+        return jsonify({'error': 'Recruiter access required'}), 403
+    
+    data = data or {}
+    bucket = data.get('bucket', 'week')
+    if bucket not in score_tables.TREND_BUCKETS:
+        return jsonify({'error': f"bucket must be one of {', '.join(score_tables.TREND_BUCKETS)}"}), 400
+    try:
+        since = parse_date_param(data, 'since')
+        until = parse_date_param(data, 'until')
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO dates'}), 400
+    
+    start_score_backfill()
+    start = time.time()
+    
+    query = db.session.query(ResumeScore.category, ResumeScore.score, ResumeScore.created_at)
+    if data.get('categories'):
+        query = query.filter(ResumeScore.category.in_([str(c) for c in data['categories']]))
+    if data.get('sources'):
+        query = query.filter(ResumeScore.source.in_([str(s) for s in data['sources']]))
+    if since:
+        query = query.filter(ResumeScore.created_at >= since)
+    if until:
+        query = query.filter(ResumeScore.created_at < until)
+    if data.get('latestOnly'):
+        # Only scores of each candidate's newest resume
+        newest = db.session.query(
+            ResumeFile.user_id, db.func.max(ResumeFile.upload_date).label('upload_date')
+        ).group_by(ResumeFile.user_id).subquery()
+        latest_ids = db.session.query(ResumeFile.id).join(newest, and_(
+            ResumeFile.user_id == newest.c.user_id,
+            ResumeFile.upload_date == newest.c.upload_date,
+        ))
+        query = query.filter(ResumeScore.resume_file_id.in_(latest_ids))
+    rows = query.all()
+    
+    categories = [row[0] for row in rows]
+    scores = [row[1] for row in rows]
+    times = [posix_time(row[2]) for row in rows]
+    with tracing.span('aggregate'):
+        result = score_tables.aggregate(categories, scores, times, bucket) if rows else {}
+    metrics.observe('analytics_scores_seconds', time.time() - start)
+    
+    return jsonify({
+        'categories': result,
+        'total': len(rows),
+        'bucket': bucket
+    }), 200
+
+@app.route('/user/scores', methods=['POST'])
+def user_scores():
+    data = request.get_json(silent=True)
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    query = ResumeScore.query.filter_by(user_id=user_id)
+    if (data or {}).get('category'):
+        query = query.filter_by(category=str(data['category']))
+    
+    # Oldest first, grouped by category
+    history = {}
+    for row in query.order_by(ResumeScore.created_at, ResumeScore.id).all():
+        entry = row.to_dict()
+        history.setdefault(entry.pop('category'), []).append(entry)
+    
+    return jsonify({'history': history}), 200
+
+# First load of the dashboard in one request (/bootstrap): resumes listed
+# and artifacts looked up at the same time on these threads
+BOOTSTRAP_RESUMES = int(os.environ.get('BOOTSTRAP_RESUMES', 5))
+BOOTSTRAP_WORKERS = int(os.environ.get('BOOTSTRAP_WORKERS', 4))
+# Seconds /bootstrap waits for its lookups
+BOOTSTRAP_TIMEOUT = float(os.environ.get('BOOTSTRAP_TIMEOUT', 10))
+
+background.add_lane('bootstrap', max(1, BOOTSTRAP_WORKERS))
+
+# Artifacts generated in the background when /bootstrap finds them missing;
+# a job handle is "<kind>:<resume id>"
+ARTIFACT_JOBS = ('dashboard', 'question-pool')
+# Seconds before a failed job is tried again, doubled with each failure in
+# a row up to ARTIFACT_RETRY_MAX
+ARTIFACT_RETRY_AFTER = float(os.environ.get('ARTIFACT_RETRY_AFTER', 60))
+ARTIFACT_RETRY_MAX = float(os.environ.get('ARTIFACT_RETRY_MAX', 3600))
+
+def latest_resume_of(user_id):
+    return ResumeFile.query.filter_by(user_id=user_id).order_by(ResumeFile.upload_date.desc()).first()
+
+def artifact_ready(kind, resume_id):
+    if kind == 'dashboard':
+        return (db.session.query(ResumeResponse.id).filter_by(resume_file_id=resume_id).first() is not None
+                and cached_version('dashboard', resume_id) == DASHBOARD_CACHE_VERSION)
+    return db.session.query(InterviewQuestionSet.id).filter_by(resume_file_id=resume_id).first() is not None
+
+def record_artifact_failure(job, error):
+    try:
+        failure = ArtifactJobFailure.query.filter_by(job=job).first()
+        if failure:
+            failure.error = error[:1000]
+            failure.failures += 1
+            failure.failed_at = datetime.utcnow()
+        else:
+            db.session.add(ArtifactJobFailure(job=job, error=error[:1000]))
+        db.session.commit()
+    except IntegrityError:
+        # Recorded by another worker at the same time
+        db.session.rollback()
+    metrics.incr('artifact_job_failures')
+
+def artifact_failure(job):
+    """Status of a job that failed and is still backing off, else None"""
+    failure = ArtifactJobFailure.query.filter_by(job=job).first()
+    if failure is None:
+        return None
+    backoff = min(ARTIFACT_RETRY_MAX, ARTIFACT_RETRY_AFTER * 2 ** (failure.failures - 1))
+    retry_after = backoff - (datetime.utcnow() - failure.failed_at).total_seconds()
+    if retry_after <= 0:
+        return None
+    return {'status': 'failed', 'job': job, 'reason': failure.error, 'retry_after': int(retry_after) + 1}
+
+def run_artifact_job(kind, resume_id):
+    """Generate an artifact, recording a failure if nothing came of it"""
+    job = f"{kind}:{resume_id}"
+    try:
+        if kind == 'dashboard':
+            refresh_dashboard_analysis(resume_id)
+        else:
+            refill_question_pool(resume_id)
+    except (llm_scheduler.QuotaExceeded, llm_scheduler.QueueTimeout):
+        # Out of quota or capacity, not the job's fault; no model call was made
+        raise
+    except Exception as e:
+        db.session.rollback()
+        record_artifact_failure(job, str(e) or type(e).__name__)
+        raise
+    if not artifact_ready(kind, resume_id):
+        # E.g. the upload is gone, or a newer resume replaced this one
+        record_artifact_failure(job, 'Nothing was generated')
+    else:
+        ArtifactJobFailure.query.filter_by(job=job).delete(synchronize_session=False)
+        db.session.commit()
+
+def start_artifact_job(kind, resume_id, user_id, lane='default'):
+    """Generate a missing artifact in the background; returns its status.
+    A job that failed recently is reported as failed, not started again."""
+    job = f"{kind}:{resume_id}"
+    failed = artifact_failure(job)
+    if failed:
+        return failed
+    try:
+        llm_scheduler.check_quota(user_id)
+    except llm_scheduler.QuotaExceeded as e:
+        return {'status': 'unavailable', 'reason': str(e)}
+    if kind == 'dashboard':
+        background.submit_to(lane, app, job, run_artifact_job, kind, resume_id)
+    elif QUESTION_POOL_SIZE > 0:
+        background.submit_to('question-pool', app, f"question-pool:{resume_id}", run_artifact_job, kind, resume_id)
+    return {'status': 'pending', 'job': job}
+
+def bootstrap_user(user_id):
+    user = db.session.get(User, user_id)
+    return user.to_dict() if user else None
+
+def bootstrap_resumes(user_id):
+    rows = ResumeFile.query.filter_by(user_id=user_id).order_by(
+        ResumeFile.upload_date.desc(), ResumeFile.id.desc()
+    ).limit(BOOTSTRAP_RESUMES + 1).all()
+    next_cursor = None
+    if len(rows) > BOOTSTRAP_RESUMES:
+        rows = rows[:BOOTSTRAP_RESUMES]
+        next_cursor = encode_resume_cursor(rows[-1].upload_date, rows[-1].id)
+    return {'resumes': [row.to_dict() for row in rows], 'next_cursor': next_cursor}
+
+def bootstrap_dashboard(user_id):
+    resume = latest_resume_of(user_id)
+    if resume is None:
+        return {'status': 'no_resume'}
+    
+    response = ResumeResponse.query.filter_by(resume_file_id=resume.id).first()
+    response_file_path = os.path.join(RESPONSE_CACHE_FOLDER, response.response_file) if response else None
+    if response_file_path and os.path.exists(response_file_path):
+        stale = cached_version('dashboard', resume.id) != DASHBOARD_CACHE_VERSION
+        if stale:
+            cache_versions.record_mismatch('dashboard')
+        if not stale or cache_versions.CACHE_STALE_WHILE_REVALIDATE:
+            with open(response_file_path, 'r', encoding='utf-8') as f:
+                analysis = f.read()
+            if stale:
+                start_artifact_job('dashboard', resume.id, user_id)
+            return {'status': 'ready', 'analysis': analysis, 'stale': stale}
+    
+    if not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)):
+        return {'status': 'unavailable', 'reason': 'Resume file not found'}
+    return start_artifact_job('dashboard', resume.id, user_id)
+
+def bootstrap_jobs(user_id):
+    resume = latest_resume_of(user_id)
+    if resume is None:
+        return {'status': 'no_resume'}
+    
+    # Catalog matches are computed locally; without a catalog or readable
+    # text, the page asks /job/v1
+    index = job_catalog.get_index()
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)
+    text = get_resume_text(file_path) if index is not None and os.path.exists(file_path) else ''
+    if not text.strip():
+        return {'status': 'unavailable', 'reason': 'Use /job/v1'}
+    jobs = [dict(job, match=int(round(score * 100))) for job, score in index.search(text, job_catalog.JOB_TOP_K)]
+    return {'status': 'ready', 'analysis': json.dumps(jobs, ensure_ascii=False), 'source': 'catalog'}
+
+def bootstrap_questions(user_id):
+    resume = latest_resume_of(user_id)
+    if resume is None:
+        return {'status': 'no_resume'}
+    
+    # The set /interview-content/v1 will hand out next; it is not taken here
+    question_set = InterviewQuestionSet.query.filter_by(resume_file_id=resume.id).order_by(
+        InterviewQuestionSet.id
+    ).first()
+    if question_set is not None:
+        return {'status': 'ready', 'analysis': question_set.analysis, 'source': question_set.source}
+    if QUESTION_POOL_SIZE <= 0:
+        return {'status': 'unavailable', 'reason': 'Use /interview-content/v1'}
+    return start_artifact_job('question-pool', resume.id, user_id)
+
+@app.route('/bootstrap', methods=['POST'])
+def bootstrap():
+    data = request.get_json(silent=True)
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    # Independent lookups, each on its own thread and database session
+    lookups = {
+        'user': bootstrap_user,
+        'resumes': bootstrap_resumes,
+        'dashboard': bootstrap_dashboard,
+        'jobs': bootstrap_jobs,
+        'interviewQuestions': bootstrap_questions,
+    }
+    request_key = base64.urlsafe_b64encode(os.urandom(9)).decode()
+    with tracing.span('lookups'):
+        futures = {
+            name: background.submit_to('bootstrap', app, f"bootstrap:{request_key}:{name}", lookup, user_id)
+            for name, lookup in lookups.items()
+        }
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=BOOTSTRAP_TIMEOUT)
+            except Exception as e:
+                print(f"Bootstrap lookup {name} failed: {str(e)}")
+                results[name] = {'status': 'unavailable', 'reason': 'Lookup failed'}
+    
+    if results['user'] is None:
+        return jsonify({'error': 'User not found'}), 404
+    if 'status' in results['user'] or 'status' in results['resumes']:
+        return jsonify({'error': 'Error loading user data'}), 500
+    
+    resumes = results['resumes']
+    return jsonify({
+        'user': results['user'],
+        'resumes': resumes.get('resumes', []),
+        'next_cursor': resumes.get('next_cursor'),
+        'dashboard': results['dashboard'],
+        'jobs': results['jobs'],
+        'interviewQuestions': results['interviewQuestions']
+    }), 200
+
+@app.route('/jobs/status', methods=['POST'])
+def jobs_status():
+    data = request.get_json(silent=True)
+    
+    # Resolve the user from the bearer token, or by email
+    user_id, error = authenticate(data)
+    if error:
+        return error
+    
+    handles = (data or {}).get('jobs')
+    if not isinstance(handles, list) or not handles:
+        return jsonify({'error': 'jobs must be a list of job handles'}), 400
+    
+    statuses = {}
+    for handle in handles[:20]:
+        kind, _, resume_id = str(handle).rpartition(':')
+        resume = db.session.get(ResumeFile, int(resume_id)) if resume_id.isdigit() else None
+        if kind not in ARTIFACT_JOBS or resume is None or resume.user_id != user_id:
+            statuses[str(handle)] = {'status': 'unknown'}
+        elif artifact_ready(kind, resume.id):
+            statuses[str(handle)] = {'status': 'ready'}
+        else:
+            # Running in this worker, in another one, or lost with a
+            # restart: submitting again is a no-op if it is running here
+            statuses[str(handle)] = start_artifact_job(kind, resume.id, user_id)
+    
+    return jsonify({'jobs': statuses}), 200
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify(metrics.snapshot()), 200
+
 # Handle login_required errors
 @login_manager.unauthorized_handler
 def unauthorized():
     return jsonify({'error': 'Authentication required'}), 401
 
 if __name__ == '__main__':
+    # Only set up in the reloader's serving process, not the watcher
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        if DB_CREATE_TABLES:
+            with app.app_context():
+                create_missing_tables(db)
+        llm.warm_up()
+        job_catalog.warm_up()
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+# How long an issued token stays valid, in seconds (default 7 days)
+TOKEN_MAX_AGE = int(os.environ.get('TOKEN_MAX_AGE', 7 * 24 * 3600))
+TOKEN_SALT = 'zybercv-auth-token'
+
+SECRET_KEY_FILE = 'secret_key'
+
+
+def load_secret_key(instance_path):
+    """Return a secret key that is the same for every worker and restart.
+
+    SECRET_KEY from the environment wins (required when running on more
+    than one node). Otherwise a key is generated once and kept in the
+    instance folder so all workers on this machine share it.
+    """
+    secret_key = os.environ.get('SECRET_KEY')
+    if secret_key:
+        return secret_key
+
+    os.makedirs(instance_path, exist_ok=True)
+    key_path = os.path.join(instance_path, SECRET_KEY_FILE)
+
+    if not os.path.exists(key_path):
+        # Written to a file of its own, then linked into place: the key
+        # file never exists half-written, and if two workers start together
+        # only the first link succeeds and both read the same key
+        fd, temp_path = tempfile.mkstemp(dir=instance_path, prefix='.secret_key.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(os.urandom(32).hex())
+            os.link(temp_path, key_path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(temp_path)
+
+    with open(key_path, 'r') as f:
+        secret_key = f.read().strip()
+    if not secret_key:
+        raise RuntimeError(f"{key_path} is empty; delete it to generate a new key")
+    return secret_key
+
+
+def _serializer(secret_key):
+    return URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT)
+
+
+def issue_token(secret_key, user_id):
+    """Create a signed token carrying the user ID"""
+    return _serializer(secret_key).dumps({'uid': user_id})
+
+
+def verify_token(secret_key, token):
+    """Return the user ID from a token, or None if it is invalid or expired"""
+    try:
+        payload = _serializer(secret_key).loads(token, max_age=TOKEN_MAX_AGE)
+    except (SignatureExpired, BadSignature):
+        return None
+
+    if not isinstance(payload, dict) or not isinstance(payload.get('uid'), int):
+        return None
+
+    return payload['uid']
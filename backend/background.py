@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import llm_scheduler
+import metrics
+
+# Threads for work that runs after (or alongside) a request, e.g. scoring
+# interview turns while the interview is still going on
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', 4))
+
+# Work that can take a while and isn't waited on, like refilling question
+# pools, gets its own threads so it never delays interview turn scoring
+_executors = {
+    'default': ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='background'),
+}
+# Model calls made by background jobs wait in this llm_scheduler lane
+_llm_lanes = {'default': 'background'}
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def add_lane(name, workers, llm_lane='background'):
+    """Create a separate pool of worker threads for submit_to"""
+    with _pending_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"background-{name}")
+            _llm_lanes[name] = llm_lane
+
+
+def submit(app, key, func, *args, **kwargs):
+    """Run func in a background thread inside an app context.
+
+    Only one job per key runs at a time: submitting a key that is already
+    pending returns the existing future instead of starting a second job.
+    """
+    return submit_to('default', app, key, func, *args, **kwargs)
+
+
+def submit_to(lane, app, key, func, *args, **kwargs):
+    """submit, on the threads of a lane created with add_lane"""
+    with _pending_lock:
+        future = _pending.get(key)
+        if future is not None:
+            return future
+
+        submitted = time.time()
+        # Model calls count against the user of the submitting request
+        user, _ = llm_scheduler.current()
+        llm_lane = _llm_lanes[lane]
+
+        def run():
+            metrics.observe('background_queue_wait_seconds', time.time() - submitted)
+            llm_scheduler.set_context(user, llm_lane)
+            with app.app_context():
+                try:
+                    return func(*args, **kwargs)
+                except llm_scheduler.ModelUnavailable as e:
+                    # Over quota or no capacity: expected, not a bug
+                    metrics.incr('background_skipped')
+                    print(f"Background job {key} skipped: {str(e)}")
+                    raise
+                except Exception:
+                    metrics.incr('background_errors')
+                    traceback.print_exc()
+                    raise
+                finally:
+                    with _pending_lock:
+                        _pending.pop(key, None)
+
+        future = _executors[lane].submit(run)
+        _pending[key] = future
+        metrics.incr('background_submitted')
+        return future
+
+
+def get(key):
+    """Return the future for a pending job, or None"""
+    with _pending_lock:
+        return _pending.get(key)
+
+
+def drain(timeout):
+    """Wait for pending jobs to finish, up to timeout seconds.
+
+    Returns True if nothing is left running.
+    """
+    with _pending_lock:
+        futures = list(_pending.values())
+    if not futures:
+        return True
+    _, not_done = wait(futures, timeout=timeout)
+    return not not_done
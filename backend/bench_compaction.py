@@ -0,0 +1,86 @@
+"""Benchmark interview transcript compaction on synthetic long logs.
+
+Compares the old approach (string += over every entry, no budget) with
+compact_conversation() on logs of up to 10k turns, and shows the effect
+of the compaction cache on repeated calls.
+
+    python bench_compaction.py [--turns 10000] [--budget 8000]
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+
+from conversation_compaction import compact_conversation, compact_conversation_cached, count_tokens
+
+WORDS = ("react state component api latency database index cache team project "
+         "deadline customer design review testing deploy python scale queue").split()
+
+
+def synthetic_log(turns, seed=0):
+    rng = random.Random(seed)
+    log = []
+    for i in range(turns):
+        if i % 2 == 0:
+            text = f"Question {i // 2}: how did you handle {' '.join(rng.choices(WORDS, k=8))}?"
+            log.append({'speaker': 'ai', 'text': text, 'type': 'question'})
+        else:
+            sentences = [' '.join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + '.'
+                         for _ in range(rng.randint(2, 6))]
+            log.append({'speaker': 'user', 'text': ' '.join(sentences), 'type': 'answer'})
+    return log
+
+
+def format_concat(conversation_log):
+    # What interview_analyze did before
+    formatted_conversation = ""
+    for entry in conversation_log:
+        speaker = entry.get('speaker', '')
+        text = entry.get('text', '')
+        entry_type = entry.get('type', '')
+        formatted_conversation += f"{speaker.upper()}: [{entry_type}] {text}\n\n"
+    return formatted_conversation
+
+
+def timed(func, *args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=10000)
+    parser.add_argument('--budget', type=int, default=8000)
+    args = parser.parse_args()
+
+    print(f"budget {args.budget} tokens")
+    print(f"{'turns':>7}{'concat ms':>11}{'tokens':>9}"
+          f"{'summarize ms':>14}{'tokens':>8}{'truncate ms':>13}{'tokens':>8}{'cached ms':>11}")
+
+    sizes = sorted({n for n in (100, 1000, args.turns) if n <= args.turns})
+    for turns in sizes:
+        log = synthetic_log(turns)
+        conversation_hash = hashlib.md5(json.dumps(log, sort_keys=True).encode()).hexdigest()
+
+        concat_text, concat_time = timed(format_concat, log)
+        summarized, summarize_time = timed(compact_conversation, log, args.budget, 'summarize')
+        truncated, truncate_time = timed(compact_conversation, log, args.budget, 'truncate')
+
+        # First call fills the cache, the timed ones hit it
+        compact_conversation_cached(conversation_hash, log, args.budget)
+        _, cached_time = timed(compact_conversation_cached, conversation_hash, log, args.budget)
+
+        print(f"{turns:>7}{concat_time * 1000:>11.2f}{count_tokens(concat_text):>9}"
+              f"{summarize_time * 1000:>14.2f}{summarized['tokens']:>8}"
+              f"{truncate_time * 1000:>13.2f}{truncated['tokens']:>8}"
+              f"{cached_time * 1000:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
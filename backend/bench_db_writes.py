@@ -0,0 +1,102 @@
+"""Concurrent write stress test for the database layer.
+
+Runs the same workload (threads inserting rows and committing, the way
+uploads and cache-metadata writes do) against a SQLite database with the
+old defaults and with the tuned settings from database.py, then prints the
+write throughput and the number of "database is locked" failures for each.
+
+    python bench_db_writes.py [--threads 16] [--writes 200]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from database import engine_options, register_pragmas
+
+Base = declarative_base()
+
+
+class BenchRow(Base):
+    __tablename__ = 'bench_row'
+
+    id = Column(Integer, primary_key=True)
+    worker = Column(Integer, nullable=False)
+    payload = Column(String(255), nullable=False)
+    created_at = Column(DateTime)
+
+
+def make_default_engine(url):
+    # What the app used before: rollback journal, FULL sync, sqlite3's
+    # 5 second busy handler and no explicit pool settings
+    return create_engine(url)
+
+
+def make_tuned_engine(url):
+    engine = create_engine(url, **engine_options(url))
+    register_pragmas(engine)
+    return engine
+
+
+def run_workload(engine, threads, writes):
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    errors = []
+
+    def worker(worker_id):
+        session = Session()
+        for i in range(writes):
+            try:
+                session.add(BenchRow(worker=worker_id, payload=f"{worker_id}-{i}"))
+                session.commit()
+            except OperationalError as e:
+                session.rollback()
+                errors.append(str(e))
+        session.close()
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+
+    committed = threads * writes - len(errors)
+    return {
+        'journal_mode': journal_mode,
+        'elapsed': elapsed,
+        'committed': committed,
+        'errors': len(errors),
+        'writes_per_sec': committed / elapsed if elapsed else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.writes} commits each")
+    print(f"{'mode':<10}{'journal':<10}{'seconds':>10}{'commits':>10}{'errors':>8}{'writes/s':>12}")
+
+    for name, factory in (('default', make_default_engine), ('tuned', make_tuned_engine)):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            result = run_workload(factory(url), args.threads, args.writes)
+        print(f"{name:<10}{result['journal_mode']:<10}{result['elapsed']:>10.2f}"
+              f"{result['committed']:>10}{result['errors']:>8}{result['writes_per_sec']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
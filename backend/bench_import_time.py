@@ -0,0 +1,73 @@
+"""Import-time report and cold-start guard for the backend.
+
+Imports app.py in a fresh interpreter with -X importtime and prints the
+total plus the slowest top-level imports. With --max-ms it exits non-zero
+when the import takes longer than the budget, so it can run in CI.
+
+    python bench_import_time.py [--top 15] [--runs 3] [--max-ms 1500]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be imported at startup
+LAZY_MODULES = ('google.genai', 'google.generativeai')
+
+
+def measure():
+    """Return {module: (self_us, cumulative_us, depth)} for one cold import of app"""
+    env = dict(os.environ, LLM_WARMUP='0')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help='number of imports to list')
+    parser.add_argument('--runs', type=int, default=3, help='take the fastest of this many runs')
+    parser.add_argument('--max-ms', type=float, help='fail if importing app takes longer')
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    best = min(runs, key=lambda modules: modules['app'][1])
+    total_ms = best['app'][1] / 1000
+
+    print(f"import app: {total_ms:.0f} ms (best of {args.runs})")
+    print(f"{'cumulative ms':>14}  module")
+    # Direct imports of app are one level deeper than app itself
+    app_depth = best['app'][2]
+    top_level = [(name, cumulative) for name, (_, cumulative, depth) in best.items()
+                 if depth == app_depth + 1]
+    for name, cumulative in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    failed = False
+    eager = [name for name in best if name.startswith(LAZY_MODULES)]
+    if eager:
+        print(f"FAIL: imported at startup, should be lazy: {', '.join(sorted(eager)[:5])}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: {total_ms:.0f} ms is over the {args.max_ms:.0f} ms budget")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark job catalog matching on a synthetic catalog.
+
+Builds an index of N generated jobs, then times searches with a sample
+resume text and a reload after a small part of the catalog changed (only
+changed jobs are re-tokenized).
+
+    python bench_job_catalog.py [--jobs 100000] [--searches 50]
+"""
+import argparse
+import random
+import statistics
+import time
+
+import job_catalog
+from skills import SKILLS
+
+WORDS = ("build design maintain scalable services customers platform data pipelines "
+         "dashboards apis mobile web cloud secure reliable teams product features "
+         "performance monitoring automation testing deployment analytics").split()
+
+RESUME = """
+Jane Doe - Frontend Developer
+Skills: JavaScript, React, TypeScript, HTML, CSS, Tailwind, Figma, Git
+Built responsive dashboards in React and TypeScript, improved page load by 40%.
+Worked with REST APIs and Node.js, wrote unit tests with Jest.
+"""
+
+
+def synthetic_jobs(count, seed=0):
+    rng = random.Random(seed)
+    skill_names = list(SKILLS)
+    jobs = []
+    for i in range(count):
+        skills = rng.sample(skill_names, 5)
+        jobs.append({
+            'id': i + 1,
+            'title': f"{rng.choice(skills).title()} {rng.choice(['Developer', 'Engineer', 'Analyst'])}",
+            'company': f"Company {rng.randint(1, 5000)}",
+            'skills': skills,
+            'description': ' '.join(rng.choices(WORDS, k=25)),
+            'salary': '',
+            'requiredSkillDetails': {},
+        })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--searches', type=int, default=50)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+
+    start = time.perf_counter()
+    index = job_catalog.build_index(jobs)
+    print(f"build:   {len(index)} jobs, {len(index.vocabulary)} terms, "
+          f"{len(index.weights)} weights in {time.perf_counter() - start:.2f}s")
+
+    timings = []
+    for _ in range(args.searches):
+        start = time.perf_counter()
+        results = index.search(RESUME, 10)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"search:  p50 {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms")
+    for job, score in results[:3]:
+        print(f"         {score:.3f} {job['title']} ({', '.join(job['skills'])})")
+
+    # Change 1% of the jobs and rebuild, reusing cached term counts
+    changed = list(jobs)
+    for i in range(0, len(changed), 100):
+        changed[i] = dict(changed[i], description=changed[i]['description'] + ' remote')
+    start = time.perf_counter()
+    job_catalog.build_index(changed)
+    print(f"reload:  1% changed in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
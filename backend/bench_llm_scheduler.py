@@ -0,0 +1,82 @@
+"""Benchmark the model call scheduler with simulated calls.
+
+One heavy user sends a burst of calls, a few light users send a handful
+each, and a flood of background jobs runs alongside; a few interactive
+calls arrive once everything is queued. Each call holds its slot for a
+fixed time, like the stub provider. Prints the queue wait per group, with
+the scheduler and with plain first come, first served.
+
+    python bench_llm_scheduler.py [--slots 8] [--latency 0.05]
+"""
+import argparse
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from llm_scheduler import Scheduler
+
+
+def run(scheduler, fair, latency, heavy_calls, light_users, background_calls):
+    waits = defaultdict(list)
+    lock = threading.Lock()
+
+    def call(group, user, lane, cost):
+        if not fair:
+            # Same user, lane and cost for everyone: served in arrival order
+            user, lane, cost = None, 'standard', 1
+        start = time.perf_counter()
+        with scheduler.slot(user, lane, cost, timeout=600):
+            waited = time.perf_counter() - start
+            time.sleep(latency)
+        with lock:
+            waits[group].append(waited)
+
+    threads = []
+
+    def spawn(*args):
+        thread = threading.Thread(target=call, args=args)
+        thread.start()
+        threads.append(thread)
+
+    for _ in range(heavy_calls):
+        spawn('heavy user', 1, 'standard', 4000)
+    for _ in range(background_calls):
+        spawn('background', None, 'background', 2000)
+    for user in range(light_users):
+        for _ in range(4):
+            spawn('light users', 100 + user, 'standard', 1000)
+    time.sleep(latency / 2)
+    for user in range(4):
+        spawn('interactive', 200 + user, 'interactive', 3000)
+
+    for thread in threads:
+        thread.join()
+    return waits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--slots', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--heavy-calls', type=int, default=200)
+    parser.add_argument('--light-users', type=int, default=10)
+    parser.add_argument('--background-calls', type=int, default=100)
+    args = parser.parse_args()
+
+    cases = [
+        ('fifo', False, Scheduler(slots=args.slots)),
+        ('scheduler', True, Scheduler(slots=args.slots, user_slots=2, background_slots=max(1, args.slots // 2))),
+    ]
+    for name, fair, scheduler in cases:
+        start = time.perf_counter()
+        waits = run(scheduler, fair, args.latency, args.heavy_calls, args.light_users, args.background_calls)
+        print(f"{name}: all calls done in {time.perf_counter() - start:.1f}s")
+        for group in ('interactive', 'light users', 'heavy user', 'background'):
+            samples = waits[group]
+            print(f"    {group:12} wait p50 {statistics.median(samples) * 1000:7.0f} ms, "
+                  f"max {max(samples) * 1000:7.0f} ms ({len(samples)} calls)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark recruiter-side resume ranking on a synthetic corpus.
+
+Fills a ResumeIndex with N synthetic resumes (term counts drawn from a
+Zipf-like vocabulary plus a few skills each), then times ranking a job
+description, with and without filters, and adding resumes one at a time
+the way uploads do.
+
+    python bench_resume_ranking.py [--resumes 100000] [--queries 20]
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+from collections import Counter
+
+from resume_index import ResumeIndex, rank
+from skills import SKILLS
+from text_features import term_counts
+
+JOB_DESCRIPTION = """
+Senior Backend Engineer. We are looking for an engineer with strong Python
+and Django experience, PostgreSQL, Redis and Docker. You will design REST
+APIs, run services on AWS with Kubernetes and mentor a small team.
+"""
+
+
+def synthetic_counts(rng, vocabulary, cum_weights, skill_terms):
+    counts = Counter()
+    for word in rng.choices(vocabulary, cum_weights=cum_weights, k=400):
+        counts[word] += 1
+    for skill in rng.sample(skill_terms, 8):
+        counts[skill] += rng.randint(1, 4) * 3
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(20000)] + ['python', 'django', 'backend', 'engineer', 'apis']
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocabulary))))
+    skill_terms = [f"skill:{skill}" for skill in SKILLS]
+
+    index = ResumeIndex()
+    start = time.perf_counter()
+    for i in range(args.resumes):
+        index.add(i + 1, i // 2 + 1, float(i), synthetic_counts(rng, vocabulary, cum_weights, skill_terms), row_id=i + 1)
+    print(f"add:     {args.resumes} resumes in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index.scores(Counter())
+    print(f"seal:    {len(index.segments)} segment(s) in {time.perf_counter() - start:.2f}s")
+
+    counts = term_counts(JOB_DESCRIPTION)
+    cases = [
+        ('all', {}),
+        ('latest only', {'latest_only': True}),
+        ('python+docker', {'required_terms': ['skill:python', 'skill:docker']}),
+    ]
+    for name, filters in cases:
+        timings = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            mask = index.filter_mask(**filters) if filters else None
+            page, total = rank(index, counts, mask, limit=20)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"rank:    {name:14} p50 {statistics.median(timings):6.1f} ms, "
+              f"max {max(timings):6.1f} ms, {total} matches")
+
+    # Uploads: one new resume, then a ranking that includes it
+    timings = []
+    for i in range(args.queries):
+        resume_id = args.resumes + i + 1
+        start = time.perf_counter()
+        index.add(resume_id, resume_id, float(resume_id), synthetic_counts(rng, vocabulary, cum_weights, skill_terms))
+        rank(index, counts, limit=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"upload+rank:   p50 {statistics.median(timings):6.1f} ms, max {max(timings):6.1f} ms, "
+          f"{len(index.segments)} segment(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Compare gunicorn worker models under the stub LLM provider.
+
+Starts the backend with gunicorn.conf.py once per worker model, sends a
+burst of concurrent /interview-content/v1 requests (each one holds the
+worker for LLM_STUB_LATENCY seconds, like a real generation) and prints
+throughput and latency for each.
+
+    python bench_serving.py [--requests 200] [--concurrency 50] [--latency 1.0]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_EMAIL = 'bench@example.com'
+
+# name -> gunicorn environment overrides
+WORKER_MODELS = {
+    'sync 4x1': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_WORKERS': '4', 'GUNICORN_THREADS': '1'},
+    'gthread 2x8': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_WORKERS': '2', 'GUNICORN_THREADS': '8'},
+    'gthread 2x32': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_WORKERS': '2', 'GUNICORN_THREADS': '32'},
+    'gevent 2x1000': {'GUNICORN_WORKER_CLASS': 'gevent', 'GUNICORN_WORKERS': '2', 'GUNICORN_WORKER_CONNECTIONS': '1000'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def setup_database(workdir, env):
+    # One user with one resume, created through the app's own models
+    script = (
+        "from app import app, db, User, ResumeFile\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        f"    user = User(name='Bench', email='{BENCH_EMAIL}')\n"
+        "    user.set_password('bench-password')\n"
+        "    db.session.add(user)\n"
+        "    db.session.commit()\n"
+        "    db.session.add(ResumeFile(filename='bench_resume.txt', user_id=user.id))\n"
+        "    db.session.commit()\n"
+    )
+    os.makedirs(os.path.join(workdir, 'uploads'), exist_ok=True)
+    # No known skills, so the question bank is skipped and every request
+    # goes to the model
+    with open(os.path.join(workdir, 'uploads', 'bench_resume.txt'), 'w') as f:
+        f.write('Bench Candidate\n')
+    subprocess.run([sys.executable, '-c', script], cwd=workdir, env=env, check=True)
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def send_request(port):
+    body = json.dumps({'email': BENCH_EMAIL}).encode()
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/interview-content/v1",
+        data=body,
+        headers={'Content-Type': 'application/json'},
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            response.read()
+            ok = response.status == 200
+    except Exception:
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+def run_model(name, overrides, args, workdir, env):
+    port = free_port()
+    server_env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_ACCESS_LOG='', **overrides)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'), 'wsgi:application'],
+        cwd=workdir, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_for_port(port):
+            return None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda _: send_request(port), range(args.requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=args.latency + 30)
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    failed = len(results) - len(latencies)
+    if not latencies:
+        return {'elapsed': elapsed, 'rps': 0, 'p50': 0, 'p95': 0, 'failed': failed}
+    return {
+        'elapsed': elapsed,
+        'rps': len(latencies) / elapsed,
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'failed': failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=1.0, help='stub generation time in seconds')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='zybercv-bench-')
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        SECRET_KEY='bench-secret',
+        HASH_POOL_WORKERS='0',
+        LLM_PROVIDER='stub',
+        LLM_STUB_LATENCY=str(args.latency),
+    )
+
+    try:
+        setup_database(workdir, env)
+        print(f"{args.requests} requests, {args.concurrency} concurrent, {args.latency}s stub latency")
+        print(f"{'worker model':<16}{'seconds':>9}{'req/s':>9}{'p50':>8}{'p95':>8}{'failed':>8}")
+        for name, overrides in WORKER_MODELS.items():
+            if overrides['GUNICORN_WORKER_CLASS'] == 'gevent':
+                try:
+                    import gevent  # noqa: F401
+                except ImportError:
+                    print(f"{name:<16}skipped (gevent not installed)")
+                    continue
+            result = run_model(name, overrides, args, workdir, env)
+            if result is None:
+                print(f"{name:<16}server did not start")
+                continue
+            print(f"{name:<16}{result['elapsed']:>9.2f}{result['rps']:>9.1f}"
+                  f"{result['p50']:>8.2f}{result['p95']:>8.2f}{result['failed']:>8}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
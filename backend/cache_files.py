@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+
+# Crash- and multi-process-safe cache files. Files are written to a temp
+# file, synced and renamed into place, so a reader sees either the old
+# file or the whole new one. Names are derived from the content, so two
+# writers never pick the same name for different data. lock() serializes
+# updates of one cache entry across the worker processes.
+
+# fsync written files (and their directory) before they are used
+CACHE_FSYNC = os.environ.get('CACHE_FSYNC', '1') == '1'
+# Lock files per cache folder; entries share them by hash of their key
+CACHE_LOCK_STRIPES = int(os.environ.get('CACHE_LOCK_STRIPES', 64))
+
+# Windows has no fcntl: locks then only cover the threads of this process
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_thread_locks = {}
+_thread_locks_lock = threading.Lock()
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+
+def _sync_directory(folder):
+    if not CACHE_FSYNC or not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, content):
+    """Replace path with content, never leaving a partial file behind"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            if CACHE_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _sync_directory(os.path.dirname(path) or '.')
+
+
+def write(folder, prefix, content):
+    """Store content as <prefix><content hash>.json in folder; returns the
+    file name. A file with the same name already has the same content."""
+    filename = f"{prefix}{content_hash(content)}.json"
+    path = os.path.join(folder, filename)
+    if not os.path.exists(path):
+        write_atomic(path, content)
+    return filename
+
+
+def remove(folder, filename):
+    try:
+        os.remove(os.path.join(folder, filename))
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def lock(folder, key):
+    """Hold the cross-process lock of a cache entry"""
+    stripe = zlib.crc32(str(key).encode()) % max(1, CACHE_LOCK_STRIPES)
+    if fcntl is None:
+        with _thread_locks_lock:
+            thread_lock = _thread_locks.setdefault((folder, stripe), threading.Lock())
+        with thread_lock:
+            yield
+        return
+
+    lock_folder = os.path.join(folder, '.locks')
+    os.makedirs(lock_folder, exist_ok=True)
+    # flock is per open file, so this also excludes other threads
+    with open(os.path.join(lock_folder, f"{stripe}.lock"), 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,34 @@
+import hashlib
+import json
+import os
+
+import metrics
+
+# Versions of cached model results. A version is a hash of everything that
+# shapes a result: the model, the prompt template and the output schema.
+# Results are stored with the version they were made with, so changing any
+# of these makes the old entries stale instead of serving them forever.
+
+# Bump to invalidate every cache without touching a prompt (e.g. after a
+# change to how results are parsed)
+CACHE_EPOCH = os.environ.get('CACHE_EPOCH', '1')
+# Serve a stale entry while it is regenerated in the background (1), or
+# regenerate it before answering (0)
+CACHE_STALE_WHILE_REVALIDATE = os.environ.get('CACHE_STALE_WHILE_REVALIDATE', '1') == '1'
+
+
+def version(model, prompt, schema=None):
+    """Short hash of a model name, prompt template and output schema"""
+    payload = json.dumps([CACHE_EPOCH, model, prompt, schema], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def versioned_key(key, cache_version):
+    """Cache key that changes with the version, for caches looked up by hash"""
+    return hashlib.sha256(f"{key}\0{cache_version}".encode()).hexdigest()
+
+
+def record_mismatch(kind):
+    # Exported on /metrics, to follow a prompt rollout
+    metrics.incr('cache_version_mismatches')
+    metrics.incr(f"cache_version_mismatches_{kind}")
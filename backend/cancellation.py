@@ -0,0 +1,78 @@
+import contextvars
+import os
+import select
+import socket
+from contextlib import contextmanager
+
+# Cancellation of model calls whose client has gone away. Each request is
+# watched through its connection's socket; a call waiting for a slot or
+# for the model checks it every CANCEL_POLL_INTERVAL seconds and gives up
+# (llm_scheduler.Cancelled) once the client has closed the connection.
+# The request thread is freed at once; a model call already sent finishes
+# on its own thread (within its deadline) and its result is dropped.
+
+# Stop waiting on model calls for clients that disconnected
+CANCEL_ON_DISCONNECT = os.environ.get('CANCEL_ON_DISCONNECT', '1') == '1'
+# Still finish calls whose result is cached (see cached_work), so the
+# work isn't lost when the user comes back
+CANCEL_FINISH_CACHED = os.environ.get('CANCEL_FINISH_CACHED', '1') == '1'
+# Seconds between checks of the client connection
+CANCEL_POLL_INTERVAL = float(os.environ.get('CANCEL_POLL_INTERVAL', 0.25))
+
+# Where WSGI servers put the client socket
+_SOCKET_KEYS = ('gunicorn.socket', 'werkzeug.socket')
+
+_watch = contextvars.ContextVar('client_watch', default=None)
+_cached_work = contextvars.ContextVar('cached_work', default=False)
+
+
+class _Watch:
+    __slots__ = ('sock', 'gone')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.gone = False
+
+    def client_gone(self):
+        if self.gone:
+            return True
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            # A closed connection reads as empty; data means a pipelined
+            # request, so the client is still there
+            self.gone = bool(readable) and self.sock.recv(1, socket.MSG_PEEK) == b''
+        except (OSError, ValueError):
+            # Closed from our side, or a socket that can't be peeked (TLS)
+            # and so can't be watched
+            return False
+        return self.gone
+
+
+def watch(environ):
+    """Watch the current request's client; called for every request"""
+    sock = None
+    if CANCEL_ON_DISCONNECT:
+        sock = next((environ[key] for key in _SOCKET_KEYS if environ.get(key) is not None), None)
+    _watch.set(_Watch(sock) if sock is not None else None)
+    _cached_work.set(False)
+
+
+def check():
+    """A function telling whether the current model call should be given
+    up, or None if it can't be cancelled (outside a request, not watched
+    or cached work)"""
+    current = _watch.get()
+    if current is None or (_cached_work.get() and CANCEL_FINISH_CACHED):
+        return None
+    return current.client_gone
+
+
+@contextmanager
+def cached_work():
+    """Mark model calls whose result is cached, so they finish even if the
+    client disconnects (with CANCEL_FINISH_CACHED)"""
+    token = _cached_work.set(True)
+    try:
+        yield
+    finally:
+        _cached_work.reset(token)
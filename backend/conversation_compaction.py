@@ -0,0 +1,156 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import metrics
+
+# Token budget for the interview transcript sent to the model
+INTERVIEW_TOKEN_BUDGET = int(os.environ.get('INTERVIEW_TOKEN_BUDGET', 8000))
+# What happens to older turns when the transcript is over budget:
+# "summarize" shortens them to their first sentence, "truncate" drops them
+INTERVIEW_COMPACTION_POLICY = os.environ.get('INTERVIEW_COMPACTION_POLICY', 'summarize')
+# Share of the budget reserved for recent turns, which are always kept verbatim
+RECENT_SHARE = float(os.environ.get('INTERVIEW_RECENT_SHARE', 0.75))
+# Longest a summarized turn can be, in characters
+SUMMARY_CHARS = int(os.environ.get('INTERVIEW_SUMMARY_CHARS', 160))
+# Rough characters per token, close enough for Gemini on English text
+CHARS_PER_TOKEN = 4
+# Tokens kept free for the "omitted"/"summarized" markers
+MARKER_TOKENS = 32
+
+# Compacted transcripts kept in memory, keyed by conversation hash
+CACHE_SIZE = int(os.environ.get('INTERVIEW_COMPACTION_CACHE_SIZE', 256))
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def count_tokens(text):
+    """Estimate the number of tokens in text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def format_entry(entry):
+    speaker = entry.get('speaker', '')
+    text = entry.get('text', '')
+    entry_type = entry.get('type', '')
+    return f"{speaker.upper()}: [{entry_type}] {text}\n\n"
+
+
+def summarize_entry(entry):
+    """Shorten an older turn to its first sentence"""
+    text = ' '.join(str(entry.get('text', '')).split())
+    first = _SENTENCE_END.split(text, 1)[0]
+    if len(first) > SUMMARY_CHARS:
+        first = first[:SUMMARY_CHARS].rsplit(' ', 1)[0] + '...'
+    return format_entry(dict(entry, text=first))
+
+
+def shorten_entry(entry, max_tokens):
+    """Cut a turn's text so the formatted turn fits in max_tokens"""
+    room = max_tokens - count_tokens(format_entry(dict(entry, text=' [...]')))
+    text = str(entry.get('text', ''))[:max(0, room) * CHARS_PER_TOKEN]
+    if ' ' in text:
+        text = text.rsplit(' ', 1)[0]
+    return format_entry(dict(entry, text=text + ' [...]'))
+
+
+def compact_conversation(conversation_log, budget=None, policy=None):
+    """Format the conversation log for the model within a token budget.
+
+    Newest turns are kept verbatim; the newest one is always kept, cut to
+    the recent share of the budget if it is longer on its own. If the
+    whole log doesn't fit, older turns are summarized or dropped according
+    to the policy, and a marker says how many were left out. Returns a
+    dict with the transcript text and token counts.
+    """
+    budget = budget or INTERVIEW_TOKEN_BUDGET
+    policy = policy or INTERVIEW_COMPACTION_POLICY
+
+    # Format and count every entry once
+    formatted = [format_entry(entry) for entry in conversation_log]
+    tokens = [count_tokens(text) for text in formatted]
+    original_tokens = sum(tokens)
+
+    if original_tokens <= budget:
+        return {
+            'text': ''.join(formatted),
+            'tokens': original_tokens,
+            'original_tokens': original_tokens,
+            'summarized': 0,
+            'dropped': 0,
+        }
+
+    # Walk back from the newest turn while it fits in the recent share
+    recent_budget = int(budget * RECENT_SHARE)
+    used = 0
+    start = len(formatted)
+    while start > 0 and used + tokens[start - 1] <= recent_budget:
+        start -= 1
+        used += tokens[start]
+    recent = formatted[start:]
+    if not recent:
+        # The newest turn alone is over the recent share
+        start -= 1
+        recent = [shorten_entry(conversation_log[start], recent_budget)]
+        used = count_tokens(recent[0])
+
+    # Summaries of the turns just before that, newest first, in what's left
+    summaries = []
+    index = start
+    if policy == 'summarize':
+        # Leave room for the section markers
+        remaining = budget - used - MARKER_TOKENS
+        while index > 0:
+            summary = summarize_entry(conversation_log[index - 1])
+            summary_tokens = count_tokens(summary)
+            if summary_tokens > remaining:
+                break
+            summaries.append(summary)
+            remaining -= summary_tokens
+            index -= 1
+        summaries.reverse()
+    dropped = index
+
+    parts = []
+    if dropped:
+        parts.append(f"[{dropped} earlier entries omitted]\n\n")
+    if summaries:
+        parts.append("[Earlier entries, summarized]\n\n")
+        parts.extend(summaries)
+        parts.append("[Most recent entries]\n\n")
+    parts.extend(recent)
+    text = ''.join(parts)
+
+    metrics.incr('interview_compactions')
+    return {
+        'text': text,
+        'tokens': count_tokens(text),
+        'original_tokens': original_tokens,
+        'summarized': len(summaries),
+        'dropped': dropped,
+    }
+
+
+def compact_conversation_cached(conversation_hash, conversation_log, budget=None, policy=None):
+    """compact_conversation, cached by conversation hash, budget and policy"""
+    key = (conversation_hash, budget or INTERVIEW_TOKEN_BUDGET, policy or INTERVIEW_COMPACTION_POLICY)
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            metrics.incr('interview_compaction_cache_hits')
+            return _cache[key]
+
+    result = compact_conversation(conversation_log, budget, policy)
+
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return result
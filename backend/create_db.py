@@ -0,0 +1,8 @@
+from app import app, db
+from database import create_missing_tables
+
+# Create the tables and indexes missing from the database, keeping the data
+# (recreate_db.py drops everything instead)
+with app.app_context():
+    create_missing_tables(db)
+    print("Missing database tables have been created.")
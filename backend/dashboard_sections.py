@@ -0,0 +1,150 @@
+import hashlib
+import json
+import re
+
+from resume_scoring import find_headings, parse_model_result
+
+# Incremental dashboard analysis. The dashboard's resumeData is split into
+# parts, each built from a few resume sections. A part's result is cached
+# under a hash of those sections, so after a re-upload only the parts whose
+# sections changed are asked from the model and the rest are reused.
+
+# Lines before the first heading: name and contact details
+HEADER = 'header'
+# Every section, for parts that depend on the whole resume
+ALL_SECTIONS = '*'
+
+# Part name -> (resume sections it is built from, example of its JSON)
+DASHBOARD_PARTS = {
+    'contact': (
+        (HEADER, 'contact', 'education'),
+        """{"candidate": {"name": "Jane Smith", "location": "San Francisco, CA", "email": "jane.smith@example.com",
+  "phone": "(555) 123-4567", "linkedin": "linkedin.com/in/janesmith", "photoUrl": "/api/placeholder/80/80",
+  "education": "Master's in Computer Science"}}""",
+    ),
+    'career': (
+        ('summary', 'experience', 'projects'),
+        """{"candidate": {"currentRole": "Senior Frontend Developer", "yearsExperience": 7},
+ "experienceInsights": {
+  "domains": [{"name": "Frontend Development", "years": 7}, {"name": "UI/UX Design", "years": 3}],
+  "roles": [{"title": "Senior Frontend Developer", "company": "TechCorp Inc.", "duration": "2021-Present"},
+            {"title": "Frontend Developer", "company": "WebSolutions LLC", "duration": "2018-2021"}]}}""",
+    ),
+    'skills': (
+        ('skills', 'certifications', 'projects'),
+        """{"skillsAnalysis": {
+  "technical": [{"name": "React", "level": 90}, {"name": "TypeScript", "level": 85}, {"name": "Node.js", "level": 70}],
+  "soft": [{"name": "Communication", "level": 85}, {"name": "Problem Solving", "level": 90}],
+  "jobMatchPercentage": 87}}""",
+    ),
+    'education': (
+        ('education', 'skills'),
+        """{"experienceInsights": {"educationRelevance": 90}}""",
+    ),
+    'market': (
+        ('summary', 'skills', 'experience'),
+        """{"marketAnalysis": {
+  "salaryRange": {"min": 120000, "max": 160000, "average": 140000},
+  "demandScore": 85,
+  "competitiveAdvantage": [{"skill": "React", "advantage": "High"}, {"skill": "TypeScript", "advantage": "Medium"}]}}""",
+    ),
+    'improvements': (
+        (ALL_SECTIONS,),
+        """{"improvements": [
+  {"date": "2025-03-28 10:30 AM", "fileName": "Resume_V1.1.pdf", "improvementPercent": 10, "notes": "Added quantifiable achievements"},
+  {"date": "2025-03-27 03:15 PM", "fileName": "Resume_V1.0.pdf", "improvementPercent": 8, "notes": "Improved skills section"}]}""",
+    ),
+}
+
+# Key order of the merged resumeData, as the dashboard expects it
+RESUME_DATA_KEYS = ('candidate', 'skillsAnalysis', 'experienceInsights', 'improvements', 'marketAnalysis')
+
+DASHBOARD_PROMPT = """
+Analyze the resume sections below for a career dashboard.
+Return only a JSON object with one key per part listed here, no other text and no ```json markers.
+Each part's value has the structure of its example, filled in for this resume:
+
+{parts}
+
+Use only what the resume says; estimate levels, years and salaries from it.
+
+Resume sections:
+{sections}
+"""
+
+_SPACE = re.compile(r'\s+')
+
+
+def split_sections(text):
+    """Resume text as {section: text}, or None if no standard heading is
+    found. Lines before the first heading are the HEADER section."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    headings = find_headings(lines)
+    if not headings:
+        return None
+
+    sections = {HEADER: '\n'.join(lines[:headings[0][0]])}
+    bounds = headings + [(len(lines), None)]
+    for (start, section), (end, _) in zip(bounds, bounds[1:]):
+        body = '\n'.join(lines[start + 1:end])
+        # A section can be split over several headings ("Skills", "Soft Skills")
+        sections[section] = f"{sections[section]}\n{body}" if section in sections else body
+    return sections
+
+
+def section_hash(text):
+    # Whitespace and line breaks move around between extractions of the
+    # same document, so they don't count as edits
+    return hashlib.sha256(_SPACE.sub(' ', text).strip().encode()).hexdigest()
+
+
+def part_inputs(part, sections):
+    """Names of the sections a part is built from, present in this resume"""
+    wanted = DASHBOARD_PARTS[part][0]
+    if ALL_SECTIONS in wanted:
+        return sorted(sections)
+    return [section for section in wanted if section in sections]
+
+
+def part_hash(part, sections):
+    """Cache key of a part: changes only when one of its sections does"""
+    inputs = part_inputs(part, sections)
+    digest = hashlib.sha256(part.encode())
+    for section in inputs:
+        digest.update(f"\0{section}\0{section_hash(sections[section])}".encode())
+    return digest.hexdigest()
+
+
+def build_prompt(parts, sections):
+    needed = set()
+    for part in parts:
+        needed.update(part_inputs(part, sections))
+    examples = '\n\n'.join(f'"{part}": {DASHBOARD_PARTS[part][1]}' for part in parts)
+    texts = '\n\n'.join(f"[{section}]\n{sections[section]}" for section in sorted(needed) if sections[section])
+    return DASHBOARD_PROMPT.format(parts=examples, sections=texts)
+
+
+def parse_parts(text, parts):
+    """The model's result for each requested part, keeping only the keys
+    of the part's example. Raises ValueError if a part is missing."""
+    parsed = parse_model_result(text, 'dashboard_parts')
+    results = {}
+    for part in parts:
+        value = parsed.get(part)
+        allowed = json.loads(DASHBOARD_PARTS[part][1])
+        if not isinstance(value, dict) or not any(key in value for key in allowed):
+            raise ValueError(f"Missing dashboard part: {part}")
+        results[part] = {key: value[key] for key in allowed if key in value}
+    return results
+
+
+def merge_parts(results):
+    """Merge part results, in DASHBOARD_PARTS order, into one resumeData"""
+    resume_data = {}
+    for part in DASHBOARD_PARTS:
+        for key, value in results.get(part, {}).items():
+            if isinstance(value, dict) and isinstance(resume_data.get(key), dict):
+                resume_data[key].update(value)
+            else:
+                resume_data[key] = dict(value) if isinstance(value, dict) else value
+    return {key: resume_data[key] for key in RESUME_DATA_KEYS if key in resume_data}
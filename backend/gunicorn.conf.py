@@ -0,0 +1,78 @@
+"""Gunicorn settings for running the backend in production.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Most requests spend their time waiting on the model API, not on the CPU,
+so the default is a few processes with many threads each ("gthread").
+Every setting can be overridden with the environment variables below.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# "gthread" (threads per process) or "gevent" (greenlets, needs gevent
+# installed). "sync" handles one request per process and is only useful
+# for comparison.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+# Threads per worker for gthread. Sized for long upstream waits: each
+# in-flight generation holds one thread for its whole duration.
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+# Concurrent greenlets per worker for gevent
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Import the app once in the master and fork it into the workers
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Generations can take tens of seconds, don't kill workers that are waiting
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# How long a stopping worker gets to finish in-flight requests
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 90))
+# Seconds to hold idle keep-alive connections open
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then, jittered so they don't all restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+
+
+def on_starting(server):
+    # Create tables added since the database was made, once in the master
+    # so workers don't race each other doing it
+    from database import DB_CREATE_TABLES
+    if DB_CREATE_TABLES:
+        from app import app, db
+        from database import create_missing_tables
+        with app.app_context():
+            create_missing_tables(db)
+
+
+def post_fork(server, worker):
+    # Don't share pooled database connections opened in the master
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose()
+
+
+def post_worker_init(worker):
+    # The worker is about to serve; import the Gemini SDK and load the job
+    # catalog in the background instead of during startup or the first request
+    import llm
+    import job_catalog
+    llm.warm_up()
+    job_catalog.warm_up()
+
+
+def worker_exit(server, worker):
+    # Requests are done by now, but generations started in background
+    # threads may still be running. Let them finish so their results are
+    # cached instead of lost.
+    import background
+    import llm
+    background.drain(graceful_timeout)
+    if not llm.drain(graceful_timeout):
+        server.log.warning("Worker %s exited with %s generations still running",
+                           worker.pid, llm.in_flight())
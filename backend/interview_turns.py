@@ -0,0 +1,165 @@
+import hashlib
+import json
+
+import json_repair
+
+# Per-turn interview scoring. Each answered question is scored on its own
+# while the interview is still running; the end-of-interview analysis is
+# then built locally from the cached turn results.
+
+TURN_PROMPT = """
+You are an expert interview coach. Score the candidate's answer to one interview question.
+Return only a JSON object with this structure, no other text:
+
+{
+  "responseScore": number (0-100, overall quality of this answer),
+  "technicalScore": number (0-100),
+  "communicationScore": number (0-100),
+  "confidence": number (0-100),
+  "feedback": string (specific feedback on this answer, max 40 words),
+  "insight": string (one observation about the candidate's performance),
+  "strength": {
+    "title": string (strength category),
+    "description": string (brief description of the strength)
+  },
+  "improvement": {
+    "title": string (area to improve),
+    "description": string (what to focus on),
+    "tip": string (practical advice for improvement)
+  }
+}
+
+Be fair but constructive. Consider both technical accuracy and communication skills.
+"""
+
+SCORE_FIELDS = ('responseScore', 'technicalScore', 'communicationScore', 'confidence')
+
+
+def turn_hash(question, answer):
+    """Cache key for one question/answer pair"""
+    payload = json.dumps({'question': question or '', 'answer': answer or ''}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def log_turns(conversation_log):
+    """(question, answer) pairs of an /interview-analyze conversation log,
+    the same turns the mock interview page posts: each answer with the
+    last thing the interviewer said before it"""
+    turns = []
+    question = ''
+    for entry in conversation_log:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get('speaker') == 'ai':
+            question = str(entry.get('text') or '')
+        elif entry.get('speaker') == 'user' and entry.get('type') == 'answer':
+            turns.append((question, str(entry.get('text') or '')))
+    return turns
+
+
+def build_turn_prompt(question, answer):
+    return f"{TURN_PROMPT}\n\nQuestion: {question}\n\nCandidate's answer: {answer}"
+
+
+def _clamp_score(value):
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_turn_result(text, fix=None):
+    """Parse and normalize the model's JSON for one turn. fix is passed on
+    to json_repair.parse.
+
+    Raises ValueError if the text is not a JSON object.
+    """
+    parsed = json_repair.parse(text, 'turn', fix=fix)
+
+    for field in SCORE_FIELDS:
+        parsed[field] = _clamp_score(parsed.get(field))
+    for field in ('feedback', 'insight'):
+        parsed[field] = str(parsed.get(field) or '')
+    for field in ('strength', 'improvement'):
+        if not isinstance(parsed.get(field), dict):
+            parsed[field] = {}
+    return parsed
+
+
+def _mean(values):
+    return int(round(sum(values) / len(values))) if values else 0
+
+
+def aggregate_turns(turns):
+    """Build the full interview analysis from scored turns.
+
+    turns is a list of (question, answer, result) in interview order. The
+    output has the same shape as the one-shot /interview-analyze result.
+    """
+    if not turns:
+        return None
+
+    results = [result for _, _, result in turns]
+    response_scores = [result['responseScore'] for result in results]
+
+    metrics = {
+        'overallScore': _mean(response_scores),
+        'confidence': _mean([result['confidence'] for result in results]),
+        'technicalScore': _mean([result['technicalScore'] for result in results]),
+        'communicationScore': _mean([result['communicationScore'] for result in results]),
+    }
+
+    # Best answers give the strengths, weakest answers the focus areas
+    by_score = sorted(range(len(results)), key=lambda i: response_scores[i])
+    weakest = [results[i] for i in by_score]
+    strongest = [results[i] for i in reversed(by_score)]
+
+    def unique(items, key, limit):
+        seen = set()
+        picked = []
+        for item in items:
+            value = key(item)
+            if value and value not in seen:
+                seen.add(value)
+                picked.append(item)
+            if len(picked) == limit:
+                break
+        return picked
+
+    strengths = [
+        {'title': r['strength'].get('title', ''), 'description': r['strength'].get('description', '')}
+        for r in unique(strongest, lambda r: r['strength'].get('title'), 3)
+    ]
+    improvements = unique(weakest, lambda r: r['improvement'].get('title'), 4)
+    focus_areas = [
+        {
+            'title': r['improvement'].get('title', ''),
+            'description': r['improvement'].get('description', ''),
+            'tip': r['improvement'].get('tip', ''),
+        }
+        for r in improvements[:3]
+    ]
+
+    return {
+        'metrics': metrics,
+        'keyInsights': [r['insight'] for r in unique(results, lambda r: r['insight'], 5)],
+        'improvementAreas': [
+            f"{r['improvement'].get('title', '')}: {r['improvement'].get('description', '')}"
+            for r in improvements
+        ],
+        'strengths': strengths,
+        'focusAreas': focus_areas,
+        'questionResponses': [
+            {
+                'question': question,
+                'response': answer,
+                'responseScore': result['responseScore'],
+                'feedback': result['feedback'],
+            }
+            for question, answer, result in turns
+        ],
+        'nextSteps': [
+            {'title': f"Practice {area['title'].lower()}", 'description': area['tip']}
+            for area in focus_areas
+        ],
+    }
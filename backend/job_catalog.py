@@ -0,0 +1,277 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+import json_repair
+import metrics
+from text_features import term_counts, tf_weight, smooth_idf, query_vector, top_k
+
+# Local job catalog, matched against resumes with TF-IDF cosine similarity.
+# The catalog is a JSON list of jobs (same fields the jobs page shows) or a
+# CSV with the same columns, skills separated by ";" and requiredSkillDetails
+# as a JSON object.
+JOB_CATALOG_PATH = os.environ.get('JOB_CATALOG_PATH', 'job_catalog.json')
+# Seconds between checks for a changed catalog file
+JOB_CATALOG_CHECK_INTERVAL = float(os.environ.get('JOB_CATALOG_CHECK_INTERVAL', 5))
+# Jobs returned per match
+JOB_TOP_K = int(os.environ.get('JOB_TOP_K', 10))
+
+_index = None
+_index_lock = threading.Lock()
+_reloading = False
+_last_check = 0.0
+
+# Term counts of every job seen, keyed by a hash of the job's fields, so a
+# reload only re-tokenizes jobs that are new or changed
+_job_counts = {}
+
+
+def skill_details(job):
+    """A job's requiredSkillDetails as a dict: JSON text in CSV catalogs,
+    ignored if it is neither"""
+    details = job.get('requiredSkillDetails') or {}
+    if isinstance(details, str):
+        try:
+            details = json.loads(details)
+        except ValueError:
+            return {}
+    return details if isinstance(details, dict) else {}
+
+
+def job_text(job):
+    details = skill_details(job)
+    parts = [
+        job.get('title', ''),
+        job.get('company', ''),
+        ' '.join(job.get('skills') or []),
+        job.get('description', ''),
+        ' '.join(f"{skill} {detail}" for skill, detail in details.items()),
+    ]
+    # The title and skills say the most about a job, count them twice
+    parts.extend(parts[0:3:2])
+    return '\n'.join(str(part) for part in parts)
+
+
+def _job_key(job):
+    return hashlib.sha256(json.dumps(job, sort_keys=True).encode()).hexdigest()
+
+
+def read_catalog(path):
+    """Load jobs from a JSON or CSV catalog file"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            jobs = []
+            for row in csv.DictReader(f):
+                row['skills'] = [skill.strip() for skill in (row.get('skills') or '').split(';') if skill.strip()]
+                row['requiredSkillDetails'] = skill_details(row)
+                jobs.append(row)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+
+    if not isinstance(jobs, list):
+        raise ValueError('Job catalog must be a list of jobs')
+    for i, job in enumerate(jobs, 1):
+        job.setdefault('id', i)
+    return jobs
+
+
+class CatalogIndex:
+    """Immutable TF-IDF index over a list of jobs.
+
+    Weights are stored column-wise (term -> jobs), so a search only touches
+    the postings of the terms in the resume.
+    """
+
+    def __init__(self, jobs, counts, version=None):
+        self.jobs = jobs
+        self.version = version
+        self.vocabulary = {}
+
+        rows, cols, tfs = [], [], []
+        for row, job_counts in enumerate(counts):
+            for term, count in job_counts.items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                tfs.append(tf_weight(count))
+
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        document_frequency = np.bincount(cols, minlength=len(self.vocabulary))
+        self.idf = smooth_idf(len(jobs), document_frequency).astype(np.float32)
+
+        # L2-normalize each job vector
+        data = np.array(tfs, dtype=np.float32) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(jobs)))
+        data /= np.maximum(norms[rows], 1e-12).astype(np.float32)
+
+        # Group the non-zeros by term
+        order = np.argsort(cols, kind='stable')
+        self.job_ids = rows[order]
+        self.weights = data[order]
+        self.term_ptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def scores(self, counts):
+        """Cosine similarity of every job to a document's term counts"""
+        term_ids, query_weights = query_vector(counts, self.vocabulary, self.idf)
+        if not len(term_ids):
+            return np.zeros(len(self.jobs), dtype=np.float64)
+
+        starts = self.term_ptr[term_ids]
+        lengths = self.term_ptr[term_ids + 1] - starts
+        # Positions of every posting of the query terms
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return np.bincount(
+            self.job_ids[positions],
+            weights=self.weights[positions] * np.repeat(query_weights, lengths),
+            minlength=len(self.jobs),
+        )
+
+    def search(self, text, k=None):
+        """Top k jobs for a resume text, as (job, score) pairs, best first"""
+        scores = self.scores(term_counts(text))
+        return [(self.jobs[i], float(scores[i])) for i in top_k(scores, k or JOB_TOP_K)]
+
+
+def build_index(jobs, version=None):
+    counts = []
+    for job in jobs:
+        key = _job_key(job)
+        if key not in _job_counts:
+            _job_counts[key] = term_counts(job_text(job))
+        counts.append(_job_counts[key])
+    return CatalogIndex(jobs, counts, version)
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def reload_catalog(path=None):
+    """Rebuild the index from the catalog file and swap it in.
+
+    Searches keep using the previous index until the new one is ready.
+    """
+    global _index, _job_counts
+    path = path or JOB_CATALOG_PATH
+    start = time.time()
+    version = _file_version(path)
+    jobs = read_catalog(path)
+    index = build_index(jobs, version)
+
+    # Forget term counts of jobs that are no longer in the catalog
+    keys = {_job_key(job) for job in jobs}
+    _job_counts = {key: value for key, value in _job_counts.items() if key in keys}
+
+    with _index_lock:
+        _index = index
+    metrics.observe('job_catalog_reload_seconds', time.time() - start)
+    metrics.set_gauge('job_catalog_jobs', len(index))
+    return index
+
+
+def _reload_in_background(path):
+    global _reloading
+
+    def run():
+        global _reloading
+        try:
+            reload_catalog(path)
+        except Exception as e:
+            # Keep serving the previous catalog
+            metrics.incr('job_catalog_reload_errors')
+            print(f"Job catalog reload failed: {str(e)}")
+        finally:
+            with _index_lock:
+                _reloading = False
+
+    with _index_lock:
+        if _reloading:
+            return
+        _reloading = True
+    threading.Thread(target=run, name='job-catalog-reload', daemon=True).start()
+
+
+def warm_up():
+    """Load the catalog in the background so the first match doesn't wait"""
+    if _index is None and os.path.exists(JOB_CATALOG_PATH):
+        _reload_in_background(JOB_CATALOG_PATH)
+
+
+def get_index():
+    """The current catalog index, or None if there is no catalog.
+
+    Loads the catalog on first use. Afterwards the file is checked every
+    JOB_CATALOG_CHECK_INTERVAL seconds and reloaded in the background when
+    it changes.
+    """
+    global _last_check
+    path = JOB_CATALOG_PATH
+    if not os.path.exists(path):
+        return _index
+
+    if _index is None:
+        return reload_catalog(path)
+
+    now = time.time()
+    if now - _last_check >= JOB_CATALOG_CHECK_INTERVAL:
+        _last_check = now
+        if _file_version(path) != _index.version:
+            _reload_in_background(path)
+    return _index
+
+
+RERANK_PROMPT = """
+You are a career advisor. Below is a candidate's resume (attached) and a shortlist of jobs that matched it.
+Reorder the jobs from best to worst fit for this candidate and explain each fit in one sentence.
+Return only a JSON object with this structure, no other text:
+
+{{
+  "order": [job id, ...],
+  "explanations": {{"job id": string (max 30 words)}}
+}}
+
+Jobs:
+{jobs}
+"""
+
+
+def build_rerank_prompt(jobs):
+    listed = '\n'.join(
+        f"- id {job['id']}: {job.get('title', '')} at {job.get('company', '')} "
+        f"(skills: {', '.join(job.get('skills') or [])})"
+        for job in jobs
+    )
+    return RERANK_PROMPT.format(jobs=listed)
+
+
+def apply_rerank(jobs, text):
+    """Reorder jobs and attach explanations from the model's JSON.
+
+    Jobs the model left out keep their place after the ones it ranked.
+    Raises ValueError if the text is not a JSON object.
+    """
+    parsed = json_repair.parse(text, 'rerank', complete=False)
+
+    by_id = {str(job['id']): job for job in jobs}
+    order = [str(job_id) for job_id in parsed.get('order') or [] if str(job_id) in by_id]
+    order = list(dict.fromkeys(order))
+    order += [job_id for job_id in by_id if job_id not in order]
+
+    explanations = parsed.get('explanations') or {}
+    reranked = []
+    for job_id in order:
+        job = dict(by_id[job_id])
+        if explanations.get(job_id):
+            job['explanation'] = str(explanations[job_id])
+        reranked.append(job)
+    return reranked
@@ -0,0 +1,273 @@
+import json
+import re
+import threading
+
+import metrics
+
+# Parsing of the model's JSON answers. Models often wrap JSON in code
+# fences, leave trailing commas, stop mid-answer or forget to escape a
+# quote; these are fixed locally, in about a millisecond, instead of
+# asking for a whole new generation. Only when that fails is the model
+# asked to fix the text (see parse), which is a much smaller call.
+
+# Characters of broken output sent back in a fix request
+FIX_MAX_CHARS = 30000
+
+FIX_PROMPT = """The text below was meant to be {expected}, but it is not valid JSON ({error}).
+Return only the corrected JSON, with the same content, no other text and no ```json markers.
+
+{text}"""
+
+_FENCE = re.compile(r"```[a-zA-Z]*[ \t]*\n?(.*?)(?:```|$)", re.S)
+_WHITESPACE = ' \t\r\n'
+# What may follow a closing quote inside a structure
+_AFTER_STRING = ',:}]'
+_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+# What may follow a comma after a string: the next key of an object (or
+# a key cut off by the end of the text), or a number or literal
+_NEXT_KEY = re.compile(r'"(?:[^"\\]|\\.)*(?:"\s*(?::|$)|$)')
+_NEXT_SCALAR = re.compile(r'(?:-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)\s*(?:[,\]}]|$)')
+
+# Outcomes of parse(), for the rates on /metrics
+_OUTCOMES = ('clean', 'repaired', 'regenerated', 'failed')
+_counts = dict.fromkeys(_OUTCOMES, 0)
+_counts_lock = threading.Lock()
+
+
+def _strip_fences(text):
+    """The JSON in text: inside its code fence if it has one, from the
+    first { or [ on"""
+    match = _FENCE.search(text)
+    if match and ('{' in match.group(1) or '[' in match.group(1)):
+        text = match.group(1)
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    return text[min(starts):] if starts else text.strip()
+
+
+def _closes_string(text, i, container):
+    """Whether the quote at text[i] ends the string it is in, or is a
+    quote the model forgot to escape. container is the bracket of the
+    structure the string is in."""
+    j = i + 1
+    while j < len(text) and text[j] in _WHITESPACE:
+        j += 1
+    if j == len(text):
+        return True
+    if text[j] not in _AFTER_STRING:
+        return False
+    if text[j] != ',':
+        return True
+    # After a comma the next key or value, or the end, must follow;
+    # otherwise the comma is part of the text
+    j += 1
+    while j < len(text) and text[j] in _WHITESPACE:
+        j += 1
+    if j == len(text) or text[j] in ']}':
+        return True
+    if container == '{':
+        return bool(_NEXT_KEY.match(text, j))
+    return text[j] in '"{[' or bool(_NEXT_SCALAR.match(text, j))
+
+
+def _scan(text):
+    """One pass over text that escapes stray quotes and raw newlines in
+    strings and drops trailing commas. Returns (out, stack, in_string):
+    the fixed characters up to the end of the top-level value, and the
+    structures still open if the text was cut off. Each stack frame is
+    [bracket, index in out, indexes of its commas in out]."""
+    out = []
+    stack = []
+    in_string = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if char == '\\' and i + 1 < len(text):
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            if char == '"':
+                if _closes_string(text, i, stack[-1][0] if stack else None):
+                    in_string = False
+                    out.append(char)
+                else:
+                    out.append('\\"')
+            elif char in _ESCAPES:
+                out.append(_ESCAPES[char])
+            elif char < ' ':
+                out.append(f"\\u{ord(char):04x}")
+            else:
+                out.append(char)
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char in '{[':
+            stack.append([char, len(out), []])
+            out.append(char)
+        elif char in '}]':
+            if not stack or '{['['}]'.index(char)] != stack[-1][0]:
+                # Unbalanced: whatever follows is not part of the value
+                break
+            _drop_trailing_comma(out, stack[-1])
+            stack.pop()
+            out.append(char)
+            if not stack:
+                return out, stack, False
+        elif char == ',':
+            if stack:
+                stack[-1][2].append(len(out))
+            out.append(char)
+        else:
+            out.append(char)
+        i += 1
+    return out, stack, in_string
+
+
+def _drop_trailing_comma(out, frame):
+    while out and out[-1] in _WHITESPACE:
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+        if frame[2] and frame[2][-1] == len(out):
+            frame[2].pop()
+
+
+def _close(out, stack):
+    """Text of out with every open structure closed"""
+    out = list(out)
+    for frame in reversed(stack):
+        _drop_trailing_comma(out, frame)
+        out.append('}' if frame[0] == '{' else ']')
+    return ''.join(out)
+
+
+def _repair(text):
+    """repair(), also telling whether the text was cut off: (value, cut)"""
+    text = _strip_fences(text or '')
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    out, stack, _ = _scan(text)
+    if not stack:
+        return json.loads(''.join(out)), False
+
+    # Cut off: every structure still open inside the top-level one is an
+    # unfinished element of it, as is whatever follows its last comma.
+    # Keep the elements before that, dropping more from the end until the
+    # rest parses.
+    root = stack[0]
+    del stack[1:]
+    error = None
+    while True:
+        if root[2]:
+            del out[root[2].pop():]
+        else:
+            del out[root[1] + 1:]
+        try:
+            return json.loads(_close(out, stack)), True
+        except ValueError as e:
+            error = e
+        if not root[2]:
+            raise error
+
+
+def repair(text):
+    """Parse text as JSON, fixing what models commonly get wrong: code
+    fences and text around the JSON, trailing commas, unescaped quotes and
+    newlines in strings, and answers cut off mid-way (the unfinished last
+    element is dropped). Raises ValueError if it still isn't JSON."""
+    return _repair(text)[0]
+
+
+def check_shape(value, shape):
+    """None if value has the expected shape, else what is wrong. shape is
+    a type, or {key: type} for an object that must have those keys."""
+    if isinstance(shape, dict):
+        if not isinstance(value, dict):
+            return 'not a JSON object'
+        for key, expected in shape.items():
+            if not isinstance(value.get(key), expected):
+                return f"missing or invalid \"{key}\""
+        return None
+    if not isinstance(value, shape):
+        return f"not a JSON {'array' if shape is list else 'object'}"
+    return None
+
+
+def _fits(value, shape):
+    """value, or the single value it wraps (e.g. {"resumeData": {...}}),
+    if it has the shape; else None"""
+    if check_shape(value, shape) is None:
+        return value
+    if isinstance(value, dict) and len(value) == 1:
+        inner = next(iter(value.values()))
+        if check_shape(inner, shape) is None:
+            return inner
+    return None
+
+
+def _describe(shape):
+    if isinstance(shape, dict):
+        return f"a JSON object with the keys {', '.join(shape)}"
+    return 'a JSON array' if shape is list else 'a JSON object'
+
+
+def _record(kind, outcome):
+    metrics.incr(f"json_{outcome}")
+    metrics.incr(f"json_{kind}_{outcome}")
+    with _counts_lock:
+        _counts[outcome] += 1
+        total = sum(_counts.values())
+        metrics.set_gauge('json_repair_rate', round(_counts['repaired'] / total, 4))
+        metrics.set_gauge('json_regeneration_rate', round(_counts['regenerated'] / total, 4))
+
+
+def _attempt(text, shape, complete):
+    """(value fitting shape or None, outcome, problem) for one answer"""
+    try:
+        # Code fences are too common to count as a repair
+        value, outcome, cut = json.loads(_strip_fences(text or '')), 'clean', False
+    except ValueError:
+        try:
+            value, cut = _repair(text)
+        except ValueError as e:
+            return None, 'repaired', str(e)
+        outcome = 'repaired'
+    if cut and complete:
+        return None, outcome, 'cut off before the end'
+    fitted = _fits(value, shape)
+    return fitted, outcome, None if fitted is not None else check_shape(value, shape)
+
+
+def parse(text, kind, shape=dict, fix=None, complete=True):
+    """Parse a model answer expected to have shape (see check_shape).
+
+    Tries json.loads, then repair(). If both fail and fix is given, it is
+    called with a short prompt asking the model to correct the text, and
+    its answer is repaired and checked the same way. With complete, an
+    answer cut off mid-way fails too, even though repair() can save its
+    first elements: results that are cached must be whole. Outcomes are
+    counted per kind on /metrics. Raises ValueError if nothing fits.
+    """
+    fitted, outcome, problem = _attempt(text, shape, complete)
+    if fitted is not None:
+        _record(kind, outcome)
+        return fitted
+
+    if fix is not None:
+        prompt = FIX_PROMPT.format(expected=_describe(shape), error=problem, text=(text or '')[:FIX_MAX_CHARS])
+        try:
+            fixed = fix(prompt)
+        except Exception:
+            # The fix call itself failed (e.g. over quota)
+            _record(kind, 'failed')
+            raise
+        fitted, _, _ = _attempt(fixed, shape, complete)
+        if fitted is not None:
+            _record(kind, 'regenerated')
+            return fitted
+
+    _record(kind, 'failed')
+    raise ValueError(f"Invalid {kind} JSON: {problem}")
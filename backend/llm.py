@@ -0,0 +1,328 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import cancellation
+import metrics
+import llm_scheduler
+import tracing
+
+# "gemini" calls the Gemini API, "stub" returns a canned response after a
+# fixed delay (for load tests and benchmarks, no API key needed)
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Stub provider settings
+LLM_STUB_LATENCY = float(os.environ.get('LLM_STUB_LATENCY', 1.0))
+LLM_STUB_RESPONSE = os.environ.get('LLM_STUB_RESPONSE', '{}')
+
+# Seconds between checks of a batch prediction job (see generate_batch)
+LLM_BATCH_POLL_INTERVAL = float(os.environ.get('LLM_BATCH_POLL_INTERVAL', 30))
+# Most requests sent in one batch job; larger batches are split into jobs
+# run one after another
+LLM_BATCH_MAX_REQUESTS = int(os.environ.get('LLM_BATCH_MAX_REQUESTS', 100))
+
+# Start a background SDK import when a worker boots (see warm_up)
+LLM_WARMUP = os.environ.get('LLM_WARMUP', '1') == '1'
+
+# The Gemini SDK takes most of the backend's import time, so it is only
+# imported when the first generation needs it, or by warm_up() in the
+# background once the server is listening.
+_sdk = None
+_client = None
+_sdk_lock = threading.Lock()
+
+# Generations currently running in this process, so shutdown can drain them
+_in_flight = 0
+_in_flight_cond = threading.Condition()
+
+# Calls that can be cancelled run here while their request thread waits;
+# each holds a scheduler slot, so there are never more than the slots
+_calls = ThreadPoolExecutor(max_workers=max(1, llm_scheduler.LLM_CONCURRENCY), thread_name_prefix='llm-call')
+
+
+def _begin():
+    global _in_flight
+    with _in_flight_cond:
+        _in_flight += 1
+        metrics.set_gauge('llm_in_flight', _in_flight)
+
+
+def _end():
+    global _in_flight
+    with _in_flight_cond:
+        _in_flight -= 1
+        metrics.set_gauge('llm_in_flight', _in_flight)
+        _in_flight_cond.notify_all()
+
+
+def in_flight():
+    with _in_flight_cond:
+        return _in_flight
+
+
+def drain(timeout):
+    """Wait until no generation is running, up to timeout seconds.
+
+    Returns True if everything finished in time.
+    """
+    deadline = time.monotonic() + timeout
+    with _in_flight_cond:
+        while _in_flight > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _in_flight_cond.wait(remaining)
+    return True
+
+
+def _load_sdk():
+    global _sdk
+    if _sdk is None:
+        with _sdk_lock:
+            if _sdk is None:
+                start = time.time()
+                from google import genai
+                from google.genai import types
+                _sdk = (genai, types)
+                metrics.observe('llm_sdk_import_seconds', time.time() - start)
+    return _sdk
+
+
+def _get_client():
+    global _client
+    genai, _ = _load_sdk()
+    # One client per process, reused across requests and threads
+    if _client is None:
+        with _sdk_lock:
+            if _client is None:
+                _client = genai.Client(
+                    api_key=os.environ.get("GEMINI_API_KEY"),
+                )
+    return _client
+
+
+def warm_up():
+    """Import the SDK and create the client in a background thread.
+
+    Called once the server is accepting connections, so the first model
+    call doesn't pay for the import. Returns the thread, or None if there
+    is nothing to warm up.
+    """
+    if not LLM_WARMUP or LLM_PROVIDER == 'stub' or _client is not None:
+        return None
+
+    def run():
+        try:
+            _get_client()
+        except Exception as e:
+            # The first real call will retry and report the error
+            print(f"LLM warm-up failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name='llm-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def _remaining(deadline):
+    """Seconds left until deadline; raises TimeoutError once it passed"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError('Deadline passed')
+    return remaining
+
+
+def _is_timeout(e):
+    # httpx's ReadTimeout, ConnectTimeout, ... or our own TimeoutError
+    return isinstance(e, TimeoutError) or type(e).__name__.endswith('Timeout')
+
+
+def _generate_stub(prompt, file_path, model, deadline=None):
+    with tracing.span('llm_generate'):
+        if deadline is not None and _remaining(deadline) < LLM_STUB_LATENCY:
+            time.sleep(_remaining(deadline))
+            raise TimeoutError('Stub call timed out')
+        time.sleep(LLM_STUB_LATENCY)
+    return LLM_STUB_RESPONSE
+
+
+def _http_options(types, deadline):
+    """Request options that make the SDK give up at deadline"""
+    if deadline is None:
+        return None
+    return types.HttpOptions(timeout=max(1, int(_remaining(deadline) * 1000)))
+
+
+def _contents(client, types, prompt, file_path, deadline=None):
+    parts = []
+    if file_path:
+        # Upload the file to Gemini
+        with tracing.span('llm_upload'):
+            config = types.UploadFileConfig(http_options=_http_options(types, deadline)) if deadline is not None else None
+            uploaded = client.files.upload(file=file_path, config=config)
+        parts.append(types.Part.from_uri(
+            file_uri=uploaded.uri,
+            mime_type=uploaded.mime_type,
+        ))
+    parts.append(types.Part.from_text(text=prompt))
+
+    return [
+        types.Content(
+            role="user",
+            parts=parts,
+        ),
+    ]
+
+
+def _generate_gemini(prompt, file_path, model, deadline=None):
+    _, types = _load_sdk()
+    client = _get_client()
+
+    contents = _contents(client, types, prompt, file_path, deadline)
+
+    # Set response configuration; the rest of the deadline bounds the call
+    generate_content_config = types.GenerateContentConfig(
+        response_mime_type="text/plain",
+        http_options=_http_options(types, deadline),
+    )
+
+    with tracing.span('llm_generate'):
+        response = client.models.generate_content(
+            model=model,
+            contents=contents,
+            config=generate_content_config,
+        )
+    return response.text
+
+
+def generate(prompt, file_path=None, model=DEFAULT_MODEL, deadline=None):
+    """Run one generation and return the response text.
+
+    If file_path is given the file is uploaded and sent along with the prompt.
+    The call waits for a slot in llm_scheduler, attributed to the user and
+    lane set for the current thread with llm_scheduler.set_context. Raises
+    llm_scheduler.QuotaExceeded or llm_scheduler.QueueTimeout.
+
+    deadline is the time.monotonic() by which the whole call, queue wait
+    and upload included, must be done; after it GenerationTimeout is
+    raised. Calls made for a request whose client disconnects raise
+    Cancelled without waiting for the model (see cancellation).
+    """
+    provider = _generate_stub if LLM_PROVIDER == 'stub' else _generate_gemini
+
+    user, lane = llm_scheduler.current()
+    estimate = llm_scheduler.estimate_tokens(prompt, file_path)
+    llm_scheduler.check_quota(user, estimate)
+
+    cancelled = cancellation.check()
+    queue_timeout = llm_scheduler.LLM_QUEUE_TIMEOUT
+    if deadline is not None:
+        queue_timeout = min(queue_timeout, max(0.0, deadline - time.monotonic()))
+
+    queued = time.perf_counter()
+    try:
+        waiter = llm_scheduler.scheduler.acquire(
+            user, lane, estimate, timeout=queue_timeout,
+            cancelled=cancelled, poll_interval=cancellation.CANCEL_POLL_INTERVAL,
+        )
+    except llm_scheduler.QueueTimeout:
+        if deadline is not None and time.monotonic() >= deadline:
+            metrics.incr('llm_timeouts')
+            raise llm_scheduler.GenerationTimeout('Deadline passed while waiting for a model slot')
+        raise
+    tracing.add('llm_queue', time.perf_counter() - queued)
+    _begin()
+
+    def call():
+        start = time.time()
+        try:
+            return provider(prompt, file_path, model, deadline)
+        except Exception as e:
+            if _is_timeout(e):
+                metrics.incr('llm_timeouts')
+                raise llm_scheduler.GenerationTimeout(f"{model} did not answer in time") from e
+            metrics.incr('llm_errors')
+            raise
+        finally:
+            metrics.observe('llm_generate_seconds', time.time() - start)
+            _end()
+            llm_scheduler.scheduler.release(waiter)
+
+    if cancelled is None:
+        text = call()
+    else:
+        # Wait on another thread so the request can stop waiting; spans and
+        # the scheduler context go along
+        future = _calls.submit(contextvars.copy_context().run, call)
+        while True:
+            try:
+                text = future.result(timeout=cancellation.CANCEL_POLL_INTERVAL)
+                break
+            except FutureTimeout:
+                if cancelled():
+                    metrics.incr('llm_cancelled')
+                    metrics.incr('llm_cancelled_running')
+                    # The prompt was sent
+                    llm_scheduler.charge(user, estimate)
+                    raise llm_scheduler.Cancelled('The client disconnected')
+
+    llm_scheduler.charge(user, estimate + llm_scheduler.estimate_tokens(text or ''))
+    return text
+
+
+_BATCH_DONE = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_PARTIALLY_SUCCEEDED', 'JOB_STATE_FAILED',
+               'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED')
+
+
+def _generate_batch_stub(requests, model):
+    time.sleep(LLM_STUB_LATENCY)
+    return [LLM_STUB_RESPONSE for _ in requests]
+
+
+def _generate_batch_gemini(requests, model):
+    _, types = _load_sdk()
+    client = _get_client()
+
+    job = client.batches.create(
+        model=model,
+        src=[types.InlinedRequest(contents=_contents(client, types, prompt, file_path)) for prompt, file_path in requests],
+        config={'display_name': f"zybercv-{int(time.time())}"},
+    )
+    while job.state not in _BATCH_DONE:
+        time.sleep(LLM_BATCH_POLL_INTERVAL)
+        job = client.batches.get(name=job.name)
+    if job.state not in ('JOB_STATE_SUCCEEDED', 'JOB_STATE_PARTIALLY_SUCCEEDED'):
+        raise RuntimeError(f"Batch job {job.name} ended in state {job.state}")
+
+    texts = []
+    for item in job.dest.inlined_responses:
+        texts.append(item.response.text if item.response is not None and item.error is None else None)
+    return texts
+
+
+def generate_batch(requests, model=DEFAULT_MODEL):
+    """Run many generations as one batch prediction job.
+
+    requests is a list of (prompt, file_path). Cheaper than generate() per
+    call but slow: blocks until the provider finishes the whole job, which
+    can take hours. Jobs are not admitted by the scheduler, so at most
+    LLM_BATCH_MAX_REQUESTS requests are sent at a time. Returns the
+    response texts in order, None for requests that failed.
+    """
+    provider = _generate_batch_stub if LLM_PROVIDER == 'stub' else _generate_batch_gemini
+    size = max(1, LLM_BATCH_MAX_REQUESTS)
+
+    texts = []
+    for i in range(0, len(requests), size):
+        start = time.time()
+        try:
+            texts.extend(provider(requests[i:i + size], model))
+        except Exception:
+            metrics.incr('llm_batch_errors')
+            raise
+        finally:
+            metrics.observe('llm_batch_seconds', time.time() - start)
+    return texts
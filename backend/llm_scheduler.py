@@ -0,0 +1,240 @@
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import metrics
+
+# Admission control in front of model calls. Every generation waits here for
+# one of a fixed number of slots. Waiting calls are served by lane first:
+# interactive requests (the dashboard, interview analysis) before other
+# requests, and those before background work (question pools, precompute,
+# cache warming). Within a lane users are served in weighted fair order by
+# estimated tokens, so a user sending many or large calls can't crowd out
+# everyone else, and each user has a cap on concurrent calls and a daily
+# token quota.
+
+# Model calls running at once in this process
+LLM_CONCURRENCY = int(os.environ.get('LLM_CONCURRENCY', 8))
+# Of those, at most this many for one user, and for background work, so an
+# interactive call never waits for more than the remaining slots to free up
+LLM_USER_CONCURRENCY = int(os.environ.get('LLM_USER_CONCURRENCY', 2))
+LLM_BACKGROUND_SLOTS = int(os.environ.get('LLM_BACKGROUND_SLOTS', max(1, LLM_CONCURRENCY // 2)))
+# Seconds a call may wait for a slot before giving up
+LLM_QUEUE_TIMEOUT = float(os.environ.get('LLM_QUEUE_TIMEOUT', 60))
+# Estimated tokens a user may spend per UTC day, across workers (0 = no limit)
+LLM_USER_DAILY_TOKENS = int(os.environ.get('LLM_USER_DAILY_TOKENS', 0))
+# Token estimate for an uploaded file (a resume is one to three pages)
+LLM_FILE_TOKENS = int(os.environ.get('LLM_FILE_TOKENS', 1500))
+
+# Highest priority first
+LANES = ('interactive', 'standard', 'background')
+
+_user = contextvars.ContextVar('llm_user', default=None)
+_lane = contextvars.ContextVar('llm_lane', default='standard')
+
+
+class ModelUnavailable(Exception):
+    """A model call was not made"""
+
+
+class QueueTimeout(ModelUnavailable):
+    """No slot became free within LLM_QUEUE_TIMEOUT"""
+
+
+class QuotaExceeded(ModelUnavailable):
+    """The user has used up their daily tokens"""
+
+
+class GenerationTimeout(ModelUnavailable):
+    """A model call did not finish by its deadline"""
+
+
+class Cancelled(ModelUnavailable):
+    """The client went away, so the model call was given up"""
+
+
+def set_context(user=None, lane='standard'):
+    """Attribute the current thread's model calls to a user and a lane"""
+    _user.set(user)
+    _lane.set(lane)
+
+
+def set_user(user):
+    _user.set(user)
+
+
+def set_lane(lane):
+    _lane.set(lane)
+
+
+def current():
+    """(user, lane) of the current thread's model calls"""
+    return _user.get(), _lane.get()
+
+
+def estimate_tokens(text, file_path=None):
+    # About four characters per token for English text
+    return len(text) // 4 + (LLM_FILE_TOKENS if file_path else 0)
+
+
+class _Waiter:
+    __slots__ = ('user', 'lane', 'start', 'tag', 'seq', 'event', 'granted')
+
+    def __init__(self, user, lane, start, tag, seq):
+        self.user = user
+        self.lane = lane
+        self.start = start
+        self.tag = tag
+        self.seq = seq
+        self.event = threading.Event()
+        self.granted = False
+
+
+class Scheduler:
+    """Slots for model calls, granted by lane priority, then by start-time
+    fair queuing of users within a lane"""
+
+    def __init__(self, slots=LLM_CONCURRENCY, user_slots=LLM_USER_CONCURRENCY, background_slots=LLM_BACKGROUND_SLOTS):
+        self.slots = slots
+        self.user_slots = user_slots
+        self.background_slots = background_slots
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiting = {lane: [] for lane in LANES}
+        self._running = 0
+        self._running_lanes = Counter()
+        self._running_users = Counter()
+        # Virtual time of each lane, and the finish tag of each user's last
+        # call in it; a call's tag is where it would finish if every user
+        # got an equal (weighted) share of tokens
+        self._virtual = {lane: 0.0 for lane in LANES}
+        self._finish = {}
+
+    def _eligible(self, waiter):
+        if waiter.lane == 'background' and self._running_lanes['background'] >= self.background_slots:
+            return False
+        # Work not attributed to a user is only limited by its lane
+        return waiter.user is None or self._running_users[waiter.user] < self.user_slots
+
+    def _dispatch(self):
+        while self._running < self.slots:
+            chosen = None
+            for lane in LANES:
+                candidates = [waiter for waiter in self._waiting[lane] if self._eligible(waiter)]
+                if candidates:
+                    chosen = min(candidates, key=lambda waiter: (waiter.tag, waiter.seq))
+                    break
+            if chosen is None:
+                return
+            self._waiting[chosen.lane].remove(chosen)
+            self._virtual[chosen.lane] = max(self._virtual[chosen.lane], chosen.start)
+            self._running += 1
+            self._running_lanes[chosen.lane] += 1
+            self._running_users[chosen.user] += 1
+            chosen.granted = True
+            chosen.event.set()
+
+    def _gauges(self):
+        metrics.set_gauge('llm_running', self._running)
+        for lane in LANES:
+            metrics.set_gauge(f"llm_queued_{lane}", len(self._waiting[lane]))
+
+    def acquire(self, user, lane, cost, weight=1.0, timeout=LLM_QUEUE_TIMEOUT, cancelled=None, poll_interval=0.25):
+        """Wait for a slot; raises QueueTimeout after timeout seconds, or
+        Cancelled once cancelled() (checked every poll_interval) is true"""
+        lane = lane if lane in LANES else 'standard'
+        queued = time.time()
+        with self._lock:
+            start = max(self._virtual[lane], self._finish.get((lane, user), 0.0))
+            tag = start + max(cost, 1) / weight
+            if user is not None:
+                self._finish[(lane, user)] = tag
+                if len(self._finish) > 10000:
+                    # Users whose last call is behind the lane's clock start
+                    # from the clock anyway
+                    self._finish = {key: finish for key, finish in self._finish.items()
+                                    if finish > self._virtual[key[0]]}
+            waiter = _Waiter(user, lane, start, tag, next(self._seq))
+            self._waiting[lane].append(waiter)
+            self._dispatch()
+            self._gauges()
+
+        give_up = time.monotonic() + timeout
+        error = None
+        while error is None:
+            remaining = give_up - time.monotonic()
+            if waiter.event.wait(max(0.0, remaining if cancelled is None else min(remaining, poll_interval))):
+                break
+            if cancelled is not None and cancelled():
+                error = Cancelled('The client disconnected')
+            elif time.monotonic() >= give_up:
+                error = QueueTimeout(f"No model capacity within {timeout:g}s")
+        if error is not None:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiting[lane].remove(waiter)
+                    self._gauges()
+                    if isinstance(error, Cancelled):
+                        metrics.incr('llm_cancelled')
+                        metrics.incr('llm_cancelled_queued')
+                    else:
+                        metrics.incr('llm_queue_timeouts')
+                    raise error
+
+        waited = time.time() - queued
+        metrics.observe('llm_queue_wait_seconds', waited)
+        metrics.observe(f"llm_queue_wait_{lane}_seconds", waited)
+        return waiter
+
+    def release(self, waiter):
+        with self._lock:
+            self._running -= 1
+            self._running_lanes[waiter.lane] -= 1
+            self._running_users[waiter.user] -= 1
+            if not self._running_users[waiter.user]:
+                del self._running_users[waiter.user]
+            self._dispatch()
+            self._gauges()
+
+    @contextmanager
+    def slot(self, user, lane, cost, weight=1.0, timeout=LLM_QUEUE_TIMEOUT, cancelled=None, poll_interval=0.25):
+        waiter = self.acquire(user, lane, cost, weight, timeout, cancelled, poll_interval)
+        try:
+            yield
+        finally:
+            self.release(waiter)
+
+
+scheduler = Scheduler()
+
+# Daily token accounting, shared by all workers; set by the app with
+# set_usage_store(tokens_today, add_tokens)
+_usage_store = None
+
+
+def set_usage_store(tokens_today, add_tokens):
+    global _usage_store
+    _usage_store = (tokens_today, add_tokens)
+
+
+def tokens_left(user):
+    """Tokens the user may still spend today, or None if unlimited"""
+    if user is None or not LLM_USER_DAILY_TOKENS or _usage_store is None:
+        return None
+    return max(0, LLM_USER_DAILY_TOKENS - _usage_store[0](user))
+
+
+def check_quota(user, tokens=0):
+    left = tokens_left(user)
+    if left is not None and left < max(tokens, 1):
+        metrics.incr('llm_quota_rejections')
+        raise QuotaExceeded('Daily model quota exceeded')
+
+
+def charge(user, tokens):
+    if user is not None and _usage_store is not None and tokens > 0:
+        _usage_store[1](user, tokens)
@@ -0,0 +1,69 @@
+import threading
+from collections import defaultdict, deque
+
+# In-process metrics, exposed as JSON by the /metrics endpoint.
+# Each worker process keeps its own numbers.
+
+# Number of recent samples kept per timing for percentiles
+SAMPLE_SIZE = 1000
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_timings = {}
+
+
+def incr(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, seconds):
+    """Record a duration in seconds"""
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            timing = _timings[name] = {
+                'count': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'samples': deque(maxlen=SAMPLE_SIZE),
+            }
+        timing['count'] += 1
+        timing['total'] += seconds
+        timing['max'] = max(timing['max'], seconds)
+        timing['samples'].append(seconds)
+
+
+def _percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def snapshot():
+    """Return all metrics as a JSON-serializable dict"""
+    with _lock:
+        timings = {}
+        for name, timing in _timings.items():
+            samples = sorted(timing['samples'])
+            timings[name] = {
+                'count': timing['count'],
+                'avg': timing['total'] / timing['count'] if timing['count'] else 0.0,
+                'max': timing['max'],
+                'p50': _percentile(samples, 0.50),
+                'p95': _percentile(samples, 0.95),
+                'p99': _percentile(samples, 0.99),
+            }
+
+        return {
+            'counters': dict(_counters),
+            'gauges': dict(_gauges),
+            'timings': timings,
+        }
@@ -0,0 +1,137 @@
+import json
+import os
+import time
+
+import llm
+import llm_scheduler
+import metrics
+
+# Which model serves each endpoint. MODEL_ROUTES (JSON) or the JSON file at
+# MODEL_ROUTES_PATH overrides any of the defaults below per endpoint, e.g.
+#   {"dashboard": {"model": "gemini-2.5-pro", "fallback": ["gemini-2.0-flash"],
+#                  "progressive": true, "preview_model": "gemini-2.0-flash-lite",
+#                  "preview_budget": 3, "timeout": 90}}
+# Routes are read once at startup: cached results are versioned by model
+# (see cache_versions), so a change takes effect with a restart.
+
+ENDPOINTS = (
+    'analyze',             # /analyze/resume
+    'dashboard',           # /dashboard/v1
+    'jobs',                # /job/v1
+    'interview_content',   # /interview-content/v1
+    'question_bank',       # questions generated for the bank
+    'interview_turn',      # per-turn interview scoring
+    'interview_analysis',  # /interview-analyze
+)
+
+# Seconds a model call may take by default, queue wait and upload included
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60))
+
+DEFAULT_ROUTE = {
+    'model': llm.DEFAULT_MODEL,
+    # Deadline of the endpoint's model call in seconds, fallbacks included
+    # (0 = none)
+    'timeout': LLM_TIMEOUT,
+    # Tried in order when a call to the model fails
+    'fallback': [],
+    # Answer with a preview at once and replace it with the full model's
+    # result once ready (see app.py for what each endpoint previews with)
+    'progressive': False,
+    # Fast model for the preview, None for local previews only
+    'preview_model': None,
+    # Seconds a preview may take before the endpoint answers without it
+    'preview_budget': 3.0,
+}
+
+
+def load_routes(overrides):
+    """Routes of all endpoints, with overrides ({endpoint: {field: value}})
+    applied. Raises ValueError on unknown endpoints or fields."""
+    routes = {endpoint: dict(DEFAULT_ROUTE) for endpoint in ENDPOINTS}
+    if not isinstance(overrides, dict):
+        raise ValueError("Model routes must be a JSON object keyed by endpoint")
+    for endpoint, fields in overrides.items():
+        if endpoint not in routes:
+            raise ValueError(f"Unknown endpoint in model routes: {endpoint}")
+        if not isinstance(fields, dict):
+            raise ValueError(f"Model route of {endpoint} must be a JSON object")
+        unknown = set(fields) - set(DEFAULT_ROUTE)
+        if unknown:
+            raise ValueError(f"Unknown fields in model route of {endpoint}: {', '.join(sorted(unknown))}")
+        routes[endpoint].update(fields)
+
+    for endpoint, route in routes.items():
+        if not route['model'] or not isinstance(route['model'], str):
+            raise ValueError(f"Model route of {endpoint} needs a model")
+        if isinstance(route['fallback'], str):
+            route['fallback'] = [route['fallback']]
+        route['fallback'] = [model for model in route['fallback'] if model and model != route['model']]
+        route['progressive'] = bool(route['progressive'])
+        route['preview_budget'] = max(0.0, float(route['preview_budget']))
+        route['timeout'] = max(0.0, float(route['timeout']))
+    return routes
+
+
+def _read_overrides():
+    path = os.environ.get('MODEL_ROUTES_PATH')
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(os.environ.get('MODEL_ROUTES') or '{}')
+
+
+# A broken routing config should stop the worker from starting, not
+# surface later as failing model calls
+ROUTES = load_routes(_read_overrides())
+
+
+def route(endpoint):
+    return ROUTES[endpoint]
+
+
+def model(endpoint):
+    """The endpoint's main model"""
+    return ROUTES[endpoint]['model']
+
+
+def progressive(endpoint):
+    return ROUTES[endpoint]['progressive']
+
+
+def deadline(endpoint):
+    """time.monotonic() deadline of a model call for the endpoint, or None"""
+    timeout = ROUTES[endpoint]['timeout']
+    return time.monotonic() + timeout if timeout else None
+
+
+def generate(endpoint, prompt, file_path=None):
+    """llm.generate with the endpoint's model, then its fallback models in
+    order if a call fails, all within the endpoint's timeout. Quota, queue,
+    deadline and cancellation errors are not retried: they would fail the
+    same way with any model."""
+    current = ROUTES[endpoint]
+    models = [current['model']] + current['fallback']
+    call_deadline = deadline(endpoint)
+    for i, name in enumerate(models):
+        try:
+            return llm.generate(prompt, file_path=file_path, model=name, deadline=call_deadline)
+        except llm_scheduler.GenerationTimeout:
+            metrics.incr(f"model_timeouts_{endpoint}")
+            raise
+        except llm_scheduler.Cancelled:
+            metrics.incr(f"model_cancelled_{endpoint}")
+            raise
+        except llm_scheduler.ModelUnavailable:
+            raise
+        except Exception as e:
+            if i == len(models) - 1:
+                raise
+            metrics.incr('model_fallbacks')
+            metrics.incr(f"model_fallbacks_{endpoint}")
+            print(f"Model {name} failed for {endpoint}, trying {models[i + 1]}: {str(e)}")
+
+
+def fixer(endpoint):
+    """fix callable for json_repair.parse: asks the endpoint's models to
+    correct JSON they got wrong"""
+    return lambda prompt: generate(endpoint, prompt)
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import re
+import zlib
+
+import numpy as np
+
+# MinHash signatures of resume text, banded for locality-sensitive hashing,
+# so a re-upload of an almost identical resume can find the earlier one.
+
+# Estimated Jaccard similarity above which two resumes count as the same
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.9))
+# Hash functions per signature, split into LSH bands of equal size. With
+# 128 hashes in 16 bands of 8, pairs above ~0.7 similarity almost always
+# share a band and pairs below ~0.5 almost never do.
+MINHASH_PERMUTATIONS = int(os.environ.get('MINHASH_PERMUTATIONS', 128))
+LSH_BANDS = int(os.environ.get('LSH_BANDS', 16))
+# Words per shingle
+SHINGLE_SIZE = 3
+# Distinct shingles a text needs to be signed. Empty or unreadable text
+# (scans, .doc files) would otherwise give every such resume the same
+# signature.
+MIN_SHINGLES = int(os.environ.get('NEAR_DUPLICATE_MIN_SHINGLES', 20))
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+# Fixed seed: signatures are stored, so they must be comparable across
+# processes and restarts
+_rng = np.random.default_rng(20250330)
+_A = _rng.integers(1, 2**63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text):
+    """Hashes of the overlapping word n-grams of a text"""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [''] * (SHINGLE_SIZE - len(words))
+    grams = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def signature(text):
+    """MinHash signature of a text, as a uint32 array, or None if the text
+    is too short to compare (see MIN_SHINGLES)"""
+    hashes = shingles(text or '')
+    if len(hashes) < max(1, MIN_SHINGLES):
+        return None
+    # Multiply-shift hashing, one function per column; uint64 wraps around
+    with np.errstate(over='ignore'):
+        permuted = (hashes[:, None] * _A[None, :] + _B[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def signature_bytes(sig):
+    return sig.astype('<u4').tobytes()
+
+
+def signature_from_bytes(data):
+    return np.frombuffer(data, dtype='<u4')
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(first == second))
+
+
+def band_keys(sig):
+    """One bucket key per LSH band; similar texts share at least one"""
+    rows = len(sig) // LSH_BANDS
+    keys = []
+    for band in range(LSH_BANDS):
+        digest = hashlib.blake2b(sig[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
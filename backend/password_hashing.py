@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import metrics
+import tracing
+
+# KDF parameters for new hashes, in werkzeug's method format, e.g.
+# "scrypt:32768:8:1" or "pbkdf2:sha256:1000000". Stored hashes using other
+# parameters are re-hashed the next time the user logs in.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+
+# Processes dedicated to hashing. 0 hashes inline on the request thread.
+HASH_POOL_WORKERS = int(os.environ.get('HASH_POOL_WORKERS', min(2, os.cpu_count() or 1)))
+# Hashes allowed to wait for a free process before new ones are rejected
+HASH_QUEUE_LIMIT = int(os.environ.get('HASH_QUEUE_LIMIT', 32))
+# Seconds a request waits for its hash before giving up
+HASH_TIMEOUT = float(os.environ.get('HASH_TIMEOUT', 10))
+
+
+class HashPoolBusy(Exception):
+    """Raised when the hashing queue is full, the caller should retry later"""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, HASH_POOL_WORKERS) + HASH_QUEUE_LIMIT)
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def _timed_call(func, *args):
+    # Runs in the pool process, reports when work actually started so the
+    # parent can split queue wait from KDF time
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time()
+
+
+def _get_pool():
+    global _pool
+    # Created lazily so each worker process (after a fork) gets its own
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS)
+    return _pool
+
+
+def _track_in_flight(delta):
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += delta
+        metrics.set_gauge('password_hash_in_flight', _in_flight)
+
+
+def _release(future):
+    _track_in_flight(-1)
+    _slots.release()
+
+
+def _run(func, *args):
+    if HASH_POOL_WORKERS <= 0:
+        start = time.time()
+        result = func(*args)
+        metrics.observe('password_hash_seconds', time.time() - start)
+        return result
+
+    if not _slots.acquire(blocking=False):
+        metrics.incr('password_hash_rejected')
+        raise HashPoolBusy('Password hashing queue is full')
+
+    submitted = time.time()
+    _track_in_flight(1)
+    try:
+        future = _get_pool().submit(_timed_call, func, *args)
+    except Exception:
+        _track_in_flight(-1)
+        _slots.release()
+        raise
+    # The slot is held until the hash is done or cancelled, not just until
+    # the caller stops waiting, so HASH_QUEUE_LIMIT bounds the real backlog
+    future.add_done_callback(_release)
+    try:
+        result, started, finished = future.result(timeout=HASH_TIMEOUT)
+    except TimeoutError:
+        # Drop it from the queue if it hasn't started yet
+        future.cancel()
+        metrics.incr('password_hash_timeouts')
+        raise HashPoolBusy('Password hashing timed out')
+
+    metrics.incr('password_hash_completed')
+    metrics.observe('password_hash_queue_wait_seconds', max(0.0, started - submitted))
+    metrics.observe('password_hash_seconds', finished - started)
+    return result
+
+
+def hash_password(password):
+    """Hash a password with the current parameters, off the request thread"""
+    with tracing.span('password_hash'):
+        return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash, off the request thread"""
+    with tracing.span('password_hash'):
+        return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True if the stored hash was made with different KDF parameters"""
+    method = password_hash.split('$', 1)[0]
+    return method != PASSWORD_HASH_METHOD
+
+
+def has_capacity():
+    """True if the queue is not saturated, used to skip optional re-hashing"""
+    with _in_flight_lock:
+        return _in_flight < max(1, HASH_POOL_WORKERS)
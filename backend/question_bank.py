@@ -0,0 +1,127 @@
+import hashlib
+import os
+import random
+import re
+
+import json_repair
+
+# Interview questions are stored per topic: a skill name ("react") or a
+# role bucket ("role:frontend developer"). A resume's topics come from its
+# skill fingerprint, so candidates with the same profile share questions.
+
+# Questions a topic needs in the bank before it counts as covered
+QUESTION_BANK_MIN_PER_TOPIC = int(os.environ.get('QUESTION_BANK_MIN_PER_TOPIC', 3))
+# Share of a resume's topics that must be covered to skip the model entirely
+QUESTION_BANK_COVERAGE = float(os.environ.get('QUESTION_BANK_COVERAGE', 0.8))
+# Questions generated per missing topic
+QUESTION_BANK_GENERATE_PER_TOPIC = int(os.environ.get('QUESTION_BANK_GENERATE_PER_TOPIC', 5))
+# Questions served per interview
+INTERVIEW_QUESTION_COUNT = int(os.environ.get('INTERVIEW_QUESTION_COUNT', 8))
+# The frontend asks for questions of at most 15 words, allow a little slack
+MAX_QUESTION_WORDS = 20
+
+ROLE_PREFIX = 'role:'
+
+GENERATE_PROMPT = """
+You are an experienced technical interviewer. Write interview questions for each topic below.
+Return only a JSON object mapping each topic exactly as given to a list of {count} questions, no other text:
+
+{{
+  "topic": ["question", ...]
+}}
+
+Make sure each question length is max 15 words and ends with a question mark.
+Topics starting with "role:" are job roles, ask about experience and responsibilities in that role.
+Other topics are skills, ask practical questions about using that skill.
+
+Topics:
+{topics}
+"""
+
+
+def fingerprint_topics(fingerprint):
+    """Bank topics for a skill fingerprint, role first"""
+    return [ROLE_PREFIX + fingerprint['role']] + list(fingerprint['skills'])
+
+
+def normalize_question(question):
+    return ' '.join(str(question).split())
+
+
+def question_hash(question):
+    """Dedup key for a question, ignoring case, spacing and punctuation"""
+    normalized = re.sub(r'[^a-z0-9 ]', '', normalize_question(question).lower())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def coverage(topics, counts):
+    """Split topics into covered and missing, and return the covered share"""
+    covered = [topic for topic in topics if counts.get(topic, 0) >= QUESTION_BANK_MIN_PER_TOPIC]
+    missing = [topic for topic in topics if topic not in covered]
+    return covered, missing, (len(covered) / len(topics) if topics else 0.0)
+
+
+def build_generate_prompt(topics):
+    return GENERATE_PROMPT.format(
+        count=QUESTION_BANK_GENERATE_PER_TOPIC,
+        topics='\n'.join(f"- {topic}" for topic in topics),
+    )
+
+
+def parse_generated(text, topics, fix=None):
+    """Parse the model's {topic: [questions]} JSON. fix is passed on to
+    json_repair.parse.
+
+    Only the requested topics are kept, and over-long or empty questions
+    are dropped. Raises ValueError if the text is not a JSON object.
+    """
+    parsed = json_repair.parse(text, 'question_bank', fix=fix)
+
+    wanted = {topic.lower(): topic for topic in topics}
+    questions = {}
+    for topic, items in parsed.items():
+        topic = wanted.get(str(topic).strip().lower())
+        if topic is None or not isinstance(items, list):
+            continue
+        kept = [normalize_question(item) for item in items if isinstance(item, str)]
+        questions[topic] = [q for q in kept if q and len(q.split()) <= MAX_QUESTION_WORDS]
+    return questions
+
+
+def pick_questions(questions_by_topic, count=None):
+    """Pick questions round-robin across topics, in random order.
+
+    The role question comes first; every interview draws a different
+    sample from the bank.
+    """
+    count = count or INTERVIEW_QUESTION_COUNT
+    pools = []
+    for topic, questions in questions_by_topic.items():
+        pool = list(questions)
+        random.shuffle(pool)
+        pools.append((topic, pool))
+    # Role first, then skills in random order
+    role_pools = [pool for topic, pool in pools if topic.startswith(ROLE_PREFIX)]
+    skill_pools = [pool for topic, pool in pools if not topic.startswith(ROLE_PREFIX)]
+    random.shuffle(skill_pools)
+    pools = role_pools + skill_pools
+
+    picked = []
+    seen = set()
+    while len(picked) < count and any(pools):
+        for pool in pools:
+            if pool and len(picked) < count:
+                question = pool.pop()
+                key = question_hash(question)
+                if key not in seen:
+                    seen.add(key)
+                    picked.append(question)
+    return picked
+
+
+def format_questions(name, questions):
+    """Render questions the way the mock interview page parses them:
+    a greeting line, then one numbered question per line"""
+    lines = [f"Hello {name}! Thanks for joining, let's get started with your interview."]
+    lines.extend(f"{i}. {question}" for i, question in enumerate(questions, 1))
+    return '\n'.join(lines)
@@ -0,0 +1,250 @@
+import math
+import threading
+
+import numpy as np
+
+# In-memory inverted index over resume term counts, for ranking stored
+# resumes against a job description with BM25.
+#
+# New resumes are appended to a small buffer; the buffer is sealed into an
+# immutable segment (postings grouped by term) before a search, and
+# segments of similar size are merged so there are only ever a few. BM25
+# needs no per-document norms, so adding resumes never touches existing
+# postings.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class Segment:
+    """Immutable postings for a batch of resumes, grouped by term"""
+
+    def __init__(self, terms, docs, counts, vocabulary_size):
+        order = np.argsort(terms, kind='stable')
+        self.docs = docs[order].astype(np.int32)
+        self.counts = counts[order].astype(np.float32)
+        frequency = np.bincount(terms, minlength=vocabulary_size)
+        self.term_ptr = np.concatenate(([0], np.cumsum(frequency))).astype(np.int64)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def terms(self):
+        return np.repeat(np.arange(len(self.term_ptr) - 1), np.diff(self.term_ptr))
+
+    def postings(self, term_ids):
+        """Positions of the postings of term_ids, and each term's count"""
+        term_ids = term_ids[term_ids < len(self.term_ptr) - 1]
+        starts = self.term_ptr[term_ids]
+        lengths = self.term_ptr[term_ids + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return term_ids, lengths, positions
+
+
+def merge_segments(first, second, vocabulary_size):
+    return Segment(
+        np.concatenate((first.terms(), second.terms())),
+        np.concatenate((first.docs, second.docs)),
+        np.concatenate((first.counts, second.counts)),
+        vocabulary_size,
+    )
+
+
+class ResumeIndex:
+    """Inverted index of resumes, appended to as resumes are uploaded.
+
+    Documents are numbered in the order they are added; resume_ids,
+    user_ids and upload times are kept alongside for filtering.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.vocabulary = {}
+        self.segments = []
+        # Highest ResumeTerms row added, for incremental syncs
+        self.last_row_id = 0
+        # Row ids below last_row_id not seen yet, with when they were
+        # skipped: server databases hand out ids before commit, so a row
+        # can be committed after rows with higher ids
+        self._skipped_rows = {}
+
+        self._resume_ids = []
+        self._user_ids = []
+        self._uploaded = []
+        self._lengths = []
+        self._columns = None
+        self._positions = {}
+        self._latest = {}
+
+        self._buffer_terms = []
+        self._buffer_docs = []
+        self._buffer_counts = []
+
+    def __len__(self):
+        return len(self._resume_ids)
+
+    def add(self, resume_id, user_id, uploaded, counts, row_id=None):
+        """Add one resume's term counts; uploaded is a POSIX timestamp"""
+        with self.lock:
+            if resume_id in self._positions:
+                return
+            doc = len(self._resume_ids)
+            self._positions[resume_id] = doc
+            self._resume_ids.append(resume_id)
+            self._user_ids.append(user_id)
+            self._uploaded.append(uploaded)
+            self._lengths.append(sum(counts.values()))
+            self._columns = None
+
+            latest = self._latest.get(user_id)
+            if latest is None or (uploaded, resume_id) > (self._uploaded[latest], self._resume_ids[latest]):
+                self._latest[user_id] = doc
+
+            for term, count in counts.items():
+                self._buffer_terms.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                self._buffer_docs.append(doc)
+                self._buffer_counts.append(count)
+
+            if row_id is not None:
+                self._skipped_rows.pop(row_id, None)
+                self.last_row_id = max(self.last_row_id, row_id)
+
+    def skip_rows(self, row_ids, now):
+        """Remember row ids a sync passed over, to look for them again"""
+        with self.lock:
+            for row_id in row_ids:
+                self._skipped_rows.setdefault(row_id, now)
+
+    def skipped_rows(self, since):
+        """Row ids passed over at or after since; older ones are forgotten
+        (ids of rolled back or deleted rows never show up)"""
+        with self.lock:
+            self._skipped_rows = {row_id: at for row_id, at in self._skipped_rows.items() if at >= since}
+            return sorted(self._skipped_rows)
+
+    def _seal(self):
+        # Turn buffered postings into a segment, then merge segments of
+        # similar size so their number stays logarithmic
+        if self._buffer_docs:
+            self.segments.append(Segment(
+                np.array(self._buffer_terms, dtype=np.int64),
+                np.array(self._buffer_docs, dtype=np.int32),
+                np.array(self._buffer_counts, dtype=np.float32),
+                len(self.vocabulary),
+            ))
+            self._buffer_terms, self._buffer_docs, self._buffer_counts = [], [], []
+        while len(self.segments) >= 2 and len(self.segments[-2]) <= 4 * len(self.segments[-1]):
+            second = self.segments.pop()
+            first = self.segments.pop()
+            self.segments.append(merge_segments(first, second, len(self.vocabulary)))
+
+    def columns(self):
+        """Per-document arrays: resume_ids, user_ids, uploaded, lengths"""
+        if self._columns is None:
+            self._columns = {
+                'resume_ids': np.array(self._resume_ids, dtype=np.int64),
+                'user_ids': np.array(self._user_ids, dtype=np.int64),
+                'uploaded': np.array(self._uploaded, dtype=np.float64),
+                'lengths': np.array(self._lengths, dtype=np.float32),
+            }
+        return self._columns
+
+    def filter_mask(self, latest_only=False, required_terms=(), uploaded_after=None):
+        """Documents passing the filters: each user's newest resume only,
+        containing all required_terms, uploaded after a POSIX timestamp"""
+        with self.lock:
+            self._seal()
+            mask = np.ones(len(self), dtype=bool)
+
+            if latest_only:
+                mask[:] = False
+                mask[np.fromiter(self._latest.values(), dtype=np.int64, count=len(self._latest))] = True
+
+            for term in required_terms:
+                found = np.zeros(len(self), dtype=bool)
+                term_id = self.vocabulary.get(term)
+                if term_id is not None:
+                    for segment in self.segments:
+                        _, _, positions = segment.postings(np.array([term_id]))
+                        found[segment.docs[positions]] = True
+                mask &= found
+
+            if uploaded_after is not None:
+                mask &= self.columns()['uploaded'] > uploaded_after
+            return mask
+
+    def scores(self, query_counts):
+        """BM25 score of every document for a query's term counts"""
+        with self.lock:
+            self._seal()
+            n = len(self)
+            scores = np.zeros(n, dtype=np.float64)
+            if not n:
+                return scores
+
+            term_ids = np.array(
+                [self.vocabulary[term] for term in query_counts if term in self.vocabulary],
+                dtype=np.int64,
+            )
+            if not len(term_ids):
+                return scores
+            query_weights = np.array(
+                [1.0 + math.log(query_counts[term]) for term in query_counts if term in self.vocabulary],
+                dtype=np.float64,
+            )
+
+            lengths = self.columns()['lengths']
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+
+            # Document frequency of each query term across all segments
+            document_frequency = np.zeros(len(term_ids), dtype=np.float64)
+            for segment in self.segments:
+                in_range = term_ids < len(segment.term_ptr) - 1
+                ids = term_ids[in_range]
+                document_frequency[in_range] += segment.term_ptr[ids + 1] - segment.term_ptr[ids]
+            idf = np.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+            term_weight = dict(zip(term_ids.tolist(), idf * query_weights))
+
+            for segment in self.segments:
+                ids, term_lengths, positions = segment.postings(term_ids)
+                if not len(positions):
+                    continue
+                docs = segment.docs[positions]
+                tf = segment.counts[positions]
+                weights = np.repeat([term_weight[i] for i in ids.tolist()], term_lengths)
+                scores += np.bincount(
+                    docs,
+                    weights=weights * tf * (BM25_K1 + 1) / (tf + length_norm[docs]),
+                    minlength=n,
+                )
+            return scores
+
+
+def rank(index, counts, mask=None, limit=20, after=None):
+    """One page of documents ranked by score, best first.
+
+    mask limits the candidates, after is the (score, resume_id) of the last
+    result of the previous page. Returns (page, total) where page is a list
+    of (resume_id, score) and total the number of matching documents.
+    """
+    with index.lock:
+        scores = index.scores(counts)
+        resume_ids = index.columns()['resume_ids']
+        candidates = scores > 0
+        if mask is not None:
+            candidates &= mask
+        total = int(candidates.sum())
+
+        if after is not None:
+            after_score, after_id = after
+            candidates &= (scores < after_score) | ((scores == after_score) & (resume_ids < after_id))
+
+        docs = np.flatnonzero(candidates)
+        if len(docs) > limit:
+            # Keep everything tied with the last score on the page, so the
+            # tie-break below sees all of them
+            kth = np.partition(scores[docs], len(docs) - limit)[len(docs) - limit]
+            docs = docs[scores[docs] >= kth]
+        # Best score first, newest resume first among ties
+        docs = docs[np.lexsort((-resume_ids[docs], -scores[docs]))][:limit]
+        return [(int(resume_ids[doc]), float(scores[doc])) for doc in docs], total
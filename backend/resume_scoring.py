@@ -0,0 +1,484 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+import json_repair
+from skills import extract_skills
+
+# Deterministic resume checks for the categories that don't need a model:
+# ATS & Format, Keywords Usage, Space Utilization, Grammar & Spelling and
+# Action Verbs. Same text in, same scores out.
+
+LOCAL_CATEGORIES = ('ats-parse', 'keywords', 'space', 'grammar', 'action-verbs')
+MODEL_CATEGORIES = ('impact', 'sections', 'style')
+
+# Display settings for every category, in the order the page shows them
+CATEGORY_META = {
+    'ats-parse': {
+        'title': 'ATS & Format', 'icon': 'file-alt', 'iconColor': 'text-red-500',
+        'scoreClass': 'bg-red-100 text-red-600', 'category': 'ESSENTIALS',
+        'sectionTitle': 'ATS & FORMAT ANALYSIS', 'sectionIcon': 'robot',
+        'scoreColor': 'from-red-500 to-red-400', 'layout': 'standard',
+        'actionText': 'Fix ATS issues',
+    },
+    'impact': {
+        'title': 'Content Quality', 'icon': 'chart-line', 'iconColor': 'text-orange-500',
+        'scoreClass': 'bg-orange-100 text-orange-600', 'category': 'ESSENTIALS',
+    },
+    'keywords': {
+        'title': 'Keywords Usage', 'icon': 'key', 'iconColor': 'text-yellow-500',
+        'scoreClass': 'bg-yellow-100 text-yellow-600', 'category': 'ESSENTIALS',
+        'sectionTitle': 'KEYWORDS ANALYSIS', 'sectionIcon': 'key',
+        'scoreColor': 'from-yellow-400 to-yellow-300', 'layout': 'compact',
+        'actionText': 'Strengthen your keywords',
+    },
+    'sections': {
+        'title': 'Structure', 'icon': 'layer-group', 'iconColor': 'text-blue-500',
+        'scoreClass': 'bg-blue-100 text-blue-600', 'category': 'LAYOUT',
+    },
+    'style': {
+        'title': 'Visual Appeal', 'icon': 'paint-brush', 'iconColor': 'text-green-500',
+        'scoreClass': 'bg-green-100 text-green-600', 'category': 'LAYOUT',
+    },
+    'space': {
+        'title': 'Space Utilization', 'icon': 'expand', 'iconColor': 'text-indigo-500',
+        'scoreClass': 'bg-indigo-100 text-indigo-600', 'category': 'LAYOUT',
+        'sectionTitle': 'SPACE UTILIZATION', 'sectionIcon': 'expand',
+        'scoreColor': 'from-indigo-400 to-indigo-300', 'layout': 'dashboard',
+        'actionText': 'Balance your page layout',
+    },
+    'grammar': {
+        'title': 'Grammar & Spelling', 'icon': 'spell-check', 'iconColor': 'text-purple-500',
+        'scoreClass': 'bg-purple-100 text-purple-600', 'category': 'LANGUAGE',
+        'sectionTitle': 'GRAMMAR & SPELLING', 'sectionIcon': 'spell-check',
+        'scoreColor': 'from-purple-400 to-purple-300', 'layout': 'minimal',
+        'actionText': 'Proofread your resume',
+    },
+    'action-verbs': {
+        'title': 'Action Verbs', 'icon': 'bolt', 'iconColor': 'text-pink-500',
+        'scoreClass': 'bg-pink-100 text-pink-600', 'category': 'LANGUAGE',
+        'sectionTitle': 'ACTION VERBS', 'sectionIcon': 'bolt',
+        'scoreColor': 'from-pink-400 to-pink-300', 'layout': 'list',
+        'actionText': 'Rewrite weak bullet points',
+    },
+}
+
+# Standard section headings -> how they appear in resumes
+SECTION_HEADINGS = {
+    'contact': ['contact', 'contact details', 'contact information', 'personal details', 'personal information'],
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment history',
+                   'work history', 'internships', 'internship', 'employment'],
+    'education': ['education', 'academic background', 'academics', 'qualifications', 'education and training',
+                  'academic details'],
+    'skills': ['skills', 'technical skills', 'soft skills', 'core competencies', 'key skills', 'skills and abilities',
+               'tools and technologies', 'technologies'],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects'],
+    'certifications': ['certifications', 'certificates', 'licenses and certifications', 'courses'],
+    'achievements': ['achievements', 'awards', 'honors', 'accomplishments', 'awards and achievements'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies', 'activities', 'extracurricular activities'],
+}
+REQUIRED_SECTIONS = ('experience', 'education', 'skills')
+
+ACTION_VERBS = frozenset("""
+achieved accelerated administered analyzed architected automated boosted built championed coached
+collaborated completed conceived consolidated constructed coordinated created cut decreased defined
+delivered deployed designed developed devised directed doubled drove eliminated enabled engineered
+established evaluated executed expanded facilitated founded generated grew guided headed identified
+implemented improved increased initiated innovated installed instituted integrated introduced invented
+launched led maintained managed maximized mentored migrated minimized modernized monitored negotiated
+optimized orchestrated organized overhauled oversaw partnered performed pioneered planned presented
+prioritized produced programmed proposed published raised rebuilt reduced redesigned refactored
+resolved restructured revamped saved scaled secured shipped simplified spearheaded standardized
+streamlined strengthened supervised tested trained transformed tripled troubleshot upgraded won wrote
+""".split())
+
+WEAK_PHRASES = [
+    'responsible for', 'worked on', 'helped', 'assisted', 'involved in', 'participated in',
+    'tasked with', 'duties included', 'familiar with', 'was part of', 'in charge of',
+]
+
+MISSPELLINGS = {
+    'recieve': 'receive', 'acheive': 'achieve', 'acheived': 'achieved', 'managment': 'management',
+    'responsibilty': 'responsibility', 'sucessful': 'successful', 'sucessfully': 'successfully',
+    'developement': 'development', 'enviroment': 'environment', 'experiance': 'experience',
+    'knowlege': 'knowledge', 'proffesional': 'professional', 'seperate': 'separate',
+    'occured': 'occurred', 'untill': 'until', 'begining': 'beginning', 'comunication': 'communication',
+    'teh': 'the', 'adress': 'address', 'calender': 'calendar', 'definately': 'definitely',
+    'wich': 'which', 'accomodate': 'accommodate', 'maintainance': 'maintenance',
+    'performace': 'performance', 'analysed': 'analyzed', 'collegue': 'colleague',
+    'independant': 'independent', 'succesful': 'successful', 'techincal': 'technical',
+}
+
+# Bullet glyphs, including the "o" and private-use symbols Word exports
+_BULLET = re.compile(r'^\s*([•·▪●◦‣⁃∙*\-–—>]|[\ue000-\uf8ff]|o(?=\s))\s*')
+_WORD = re.compile(r"[A-Za-z][A-Za-z'+#.-]*")
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_PHONE = re.compile(r'(?:\+?\d[\d\s().-]{8,}\d)')
+_LINKEDIN = re.compile(r'linkedin\.com/', re.IGNORECASE)
+# Replacement characters and private-use icon glyphs
+_ODD_GLYPHS = re.compile(r'[\ufffd\ue000-\uf8ff]')
+_COLUMN_GAP = re.compile(r'\S {4,}\S')
+_REPEATED_WORD = re.compile(r'\b(\w{2,})\s+\1\b', re.IGNORECASE)
+_DOUBLE_PUNCTUATION = re.compile(r'(?<!\.)(\.\.|,,|;;|\s[,.;:](?=\s|$))(?!\.)')
+_FIRST_PERSON = re.compile(r'\b(I|me|my|myself)\b')
+_WEAK = re.compile(r'\b(' + '|'.join(re.escape(phrase) for phrase in WEAK_PHRASES) + r')\b', re.IGNORECASE)
+_MISSPELLED = re.compile(r'\b(' + '|'.join(MISSPELLINGS) + r')\b', re.IGNORECASE)
+_HEADING_ALIASES = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING = re.compile(
+    r'^\s*(' + '|'.join(sorted(map(re.escape, _HEADING_ALIASES), key=len, reverse=True)) + r')\s*:?\s*$',
+    re.IGNORECASE,
+)
+
+# Words per page a one or two page resume usually has
+WORDS_PER_PAGE = (250, 750)
+
+
+def _clamp(score):
+    return int(max(0, min(100, round(score))))
+
+
+def find_headings(lines):
+    """(line index, section) for every line that is a standard heading"""
+    headings = []
+    for i, line in enumerate(lines):
+        match = _HEADING.match(line)
+        if match:
+            headings.append((i, _HEADING_ALIASES[match.group(1).lower()]))
+    return headings
+
+
+def _is_action_verb(word):
+    word = word.lower()
+    if word in ACTION_VERBS:
+        return True
+    # Present tense and base forms of the listed verbs ("build", "leads")
+    stem = word[:-1] if word.endswith('s') else word
+    return any(form in ACTION_VERBS for form in (stem + 'ed', stem + 'd', stem[:-1] + 'ied'))
+
+
+class ResumeDocument:
+    """Text of a resume split into pages, lines, bullets and sections"""
+
+    def __init__(self, text, filename=''):
+        self.text = text
+        self.filename = filename
+        self.pages = text.split('\f')
+        self.lines = [line.strip() for line in text.splitlines() if line.strip()]
+        self.headings = find_headings(self.lines)
+        self.sections = {section for _, section in self.headings}
+
+        # Bullets of the experience and projects sections; skills, education
+        # and interests lists are bulleted too but aren't achievements
+        described = self._section_lines('experience', 'projects')
+        self.bullets = []
+        for line in described:
+            match = _BULLET.match(line)
+            if match and len(line) > match.end():
+                self.bullets.append(line[match.end():])
+        if not self.bullets:
+            # No bullet glyphs survived extraction: use sentence-like lines
+            # of those sections instead
+            self.bullets = [line for line in described if len(line.split()) >= 5]
+
+        self.words = _WORD.findall(text)
+        self.line_words = np.array([len(line.split()) for line in self.lines], dtype=np.int64)
+        page_words = np.array([len(page.split()) for page in self.pages], dtype=np.int64)
+        if len(self.pages) == 1:
+            # Not paginated (DOCX, TXT): estimate the printed pages
+            estimated = max(1, int(np.ceil(len(self.words) / 550)))
+            page_words = np.full(estimated, len(self.words) / estimated)
+        self.page_words = page_words
+
+    def _section_lines(self, *sections):
+        picked = []
+        bounds = self.headings + [(len(self.lines), None)]
+        for (start, section), (end, _) in zip(bounds, bounds[1:]):
+            if section in sections:
+                picked.extend(self.lines[start + 1:end])
+        return picked
+
+
+def check_ats(doc):
+    findings, suggestions, penalty = [], [], 0
+
+    if len(doc.text.strip()) < 200:
+        findings.append('Very little text could be read from the file.')
+        suggestions.append('Export the resume as a text-based PDF or DOCX, not a scanned image.')
+        penalty += 60
+    if not _EMAIL.search(doc.text):
+        findings.append('No email address was found.')
+        suggestions.append('Add your email address in the header as plain text.')
+        penalty += 10
+    if not _PHONE.search(doc.text):
+        findings.append('No phone number was found.')
+        suggestions.append('Add a phone number in the header as plain text.')
+        penalty += 8
+    missing = [section for section in REQUIRED_SECTIONS if section not in doc.sections]
+    for section in missing:
+        findings.append(f"No standard \"{section.title()}\" heading was found.")
+        penalty += 10
+    if missing:
+        suggestions.append(f"Use standard headings ATS systems recognize: {', '.join(s.title() for s in missing)}.")
+    if not _LINKEDIN.search(doc.text):
+        findings.append('No LinkedIn profile link was found.')
+        suggestions.append('Add your LinkedIn URL so recruiters can verify your profile.')
+        penalty += 4
+
+    odd = len(_ODD_GLYPHS.findall(doc.text))
+    if odd > 5:
+        findings.append(f"{odd} special characters or icons could not be read as text.")
+        suggestions.append('Replace icon fonts and symbols with plain text labels.')
+        penalty += min(15, odd)
+    columns = sum(1 for line in doc.lines if _COLUMN_GAP.search(line))
+    if columns > 3:
+        findings.append(f"{columns} lines look like a multi-column or table layout.")
+        suggestions.append('Use a single-column layout; tables and columns are often read out of order.')
+        penalty += min(15, columns * 2)
+    image_pages = int(np.sum(doc.page_words < 40)) if len(doc.pages) > 1 else 0
+    if image_pages:
+        findings.append(f"{image_pages} page(s) have almost no readable text.")
+        suggestions.append('Avoid putting content in images or text boxes.')
+        penalty += 15 * image_pages
+
+    return _clamp(100 - penalty), findings, suggestions
+
+
+def check_keywords(doc):
+    findings, suggestions = [], []
+    counts = extract_skills(doc.text)
+    soft = {'communication', 'leadership', 'teamwork', 'problem solving', 'project management'}
+    hard = {skill: count for skill, count in counts.items() if skill not in soft}
+    # Skills that only appear once are listed but never backed by experience
+    listed_once = sorted(skill for skill, count in hard.items() if count == 1)
+
+    findings.append(f"{len(hard)} technical skills and {len(counts) - len(hard)} soft skills recognized.")
+    issues = 0
+    if len(hard) < 8:
+        suggestions.append('List more of the tools and technologies you have used, matching job posting wording.')
+        issues += 1
+    if listed_once:
+        findings.append(f"Mentioned only once: {', '.join(listed_once[:8])}.")
+        suggestions.append('Show the skills you list in your experience and project bullets too.')
+        issues += 1
+    if not counts.keys() & soft:
+        findings.append('No soft skills were found.')
+        suggestions.append('Mention soft skills like communication or leadership with an example.')
+        issues += 1
+
+    coverage = min(len(hard), 12) / 12
+    backed = 1 - len(listed_once) / len(hard) if hard else 0
+    score = 20 + 55 * coverage + 15 * backed + (10 if counts.keys() & soft else 0)
+    return _clamp(score), findings, suggestions, issues
+
+
+def check_space(doc):
+    findings, suggestions, penalty = [], [], 0
+    pages = len(doc.page_words)
+    total = len(doc.words)
+    per_page = total / pages if pages else 0
+
+    findings.append(f"{total} words over {pages} page(s), about {int(per_page)} words per page.")
+    if total < 250:
+        findings.append('The resume is short on content.')
+        suggestions.append('Add detail to your experience and projects; aim for at least 300 words.')
+        penalty += 25
+    if pages > 2:
+        findings.append(f"{pages} pages is longer than most recruiters read.")
+        suggestions.append('Trim older or less relevant roles to fit on two pages.')
+        penalty += 15 * (pages - 2)
+    if per_page < WORDS_PER_PAGE[0] and total >= 250:
+        findings.append('Pages look sparse.')
+        suggestions.append('Reduce margins and spacing or fill the page with relevant content.')
+        penalty += 15
+    if per_page > WORDS_PER_PAGE[1]:
+        findings.append('Pages look crowded.')
+        suggestions.append('Cut filler words and keep bullets to one or two lines.')
+        penalty += 15
+    long_lines = int(np.sum(doc.line_words > 35))
+    if long_lines:
+        findings.append(f"{long_lines} paragraph(s) run longer than 35 words.")
+        suggestions.append('Break long paragraphs into short bullet points.')
+        penalty += min(20, 4 * long_lines)
+
+    issues = len(suggestions)
+    return _clamp(100 - penalty), findings, suggestions, issues
+
+
+def check_grammar(doc):
+    findings, suggestions = [], []
+    repeated = _REPEATED_WORD.findall(doc.text)
+    punctuation = _DOUBLE_PUNCTUATION.findall(doc.text)
+    first_person = sum(1 for bullet in doc.bullets if _FIRST_PERSON.search(bullet))
+    lowercase = sum(1 for bullet in doc.bullets if bullet[:1].islower())
+    misspelled = Counter(match.lower() for match in _MISSPELLED.findall(doc.text))
+
+    if misspelled:
+        findings.append('Misspelled: ' + ', '.join(f"{word} ({MISSPELLINGS[word]})" for word in sorted(misspelled)) + '.')
+        suggestions.append('Fix the misspelled words listed above.')
+    if repeated:
+        findings.append(f"{len(repeated)} repeated word(s), e.g. \"{repeated[0]} {repeated[0]}\".")
+        suggestions.append('Remove accidentally repeated words.')
+    if punctuation:
+        findings.append(f"{len(punctuation)} punctuation or spacing mistake(s).")
+        suggestions.append('Check for double punctuation and spaces before commas or periods.')
+    if first_person:
+        findings.append(f"{first_person} bullet(s) use first-person pronouns.")
+        suggestions.append('Drop "I" and "my" from bullets; start with the action instead.')
+    if lowercase:
+        findings.append(f"{lowercase} bullet(s) start with a lowercase letter.")
+        suggestions.append('Start every bullet with a capital letter.')
+    if not findings:
+        findings.append('No spelling, punctuation or pronoun issues were found.')
+
+    issues = sum(misspelled.values()) + len(repeated) + len(punctuation) + first_person + lowercase
+    return _clamp(100 - 4 * issues), findings, suggestions, issues
+
+
+def check_action_verbs(doc):
+    findings, suggestions = [], []
+    if not doc.bullets:
+        findings.append('No bullet points were found in experience or projects.')
+        suggestions.append('Describe each role with 3-5 bullets that start with a strong action verb.')
+        return 40, findings, suggestions, 1
+
+    first_words = [(_WORD.findall(bullet) or [''])[0] for bullet in doc.bullets]
+    strong = np.array([_is_action_verb(word) for word in first_words], dtype=bool)
+    weak = _WEAK.findall('\n'.join(doc.bullets))
+    verbs = Counter(word.lower() for word, is_strong in zip(first_words, strong) if is_strong)
+    overused = sorted(verb for verb, count in verbs.items() if count > 2)
+
+    findings.append(f"{int(strong.sum())} of {len(doc.bullets)} bullets start with an action verb.")
+    if (~strong).any():
+        suggestions.append('Start every bullet with a past-tense action verb such as "built", "led" or "reduced".')
+    if weak:
+        findings.append('Weak phrases: ' + ', '.join(sorted({phrase.lower() for phrase in weak})) + '.')
+        suggestions.append('Replace phrases like "responsible for" with what you actually did.')
+    if overused:
+        findings.append('Overused verbs: ' + ', '.join(overused) + '.')
+        suggestions.append('Vary your verbs so each bullet reads differently.')
+
+    issues = int((~strong).sum()) + len(weak) + len(overused)
+    score = 100 * strong.mean() - 5 * len(weak) - 3 * len(overused)
+    return _clamp(score), findings, suggestions, issues
+
+
+def _band(score):
+    if score >= 85:
+        return 'Excellent', 'success'
+    if score >= 70:
+        return 'Good, Minor Fixes Left', 'info'
+    if score >= 50:
+        return 'Room for Improvement', 'warning'
+    return 'Critical Issues Detected', 'error'
+
+
+def analyze(text, filename=''):
+    """Scores, issue counts and text for the locally computed categories.
+
+    Returns {category id: {'score', 'issues', 'findings', 'suggestions'}}.
+    """
+    doc = ResumeDocument(text, filename)
+    results = {}
+
+    score, findings, suggestions = check_ats(doc)
+    results['ats-parse'] = {'score': score, 'issues': len(suggestions), 'findings': findings, 'suggestions': suggestions}
+    for category, check in (
+        ('keywords', check_keywords),
+        ('space', check_space),
+        ('grammar', check_grammar),
+        ('action-verbs', check_action_verbs),
+    ):
+        score, findings, suggestions, issues = check(doc)
+        results[category] = {'score': score, 'issues': issues, 'findings': findings, 'suggestions': suggestions}
+    return results
+
+
+def build_analysis(local, model=None):
+    """Merge local results with the model's categories into the
+    {'scoreCategories', 'sectionContent'} structure the page expects.
+
+    model is the parsed model output for the MODEL_CATEGORIES, or None.
+    """
+    model = model or {}
+    model_categories = {
+        item.get('id'): item for item in model.get('scoreCategories') or []
+        if isinstance(item, dict) and item.get('id') in MODEL_CATEGORIES
+    }
+    model_sections = model.get('sectionContent') or {}
+
+    score_categories = []
+    section_content = {}
+    for category_id, meta in CATEGORY_META.items():
+        if category_id in local:
+            result = local[category_id]
+            score_title, design = _band(result['score'])
+            score_categories.append({
+                'id': category_id,
+                'title': meta['title'],
+                'icon': meta['icon'],
+                'iconColor': meta['iconColor'],
+                'score': f"{result['score']}%",
+                'scoreClass': meta['scoreClass'],
+                'category': meta['category'],
+                'issues': result['issues'],
+            })
+            section_content[category_id] = {
+                'title': meta['sectionTitle'],
+                'icon': meta['sectionIcon'],
+                'issues': f"{result['issues']} ISSUES FOUND",
+                'description': result['findings'],
+                'scorePercent': f"{result['score']}%",
+                'scoreColor': meta['scoreColor'],
+                'scoreTitle': score_title,
+                'scoreDescription': result['suggestions'] or ['Nothing to fix here, keep it up.'],
+                'actionText': meta['actionText'],
+                'design': design,
+                'layout': meta['layout'],
+            }
+        elif category_id in model_categories:
+            score_categories.append(dict(model_categories[category_id], **{
+                key: meta[key] for key in ('title', 'icon', 'iconColor', 'scoreClass', 'category')
+            }))
+            if isinstance(model_sections.get(category_id), dict):
+                section_content[category_id] = model_sections[category_id]
+
+    return {'scoreCategories': score_categories, 'sectionContent': section_content}
+
+
+NARRATIVE_PROMPT = """
+Analyze this resume for content quality, structure and visual appeal only; other checks are done separately.
+Return only a JSON object with this structure, no other text and no ```json markers:
+
+{
+  "scoreCategories": [
+    {"id": "impact", "score": "NN%", "issues": number},
+    {"id": "sections", "score": "NN%", "issues": number},
+    {"id": "style", "score": "NN%", "issues": number}
+  ],
+  "sectionContent": {
+    "impact": {
+      "title": "CONTENT QUALITY", "icon": "chart-line", "issues": "N ISSUES FOUND",
+      "description": [string, ...], "scorePercent": "NN%", "scoreColor": "from-orange-400 to-yellow-300",
+      "scoreTitle": string, "scoreDescription": [string, ...], "actionText": string,
+      "design": "success" | "info" | "warning" | "error", "layout": "split"
+    },
+    "sections": { same fields, "title": "STRUCTURE ANALYSIS", "icon": "layer-group", "scoreColor": "from-blue-400 to-blue-300", "layout": "card" },
+    "style": { same fields, "title": "VISUAL APPEAL", "icon": "paint-brush", "scoreColor": "from-green-400 to-green-500", "layout": "banner" }
+  }
+}
+
+"description" says what you found, "scoreDescription" gives concrete suggestions, comparing the resume's original text with better text where useful.
+If the provided file is not a resume, give very low scores.
+"""
+
+
+def parse_model_result(text, kind='analysis'):
+    """Parse the model's JSON for the MODEL_CATEGORIES, repairing it if
+    needed (see json_repair).
+
+    Raises ValueError if the text is not a JSON object.
+    """
+    return json_repair.parse(text, kind)
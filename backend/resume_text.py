@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cache_files
+import tracing
+
+# Optional parsers: without them only .txt resumes have extractable text
+# and callers fall back to sending the file to the model
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    import docx
+except ImportError:
+    docx = None
+
+# Extracted text is kept next to the uploads so it is only parsed once
+RESUME_TEXT_FOLDER = 'resume_text'
+os.makedirs(RESUME_TEXT_FOLDER, exist_ok=True)
+
+# Recently used texts kept in memory
+CACHE_SIZE = int(os.environ.get('RESUME_TEXT_CACHE_SIZE', 512))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def extract_text(file_path):
+    """Extract plain text from a resume file, or return '' if unsupported"""
+    extension = file_path.rsplit('.', 1)[-1].lower() if '.' in file_path else ''
+
+    if extension == 'txt':
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+
+    if extension == 'pdf' and PdfReader is not None:
+        reader = PdfReader(file_path)
+        # Pages are separated by form feeds, so page structure survives
+        return '\n\f'.join(page.extract_text() or '' for page in reader.pages)
+
+    if extension == 'docx' and docx is not None:
+        document = docx.Document(file_path)
+        lines = [paragraph.text for paragraph in document.paragraphs]
+        # Many resume templates lay content out in tables
+        for table in document.tables:
+            for row in table.rows:
+                lines.extend(cell.text for cell in row.cells)
+        return '\n'.join(lines)
+
+    return ''
+
+
+def get_resume_text(file_path):
+    """Return the text of an uploaded resume, extracting it at most once.
+
+    Returns '' when the text can't be extracted (unsupported format,
+    missing parser or a broken file).
+    """
+    with _cache_lock:
+        if file_path in _cache:
+            _cache.move_to_end(file_path)
+            return _cache[file_path]
+
+    text_path = os.path.join(RESUME_TEXT_FOLDER, os.path.basename(file_path) + '.txt')
+
+    if os.path.exists(text_path):
+        with open(text_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        try:
+            with tracing.span('resume_text'):
+                text = extract_text(file_path)
+        except Exception as e:
+            print(f"Error extracting resume text from {file_path}: {str(e)}")
+            return ''
+
+        # Readers never see half a file
+        cache_files.write_atomic(text_path, text)
+
+    with _cache_lock:
+        _cache[file_path] = text
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return text
@@ -0,0 +1,152 @@
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Scores pulled out of analysis results for the resume_score table, and the
+# NumPy aggregates behind /analytics/scores. Every score is on a 0-100 scale.
+
+SOURCES = ('analysis', 'dashboard', 'interview')
+
+PERCENTILES = (10, 25, 50, 75, 90)
+# Ten-point histogram bins, 0-10 ... 90-100
+HISTOGRAM_EDGES = np.linspace(0, 100, 11)
+TREND_BUCKETS = {'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400}
+
+# Dashboard and interview fields -> score category
+DASHBOARD_FIELDS = {
+    'job-match': ('skillsAnalysis', 'jobMatchPercentage'),
+    'demand': ('marketAnalysis', 'demandScore'),
+    'education-relevance': ('experienceInsights', 'educationRelevance'),
+}
+INTERVIEW_FIELDS = {
+    'interview-overall': 'overallScore',
+    'interview-confidence': 'confidence',
+    'interview-technical': 'technicalScore',
+    'interview-communication': 'communicationScore',
+}
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def parse_score(value):
+    """A 0-100 score from a number or a string like "85%", else None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        match = _NUMBER.search(value)
+        if not match:
+            return None
+        number = float(match.group())
+    else:
+        return None
+    if not np.isfinite(number):
+        return None
+    return min(100.0, max(0.0, number))
+
+
+def _issues(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def analysis_scores(analysis):
+    """(category, score, issues) from an /analyze/resume result"""
+    scores = []
+    for category in (analysis or {}).get('scoreCategories') or []:
+        if not isinstance(category, dict) or not category.get('id'):
+            continue
+        score = parse_score(category.get('score'))
+        if score is not None:
+            scores.append((str(category['id'])[:40], score, _issues(category.get('issues'))))
+    return scores
+
+
+def dashboard_scores(resume_data):
+    """(category, score, issues) from a dashboard resumeData"""
+    if not isinstance(resume_data, dict):
+        return []
+    scores = []
+    for category, (group, field) in DASHBOARD_FIELDS.items():
+        score = parse_score((resume_data.get(group) or {}).get(field))
+        if score is not None:
+            scores.append((category, score, None))
+    # Average level of the listed technical and soft skills
+    skills = resume_data.get('skillsAnalysis') or {}
+    for kind in ('technical', 'soft'):
+        levels = [parse_score(skill.get('level')) for skill in skills.get(kind) or [] if isinstance(skill, dict)]
+        levels = [level for level in levels if level is not None]
+        if levels:
+            scores.append((f"{kind}-skills", float(np.mean(levels)), None))
+    return scores
+
+
+def interview_scores(analysis):
+    """(category, score, issues) from an interview analysis"""
+    metrics = (analysis or {}).get('metrics') if isinstance(analysis, dict) else None
+    if not isinstance(metrics, dict):
+        return []
+    scores = []
+    for category, field in INTERVIEW_FIELDS.items():
+        score = parse_score(metrics.get(field))
+        if score is not None:
+            scores.append((category, score, None))
+    return scores
+
+
+def summarize(scores):
+    """Count, mean, spread, percentiles and histogram of a score array"""
+    histogram, _ = np.histogram(scores, bins=HISTOGRAM_EDGES)
+    return {
+        'count': int(len(scores)),
+        'mean': round(float(scores.mean()), 2),
+        'std': round(float(scores.std()), 2),
+        'min': round(float(scores.min()), 2),
+        'max': round(float(scores.max()), 2),
+        'percentiles': {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(scores, PERCENTILES))},
+        'histogram': [
+            {'from': int(low), 'to': int(high), 'count': int(count)}
+            for low, high, count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], histogram)
+        ],
+    }
+
+
+def trend(scores, times, bucket_seconds):
+    """Count, mean and median per time bucket; times are POSIX seconds"""
+    buckets = np.floor(times / bucket_seconds).astype(np.int64)
+    keys, inverse, counts = np.unique(buckets, return_inverse=True, return_counts=True)
+    means = np.bincount(inverse, weights=scores) / counts
+
+    # Medians: sort by (bucket, score), then take the middle of each run
+    order = np.lexsort((scores, inverse))
+    sorted_scores = scores[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    medians = (sorted_scores[starts + (counts - 1) // 2] + sorted_scores[starts + counts // 2]) / 2
+
+    return [
+        {
+            'start': datetime.fromtimestamp(int(key) * bucket_seconds, tz=timezone.utc).strftime('%Y-%m-%d'),
+            'count': int(count),
+            'mean': round(float(mean), 2),
+            'median': round(float(median), 2),
+        }
+        for key, count, mean, median in zip(keys, counts, means, medians)
+    ]
+
+
+def aggregate(categories, scores, times, bucket='week'):
+    """Per-category summary and trend of parallel column arrays"""
+    scores = np.asarray(scores, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    names, codes = np.unique(np.asarray(categories, dtype=str), return_inverse=True)
+    result = {}
+    for code, name in enumerate(names):
+        mask = codes == code
+        summary = summarize(scores[mask])
+        summary['trend'] = trend(scores[mask], times[mask], TREND_BUCKETS[bucket])
+        result[str(name)] = summary
+    return result
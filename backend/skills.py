@@ -0,0 +1,173 @@
+import re
+from collections import Counter
+
+# Skill and role lexicons used to fingerprint resumes locally.
+# Canonical name -> aliases as they appear in resumes (matched case-insensitively).
+SKILLS = {
+    # Languages
+    'python': ['python'],
+    'java': ['java'],
+    'javascript': ['javascript', 'js', 'es6'],
+    'typescript': ['typescript'],
+    'c': ['c programming', 'c language'],
+    'c++': ['c++', 'cpp'],
+    'c#': ['c#', 'csharp'],
+    'go': ['golang', 'go lang'],
+    'rust': ['rust'],
+    'kotlin': ['kotlin'],
+    'swift': ['swift'],
+    'php': ['php'],
+    'ruby': ['ruby'],
+    'r': ['r programming', 'r language', 'rstudio'],
+    'scala': ['scala'],
+    'dart': ['dart'],
+    'sql': ['sql'],
+    'bash': ['bash', 'shell scripting'],
+    # Frontend
+    'html': ['html', 'html5'],
+    'css': ['css', 'css3', 'scss', 'sass'],
+    'react': ['react', 'react.js', 'reactjs'],
+    'react native': ['react native'],
+    'angular': ['angular', 'angularjs'],
+    'vue': ['vue', 'vue.js', 'vuejs'],
+    'next.js': ['next.js', 'nextjs'],
+    'redux': ['redux'],
+    'tailwind': ['tailwind', 'tailwindcss', 'tailwind css'],
+    'bootstrap': ['bootstrap'],
+    'material ui': ['material ui', 'materialui', 'mui'],
+    'jquery': ['jquery'],
+    'flutter': ['flutter'],
+    # Backend
+    'node.js': ['node.js', 'nodejs', 'node'],
+    'express': ['express', 'express.js', 'expressjs'],
+    'django': ['django'],
+    'flask': ['flask'],
+    'fastapi': ['fastapi'],
+    'spring': ['spring', 'spring boot', 'springboot'],
+    '.net': ['.net', 'asp.net', 'dotnet'],
+    'laravel': ['laravel'],
+    'rest api': ['rest api', 'rest apis', 'restful', 'restful api'],
+    'graphql': ['graphql'],
+    'microservices': ['microservices', 'microservice'],
+    # Data stores
+    'mysql': ['mysql'],
+    'postgresql': ['postgresql', 'postgres'],
+    'mongodb': ['mongodb', 'mongo'],
+    'sqlite': ['sqlite'],
+    'redis': ['redis'],
+    'firebase': ['firebase'],
+    'oracle': ['oracle'],
+    'elasticsearch': ['elasticsearch'],
+    # Cloud and DevOps
+    'aws': ['aws', 'amazon web services'],
+    'azure': ['azure'],
+    'gcp': ['gcp', 'google cloud'],
+    'docker': ['docker'],
+    'kubernetes': ['kubernetes', 'k8s'],
+    'ci/cd': ['ci/cd', 'continuous integration', 'jenkins', 'github actions'],
+    'terraform': ['terraform'],
+    'linux': ['linux', 'unix'],
+    'git': ['git', 'github', 'gitlab'],
+    # Data and ML
+    'machine learning': ['machine learning', 'ml'],
+    'deep learning': ['deep learning'],
+    'data analysis': ['data analysis', 'data analytics'],
+    'pandas': ['pandas'],
+    'numpy': ['numpy'],
+    'scikit-learn': ['scikit-learn', 'sklearn'],
+    'tensorflow': ['tensorflow'],
+    'pytorch': ['pytorch'],
+    'nlp': ['nlp', 'natural language processing'],
+    'computer vision': ['computer vision', 'opencv'],
+    'power bi': ['power bi', 'powerbi'],
+    'tableau': ['tableau'],
+    'excel': ['excel', 'ms excel'],
+    'spark': ['spark', 'pyspark'],
+    # Practices
+    'testing': ['unit testing', 'jest', 'pytest', 'selenium', 'testing'],
+    'agile': ['agile', 'scrum', 'kanban'],
+    'ui/ux': ['ui/ux', 'ux', 'figma', 'user experience'],
+    'data structures': ['data structures', 'algorithms', 'dsa'],
+    'cybersecurity': ['cybersecurity', 'cyber security', 'penetration testing'],
+    # Soft skills
+    'communication': ['communication'],
+    'leadership': ['leadership', 'team lead', 'leader'],
+    'teamwork': ['teamwork', 'team player', 'collaborator', 'collaboration'],
+    'problem solving': ['problem solving', 'problem-solving'],
+    'project management': ['project management', 'team management'],
+}
+
+# Role buckets, checked in order, first match wins
+ROLES = [
+    ('data scientist', ['data scientist', 'machine learning engineer', 'ml engineer', 'ai engineer']),
+    ('data analyst', ['data analyst', 'business analyst', 'business intelligence']),
+    ('devops engineer', ['devops', 'site reliability', 'cloud engineer']),
+    ('mobile developer', ['android developer', 'ios developer', 'mobile developer', 'react native developer', 'flutter developer']),
+    ('full stack developer', ['full stack', 'full-stack', 'mern']),
+    ('frontend developer', ['frontend', 'front-end', 'front end', 'web developer', 'ui developer']),
+    ('backend developer', ['backend', 'back-end', 'back end', 'api developer']),
+    ('security engineer', ['security engineer', 'security analyst', 'penetration tester']),
+    ('designer', ['ui/ux designer', 'product designer', 'graphic designer']),
+    ('project manager', ['project manager', 'product manager', 'scrum master']),
+    ('software engineer', ['software engineer', 'software developer', 'developer', 'programmer']),
+]
+
+GENERAL_ROLE = 'general'
+
+
+def _alternation(aliases):
+    # Longest first so "react native" wins over "react"
+    escaped = sorted({re.escape(alias) for alias in aliases}, key=len, reverse=True)
+    # Skill names contain + # . / so use explicit boundaries instead of \b
+    return re.compile(r'(?<![\w+#])(' + '|'.join(escaped) + r')(?![\w+#])', re.IGNORECASE)
+
+
+_SKILL_ALIASES = {alias.lower(): skill for skill, aliases in SKILLS.items() for alias in aliases}
+_SKILL_PATTERN = _alternation(_SKILL_ALIASES)
+_ROLE_PATTERNS = [(role, _alternation(aliases)) for role, aliases in ROLES]
+
+
+def extract_skills(text):
+    """Count canonical skill mentions in text"""
+    counts = Counter()
+    for match in _SKILL_PATTERN.finditer(text):
+        counts[_SKILL_ALIASES[match.group(1).lower()]] += 1
+    return counts
+
+
+def canonical_skill(name):
+    """Canonical name of a skill as a user typed it ("ReactJS" -> "react"),
+    or the name lowercased if it isn't in the lexicon"""
+    name = ' '.join(str(name).split()).lower()
+    if name in SKILLS:
+        return name
+    if name in _SKILL_ALIASES:
+        return _SKILL_ALIASES[name]
+    match = _SKILL_PATTERN.fullmatch(name)
+    return _SKILL_ALIASES[match.group(1).lower()] if match else name
+
+
+def detect_role(text):
+    """Return the role bucket for a resume, or 'general'"""
+    for role, pattern in _ROLE_PATTERNS:
+        if pattern.search(text):
+            return role
+    return GENERAL_ROLE
+
+
+def skill_fingerprint(text, max_skills=8):
+    """Normalized role and top skills for a resume.
+
+    The skills are the most mentioned ones (ties broken by name) and the
+    key is stable for resumes with the same profile, whatever the order
+    they list things in.
+    """
+    counts = extract_skills(text)
+    top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:max_skills]
+    skills = sorted(skill for skill, _ in top)
+    role = detect_role(text)
+    return {
+        'role': role,
+        'skills': skills,
+        'key': f"{role}|{','.join(skills)}",
+    }
@@ -51,6 +51,26 @@ def test_me():
     
     return response.status_code == 200
 
+def test_token_auth():
+    """Test bearer token issued by login"""
+    response = requests.post(f"{BASE_URL}/login", json={
+        "email": TEST_EMAIL,
+        "password": TEST_PASSWORD
+    })
+    token = response.json().get("token")
+    
+    # No email in the body, the token identifies the user
+    response = requests.post(f"{BASE_URL}/me", json={}, headers={"Authorization": f"Bearer {token}"})
+    print("\n=== TOKEN AUTH TEST ===")
+    print(f"Status code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    
+    # A tampered token is rejected
+    bad_response = requests.post(f"{BASE_URL}/me", json={}, headers={"Authorization": f"Bearer {token}x"})
+    print(f"Tampered token status code: {bad_response.status_code}")
+    
+    return response.status_code == 200 and bad_response.status_code == 401
+
 def test_logout():
     """Test user logout endpoint"""
     url = f"{BASE_URL}/logout"
@@ -132,6 +152,9 @@ if __name__ == "__main__":
     # Test get user info
     test_me()
     
+    # Test bearer token authentication
+    test_token_auth()
+    
     # Test file upload
     test_upload_resume()
     
@@ -0,0 +1,27 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import auth_tokens
+
+
+def test_secret_key_is_shared_by_concurrent_workers(tmp_path, monkeypatch):
+    monkeypatch.delenv('SECRET_KEY', raising=False)
+    with ProcessPoolExecutor(max_workers=8) as executor:
+        keys = set(executor.map(auth_tokens.load_secret_key, [str(tmp_path)] * 64))
+    assert len(keys) == 1
+    assert '' not in keys
+    # No temporary files are left behind
+    assert os.listdir(tmp_path) == [auth_tokens.SECRET_KEY_FILE]
+
+
+def test_secret_key_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('SECRET_KEY', 'from-env')
+    assert auth_tokens.load_secret_key(str(tmp_path)) == 'from-env'
+    assert not os.listdir(tmp_path)
+
+
+def test_token_round_trip():
+    token = auth_tokens.issue_token('key', 42)
+    assert auth_tokens.verify_token('key', token) == 42
+    assert auth_tokens.verify_token('other key', token) is None
+    assert auth_tokens.verify_token('key', token + 'x') is None
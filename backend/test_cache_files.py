@@ -0,0 +1,52 @@
+import os
+import threading
+
+import pytest
+
+import cache_files
+
+
+def test_write_names_files_by_content(tmp_path):
+    first = cache_files.write(str(tmp_path), 'analysis_', '{"a": 1}')
+    assert first == cache_files.write(str(tmp_path), 'analysis_', '{"a": 1}')
+    second = cache_files.write(str(tmp_path), 'analysis_', '{"a": 2}')
+    assert first != second and first.startswith('analysis_') and first.endswith('.json')
+    assert (tmp_path / first).read_text(encoding='utf-8') == '{"a": 1}'
+
+    cache_files.remove(str(tmp_path), first)
+    cache_files.remove(str(tmp_path), first)
+    assert sorted(os.listdir(tmp_path)) == [second]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'entry.json')
+    cache_files.write_atomic(path, 'old')
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        cache_files.write_atomic(path, 'new')
+    assert os.listdir(tmp_path) == ['entry.json']
+    assert (tmp_path / 'entry.json').read_text(encoding='utf-8') == 'old'
+
+
+def test_lock_serializes_an_entry(tmp_path):
+    inside = []
+    overlaps = []
+
+    def update():
+        for _ in range(20):
+            with cache_files.lock(str(tmp_path), 'key'):
+                inside.append(1)
+                if len(inside) > 1:
+                    overlaps.append(1)
+                inside.pop()
+
+    threads = [threading.Thread(target=update) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not overlaps
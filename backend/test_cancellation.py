@@ -0,0 +1,51 @@
+import socket
+
+import cancellation
+
+
+def test_closed_client_is_detected(monkeypatch):
+    monkeypatch.setattr(cancellation, 'CANCEL_ON_DISCONNECT', True)
+    server, client = socket.socketpair()
+    try:
+        cancellation.watch({'werkzeug.socket': server})
+        client_gone = cancellation.check()
+        assert client_gone() is False
+
+        # Pipelined data means the client is still there
+        client.sendall(b'GET / HTTP/1.1\r\n')
+        assert client_gone() is False
+        server.recv(1024)
+
+        client.close()
+        assert client_gone() is True
+    finally:
+        server.close()
+        client.close()
+
+
+def test_cached_work_is_not_cancelled(monkeypatch):
+    monkeypatch.setattr(cancellation, 'CANCEL_ON_DISCONNECT', True)
+    monkeypatch.setattr(cancellation, 'CANCEL_FINISH_CACHED', True)
+    server, client = socket.socketpair()
+    try:
+        cancellation.watch({'gunicorn.socket': server})
+        with cancellation.cached_work():
+            assert cancellation.check() is None
+        assert cancellation.check() is not None
+    finally:
+        server.close()
+        client.close()
+
+
+def test_unwatched_requests_cannot_be_cancelled(monkeypatch):
+    cancellation.watch({})
+    assert cancellation.check() is None
+
+    monkeypatch.setattr(cancellation, 'CANCEL_ON_DISCONNECT', False)
+    server, client = socket.socketpair()
+    try:
+        cancellation.watch({'werkzeug.socket': server})
+        assert cancellation.check() is None
+    finally:
+        server.close()
+        client.close()
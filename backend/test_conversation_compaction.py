@@ -0,0 +1,53 @@
+from conversation_compaction import compact_conversation, compact_conversation_cached, count_tokens
+
+
+def make_log(turns, words=50):
+    log = []
+    for i in range(turns):
+        log.append({'speaker': 'ai', 'type': 'question', 'text': f"Question {i}? Tell me more about it."})
+        log.append({'speaker': 'user', 'type': 'answer', 'text': f"Answer {i}. " + ' '.join(['detail'] * words)})
+    return log
+
+
+def test_log_within_budget_is_unchanged():
+    log = make_log(2)
+    result = compact_conversation(log, budget=10000, policy='truncate')
+    assert result['tokens'] == result['original_tokens']
+    assert result['dropped'] == 0 and result['summarized'] == 0
+    assert 'Answer 1.' in result['text']
+
+
+def test_truncate_drops_oldest_turns():
+    log = make_log(40)
+    result = compact_conversation(log, budget=1000, policy='truncate')
+    assert result['tokens'] <= 1000
+    assert result['dropped'] > 0 and result['summarized'] == 0
+    assert f"[{result['dropped']} earlier entries omitted]" in result['text']
+    # The newest turns are kept verbatim
+    assert result['text'].endswith(f"USER: [answer] {log[-1]['text']}\n\n")
+    assert 'Question 0?' not in result['text']
+
+
+def test_summarize_keeps_first_sentence_of_older_turns():
+    log = make_log(40)
+    result = compact_conversation(log, budget=2000, policy='summarize')
+    assert result['tokens'] <= 2000
+    assert result['summarized'] > 0
+    assert '[Earlier entries, summarized]' in result['text']
+    assert result['text'].endswith(f"USER: [answer] {log[-1]['text']}\n\n")
+
+
+def test_newest_turn_over_budget_is_shortened_not_lost():
+    log = make_log(1) + [{'speaker': 'user', 'type': 'answer', 'text': ' '.join(['word'] * 5000)}]
+    for policy in ('truncate', 'summarize'):
+        result = compact_conversation(log, budget=1000, policy=policy)
+        assert result['tokens'] <= 1000
+        assert 'USER: [answer] word word' in result['text']
+        assert result['text'].endswith(' [...]\n\n')
+        assert count_tokens(result['text']) > 500
+
+
+def test_cached_result_is_reused():
+    log = make_log(40)
+    first = compact_conversation_cached('test-hash', log, budget=1000, policy='truncate')
+    assert compact_conversation_cached('test-hash', [], budget=1000, policy='truncate') is first
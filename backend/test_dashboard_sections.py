@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+import dashboard_sections
+from dashboard_sections import DASHBOARD_PARTS, HEADER, RESUME_DATA_KEYS, merge_parts, parse_parts, part_hash, split_sections
+
+RESUME = """Jane Doe
+jane.doe@example.com
+
+Summary
+Backend engineer focused on APIs.
+
+Experience
+Software Engineer, Acme Corp, 2020-Present
+Built a billing API in Python and Flask.
+
+Education
+B.Sc. Computer Science, State University
+
+Skills
+Python, SQL, Docker
+
+Soft Skills
+Communication, mentoring
+"""
+
+
+def hashes(text):
+    sections = split_sections(text)
+    return {part: part_hash(part, sections) for part in DASHBOARD_PARTS}
+
+
+def test_split_sections():
+    sections = split_sections(RESUME)
+    assert sections[HEADER] == 'Jane Doe\njane.doe@example.com'
+    assert sections['experience'] == 'Software Engineer, Acme Corp, 2020-Present\nBuilt a billing API in Python and Flask.'
+    # Both skills headings end up in one section
+    assert sections['skills'] == 'Python, SQL, Docker\nCommunication, mentoring'
+    assert split_sections('Just a paragraph of text\nwith no headings') is None
+
+
+def test_editing_a_section_changes_only_its_parts():
+    before = hashes(RESUME)
+    after = hashes(RESUME.replace('Python, SQL, Docker', 'Python, SQL, Docker, Kubernetes'))
+    changed = {part for part in DASHBOARD_PARTS if before[part] != after[part]}
+    assert changed == {
+        part for part, (inputs, _) in DASHBOARD_PARTS.items()
+        if 'skills' in inputs or dashboard_sections.ALL_SECTIONS in inputs
+    }
+    assert 'contact' not in changed and 'career' not in changed
+
+
+def test_whitespace_changes_keep_every_hash():
+    reflowed = RESUME.replace('Built a billing API', 'Built a   billing\nAPI').replace('\n\n', '\n\n\n')
+    reflowed = '\n'.join(f"  {line}\t" for line in reflowed.splitlines())
+    assert hashes(reflowed) == hashes(RESUME)
+
+
+def test_parse_parts_keeps_example_keys():
+    text = json.dumps({
+        'skills': {'skillsAnalysis': {'technical': [], 'soft': [], 'jobMatchPercentage': 80}, 'extra': 1},
+        'education': {'experienceInsights': {'educationRelevance': 70}},
+    })
+    results = parse_parts(text, ['skills', 'education'])
+    assert results['skills'] == {'skillsAnalysis': {'technical': [], 'soft': [], 'jobMatchPercentage': 80}}
+    with pytest.raises(ValueError):
+        parse_parts(text, ['market'])
+
+
+def test_merge_parts_follows_resume_data_order():
+    results = {
+        'improvements': {'improvements': []},
+        'market': {'marketAnalysis': {'demandScore': 85}},
+        'education': {'experienceInsights': {'educationRelevance': 90}},
+        'career': {'candidate': {'currentRole': 'Engineer'}, 'experienceInsights': {'roles': []}},
+        'skills': {'skillsAnalysis': {'jobMatchPercentage': 87}},
+        'contact': {'candidate': {'name': 'Jane Doe'}},
+    }
+    merged = merge_parts(results)
+    assert tuple(merged) == RESUME_DATA_KEYS
+    # Parts sharing a key are merged, not overwritten
+    assert merged['candidate'] == {'name': 'Jane Doe', 'currentRole': 'Engineer'}
+    assert merged['experienceInsights'] == {'roles': [], 'educationRelevance': 90}
+    assert tuple(merge_parts({'market': results['market'], 'contact': results['contact']})) == (
+        'candidate', 'marketAnalysis',
+    )
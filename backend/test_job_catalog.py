@@ -0,0 +1,66 @@
+import numpy as np
+
+import job_catalog
+from text_features import term_counts, top_k
+
+JOBS = [
+    {'id': 1, 'title': 'Backend Engineer', 'company': 'Acme', 'skills': ['Python', 'Django', 'PostgreSQL'],
+     'description': 'Build APIs and data pipelines'},
+    {'id': 2, 'title': 'Frontend Developer', 'company': 'Web Co', 'skills': ['React.js', 'TypeScript', 'CSS'],
+     'description': 'Build user interfaces for our web apps'},
+    {'id': 3, 'title': 'Registered Nurse', 'company': 'Clinic', 'skills': ['Patient care', 'Triage'],
+     'description': 'Care for patients on the ward'},
+    {'id': 4, 'title': 'DevOps Engineer', 'company': 'Cloudy', 'skills': ['Docker', 'Kubernetes', 'AWS'],
+     'description': 'Run Python services in containers'},
+]
+
+
+def job_ids(matches):
+    return [job['id'] for job, _ in matches]
+
+
+def test_search_orders_jobs_by_relevance():
+    index = job_catalog.build_index(JOBS)
+    matches = index.search("Python developer with Django and PostgreSQL, some Docker", k=10)
+    assert job_ids(matches)[0] == 1
+    assert job_ids(matches).index(4) == 1
+    # Jobs sharing no terms with the resume are left out
+    assert 3 not in job_ids(matches)
+    scores = [score for _, score in matches]
+    assert scores == sorted(scores, reverse=True) and 0 < scores[-1] <= scores[0] <= 1.0
+
+
+def test_skills_match_by_canonical_name():
+    index = job_catalog.build_index(JOBS)
+    counts = term_counts("ReactJS")
+    assert 'skill:react' in counts
+    assert job_ids(index.search("ReactJS")) == [2]
+
+
+def test_search_limits_results():
+    index = job_catalog.build_index(JOBS)
+    assert len(index.search("Python Docker React engineer", k=2)) == 2
+    assert index.search("") == []
+
+
+def test_top_k_skips_zero_scores():
+    scores = np.array([0.0, 0.5, 0.9, 0.0, 0.1])
+    assert top_k(scores, 10).tolist() == [2, 1, 4]
+    assert top_k(scores, 1).tolist() == [2]
+    assert top_k(np.zeros(3), 2).tolist() == []
+
+
+def test_csv_skill_details_are_parsed(tmp_path):
+    path = tmp_path / 'jobs.csv'
+    path.write_text(
+        'title,company,skills,requiredSkillDetails,description\n'
+        'Backend Dev,Acme,Python;Flask,"{""Python"": ""3 years""}",APIs\n'
+        'Nurse,Clinic,Care,not json,Wards\n',
+        encoding='utf-8',
+    )
+    jobs = job_catalog.read_catalog(str(path))
+    assert jobs[0]['skills'] == ['Python', 'Flask']
+    assert jobs[0]['requiredSkillDetails'] == {'Python': '3 years'}
+    assert jobs[1]['requiredSkillDetails'] == {}
+    assert [job['id'] for job in jobs] == [1, 2]
+    assert job_ids(job_catalog.build_index(jobs).search('Flask developer')) == [1]
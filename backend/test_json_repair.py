@@ -0,0 +1,81 @@
+import pytest
+
+import json_repair
+
+DASHBOARD_SHAPE = {'candidate': dict, 'skillsAnalysis': dict}
+
+
+def test_repair_fences_and_trailing_commas():
+    """Code fences, text around the JSON and trailing commas"""
+    text = 'Here you go:\n```json\n{"a": [1, 2,], "b": {"c": 3,},}\n```\nThanks'
+    assert json_repair.repair(text) == {'a': [1, 2], 'b': {'c': 3}}
+
+
+def test_repair_raw_newlines_and_stray_quotes():
+    """Unescaped newlines and quotes inside strings"""
+    text = '{"a": "line\nbreak", "b": "he said "hi" to me"}'
+    assert json_repair.repair(text) == {'a': 'line\nbreak', 'b': 'he said "hi" to me'}
+
+
+def test_repair_stray_quote_before_comma_keeps_text():
+    """A stray quote followed by a comma doesn't end the string unless a
+    key or value follows"""
+    text = '{"a": "she said "yes, ok", then left", "b": 1}'
+    assert json_repair.repair(text) == {'a': 'she said "yes, ok", then left', 'b': 1}
+    text = '["she said "yes, ok", then left", 2]'
+    assert json_repair.repair(text) == ['she said "yes, ok", then left', 2]
+
+
+def test_repair_cut_off_drops_unfinished_element():
+    """Only the complete top-level elements of a cut-off answer are kept"""
+    assert json_repair.repair('[{"title":"Dev","match":80},{"title":"Sen') == [{'title': 'Dev', 'match': 80}]
+    assert json_repair.repair('{"a": 1, "b": "hel') == {'a': 1}
+    assert json_repair.repair('{"a": 1, "b": {"c": [1, 2') == {'a': 1}
+    assert json_repair.repair('["a", "b", "c') == ['a', 'b']
+
+
+def test_repair_not_json():
+    with pytest.raises(ValueError):
+        json_repair.repair('no JSON here')
+
+
+def test_parse_unwraps_single_key_wrapper():
+    value = json_repair.parse('{"resumeData": {"candidate": {}, "skillsAnalysis": {}}}', 'test', DASHBOARD_SHAPE)
+    assert value == {'candidate': {}, 'skillsAnalysis': {}}
+
+
+def test_parse_cut_off_fails_when_complete():
+    """A cut-off answer that still has the right shape is not accepted
+    for cached results"""
+    text = '{"candidate": {"name": "A"}, "skillsAnalysis": {"a": 1}, "summary": "cut'
+    with pytest.raises(ValueError):
+        json_repair.parse(text, 'test', DASHBOARD_SHAPE)
+    assert json_repair.parse(text, 'test', DASHBOARD_SHAPE, complete=False) == {
+        'candidate': {'name': 'A'}, 'skillsAnalysis': {'a': 1},
+    }
+
+
+def test_parse_asks_fix_for_cut_off_answer():
+    prompts = []
+
+    def fix(prompt):
+        prompts.append(prompt)
+        return '{"candidate": {"name": "A"}, "skillsAnalysis": {"a": 1}}'
+
+    value = json_repair.parse('{"candidate": {"name": "A"}, "skillsAnalysis": {"a"', 'test', DASHBOARD_SHAPE, fix=fix)
+    assert value == {'candidate': {'name': 'A'}, 'skillsAnalysis': {'a': 1}}
+    assert len(prompts) == 1 and 'cut off' in prompts[0]
+
+
+def test_parse_fix_not_called_for_repairable_answer():
+    def fix(prompt):
+        raise AssertionError('fix should not be called')
+
+    assert json_repair.parse('{"metrics": {"a": 1},}', 'test', {'metrics': dict}, fix=fix) == {'metrics': {'a': 1}}
+
+
+def test_parse_fails_on_wrong_shape():
+    with pytest.raises(ValueError):
+        json_repair.parse('[1, 2]', 'test', dict)
+    with pytest.raises(ValueError):
+        json_repair.parse('{"candidate": {}}', 'test', DASHBOARD_SHAPE, fix=lambda prompt: '{"candidate": {}}')
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import Scheduler
+
+
+def queued(scheduler):
+    return sum(len(waiting) for waiting in scheduler._waiting.values())
+
+
+def grant_order(scheduler, calls):
+    """Queue calls of (name, user, lane, cost) behind a held slot, one at a
+    time, then free the slot and return the order they ran in"""
+    held = scheduler.acquire(None, 'interactive', 1)
+    order = []
+
+    def run(name, user, lane, cost):
+        waiter = scheduler.acquire(user, lane, cost, timeout=10)
+        order.append(name)
+        scheduler.release(waiter)
+
+    threads = []
+    for call in calls:
+        thread = threading.Thread(target=run, args=call)
+        thread.start()
+        threads.append(thread)
+        deadline = time.time() + 5
+        while queued(scheduler) < len(threads) and time.time() < deadline:
+            time.sleep(0.01)
+
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(10)
+    return order
+
+
+def test_lanes_are_served_by_priority():
+    order = grant_order(Scheduler(slots=1), [
+        ('background', None, 'background', 100),
+        ('standard', None, 'standard', 100),
+        ('interactive', None, 'interactive', 100),
+    ])
+    assert order == ['interactive', 'standard', 'background']
+
+
+def test_users_share_a_lane_fairly():
+    """A user who queued many calls doesn't make a later user wait for all of them"""
+    order = grant_order(Scheduler(slots=1), [
+        ('a1', 'a', 'standard', 100),
+        ('a2', 'a', 'standard', 100),
+        ('a3', 'a', 'standard', 100),
+        ('b1', 'b', 'standard', 100),
+    ])
+    assert order[:2] == ['a1', 'b1']
+
+
+def test_large_calls_count_for_more():
+    order = grant_order(Scheduler(slots=1), [
+        ('a1', 'a', 'standard', 5000),
+        ('a2', 'a', 'standard', 5000),
+        ('b1', 'b', 'standard', 100),
+        ('b2', 'b', 'standard', 100),
+        ('b3', 'b', 'standard', 100),
+    ])
+    assert order.index('b3') < order.index('a2')
+
+
+def test_user_and_background_caps():
+    scheduler = Scheduler(slots=4, user_slots=2, background_slots=1)
+    first = scheduler.acquire('a', 'standard', 1)
+    second = scheduler.acquire('a', 'standard', 1)
+    with pytest.raises(llm_scheduler.QueueTimeout):
+        scheduler.acquire('a', 'standard', 1, timeout=0.1)
+    # Other users still get the free slots
+    other = scheduler.acquire('b', 'standard', 1, timeout=0.1)
+
+    background = scheduler.acquire(None, 'background', 1)
+    with pytest.raises(llm_scheduler.QueueTimeout):
+        scheduler.acquire(None, 'background', 1, timeout=0.1)
+    for waiter in (first, second, other, background):
+        scheduler.release(waiter)
+    assert scheduler._running == 0 and queued(scheduler) == 0
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    scheduler = Scheduler(slots=1)
+    held = scheduler.acquire(None, 'standard', 1)
+    with pytest.raises(llm_scheduler.QueueTimeout):
+        scheduler.acquire('a', 'standard', 1, timeout=0.05)
+    assert queued(scheduler) == 0
+    scheduler.release(held)
+    with scheduler.slot('a', 'standard', 1, timeout=0.1):
+        assert scheduler._running == 1
+    assert scheduler._running == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = Scheduler(slots=1)
+    held = scheduler.acquire(None, 'standard', 1)
+    with pytest.raises(llm_scheduler.Cancelled):
+        scheduler.acquire('a', 'standard', 1, timeout=10, cancelled=lambda: True, poll_interval=0.01)
+    assert queued(scheduler) == 0
+    scheduler.release(held)
+    with scheduler.slot('a', 'standard', 1, timeout=0.1):
+        assert scheduler._running == 1
+    assert scheduler._running == 0
+
+
+def test_daily_quota(monkeypatch):
+    used = {}
+    monkeypatch.setattr(llm_scheduler, 'LLM_USER_DAILY_TOKENS', 1000)
+    monkeypatch.setattr(llm_scheduler, '_usage_store', None)
+    llm_scheduler.set_usage_store(lambda user: used.get(user, 0),
+                                  lambda user, tokens: used.__setitem__(user, used.get(user, 0) + tokens))
+
+    llm_scheduler.check_quota('a', 900)
+    llm_scheduler.charge('a', 900)
+    assert llm_scheduler.tokens_left('a') == 100
+    with pytest.raises(llm_scheduler.QuotaExceeded):
+        llm_scheduler.check_quota('a', 200)
+    llm_scheduler.check_quota('b', 200)
+    # Work not attributed to a user is never limited or charged
+    llm_scheduler.charge(None, 5000)
+    assert llm_scheduler.tokens_left(None) is None
+    assert None not in used
@@ -0,0 +1,59 @@
+import pytest
+
+import llm
+import llm_scheduler
+import model_routing
+
+
+def test_overrides_are_applied_and_normalized():
+    routes = model_routing.load_routes({
+        'dashboard': {'model': 'big', 'fallback': 'small', 'preview_budget': -1, 'progressive': 1},
+        'jobs': {'fallback': ['big', model_routing.DEFAULT_ROUTE['model'], '']},
+    })
+    assert routes['dashboard']['fallback'] == ['small']
+    assert routes['dashboard']['preview_budget'] == 0.0
+    assert routes['dashboard']['progressive'] is True
+    # The main model and empty names are not fallbacks
+    assert routes['jobs']['fallback'] == ['big']
+    assert routes['analyze'] == model_routing.load_routes({})['analyze']
+
+
+@pytest.mark.parametrize('overrides', [
+    [],
+    {'nope': {}},
+    {'jobs': 'big'},
+    {'jobs': {'modle': 'big'}},
+    {'jobs': {'model': ''}},
+])
+def test_invalid_routes_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        model_routing.load_routes(overrides)
+
+
+def test_generate_falls_back_in_order(monkeypatch):
+    monkeypatch.setitem(model_routing.ROUTES, 'jobs', dict(model_routing.ROUTES['jobs'], model='a', fallback=['b', 'c']))
+    calls = []
+
+    def generate(prompt, file_path=None, model=None, deadline=None):
+        calls.append(model)
+        if model != 'c':
+            raise RuntimeError('model error')
+        return 'ok'
+
+    monkeypatch.setattr(llm, 'generate', generate)
+    assert model_routing.generate('jobs', 'prompt') == 'ok'
+    assert calls == ['a', 'b', 'c']
+
+
+def test_scheduler_errors_are_not_retried(monkeypatch):
+    monkeypatch.setitem(model_routing.ROUTES, 'jobs', dict(model_routing.ROUTES['jobs'], model='a', fallback=['b']))
+    calls = []
+
+    def generate(prompt, file_path=None, model=None, deadline=None):
+        calls.append(model)
+        raise llm_scheduler.QuotaExceeded('quota')
+
+    monkeypatch.setattr(llm, 'generate', generate)
+    with pytest.raises(llm_scheduler.QuotaExceeded):
+        model_routing.generate('jobs', 'prompt')
+    assert calls == ['a']
@@ -0,0 +1,44 @@
+import near_duplicates
+
+RESUME = """Jane Doe, senior software engineer with eight years of experience
+building web applications in Python, Flask and React. Led a team of five
+engineers to migrate a monolith to services on Kubernetes, cutting deploy
+time from hours to minutes. Skills: Python, SQL, Docker, AWS, TypeScript."""
+
+
+def test_empty_or_short_text_is_not_signed():
+    """Unreadable resumes must not all share one signature"""
+    assert near_duplicates.signature('') is None
+    assert near_duplicates.signature('   ') is None
+    assert near_duplicates.signature(None) is None
+    assert near_duplicates.signature('Jane Doe resume') is None
+
+
+def test_identical_text_matches():
+    first = near_duplicates.signature(RESUME)
+    second = near_duplicates.signature(RESUME.upper())
+    assert near_duplicates.similarity(first, second) == 1.0
+    assert near_duplicates.band_keys(first) == near_duplicates.band_keys(second)
+
+
+def test_small_edit_is_near_duplicate():
+    edited = RESUME.replace('eight years', 'nine years')
+    score = near_duplicates.similarity(near_duplicates.signature(RESUME), near_duplicates.signature(edited))
+    assert score >= 0.7
+    assert set(near_duplicates.band_keys(near_duplicates.signature(RESUME))) & set(
+        near_duplicates.band_keys(near_duplicates.signature(edited)))
+
+
+def test_different_text_is_not_near_duplicate():
+    other = """John Smith, registered nurse with a decade in intensive care units,
+    trained new staff on ventilator protocols and patient triage, certified in
+    advanced cardiac life support and pediatric care, fluent in Spanish."""
+    score = near_duplicates.similarity(near_duplicates.signature(RESUME), near_duplicates.signature(other))
+    assert score < near_duplicates.NEAR_DUPLICATE_THRESHOLD
+
+
+def test_signature_bytes_round_trip():
+    sig = near_duplicates.signature(RESUME)
+    restored = near_duplicates.signature_from_bytes(near_duplicates.signature_bytes(sig))
+    assert (restored == sig).all()
+    assert len(sig) == near_duplicates.MINHASH_PERMUTATIONS
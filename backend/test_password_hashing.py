@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+import password_hashing
+
+
+def test_hash_and_verify():
+    password_hash = password_hashing.hash_password('password123')
+    assert password_hashing.verify_password(password_hash, 'password123')
+    assert not password_hashing.verify_password(password_hash, 'wrong')
+    assert not password_hashing.needs_rehash(password_hash)
+    assert password_hashing.needs_rehash('pbkdf2:sha256:1000$salt$hash')
+
+
+def test_timed_out_hashes_free_their_slots(monkeypatch):
+    """A hash the caller gave up on keeps its slot until it is done or
+    cancelled, and queued ones are cancelled"""
+    if password_hashing.HASH_POOL_WORKERS <= 0:
+        pytest.skip('hashing runs inline')
+    capacity = max(1, password_hashing.HASH_POOL_WORKERS) + 4
+    monkeypatch.setattr(password_hashing, '_slots', threading.BoundedSemaphore(capacity))
+    monkeypatch.setattr(password_hashing, 'HASH_TIMEOUT', 0.2)
+
+    errors = []
+
+    def slow():
+        try:
+            password_hashing._run(time.sleep, 1)
+        except password_hashing.HashPoolBusy as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=slow) for _ in range(capacity)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == capacity
+
+    # Queued sleeps were cancelled, the running ones still hold their slots
+    assert 0 < password_hashing._in_flight < capacity
+
+    # Once they finish every slot is free again
+    deadline = time.time() + 10
+    while password_hashing._in_flight and time.time() < deadline:
+        time.sleep(0.05)
+    assert password_hashing._in_flight == 0
+    monkeypatch.setattr(password_hashing, 'HASH_TIMEOUT', 10)
+    assert password_hashing._run(time.sleep, 0) is None
@@ -0,0 +1,72 @@
+from resume_index import ResumeIndex, rank
+from skills import canonical_skill
+from text_features import term_counts
+
+RESUMES = {
+    1: (10, 100.0, "Python developer, Flask and PostgreSQL APIs, Docker deployments"),
+    2: (11, 200.0, "Frontend engineer building React.js apps in TypeScript"),
+    3: (12, 300.0, "Nurse with intensive care experience"),
+    4: (10, 400.0, "Senior Python engineer, Django, Docker, Kubernetes on AWS"),
+}
+
+
+def build_index():
+    index = ResumeIndex()
+    for row_id, (resume_id, (user_id, uploaded, text)) in enumerate(RESUMES.items(), 1):
+        index.add(resume_id, user_id, uploaded, term_counts(text), row_id=row_id)
+    return index
+
+
+def test_rank_orders_by_relevance():
+    index = build_index()
+    page, total = rank(index, term_counts("Python engineer with Docker"), limit=10)
+    assert [resume_id for resume_id, _ in page][:2] in ([4, 1], [1, 4])
+    assert 3 not in [resume_id for resume_id, _ in page]
+    assert total == len(page)
+
+
+def test_rank_pages_with_cursor():
+    index = build_index()
+    query = term_counts("Python Docker React engineer")
+    first, total = rank(index, query, limit=1)
+    second, _ = rank(index, query, limit=10, after=(first[0][1], first[0][0]))
+    assert first[0] not in second
+    assert len(first) + len(second) == total
+
+
+def test_filters():
+    index = build_index()
+    # User 10's newest resume only
+    latest = index.filter_mask(latest_only=True)
+    assert not latest[0] and latest[3]
+    # Skills are indexed by canonical name
+    mask = index.filter_mask(required_terms=[f"skill:{canonical_skill('ReactJS')}"])
+    assert mask.tolist() == [False, True, False, False]
+    assert index.filter_mask(uploaded_after=250.0).tolist() == [False, False, True, True]
+
+
+def test_resumes_added_after_a_search_are_found():
+    index = build_index()
+    rank(index, term_counts("python"))
+    index.add(5, 13, 500.0, term_counts("Rust systems programmer"), row_id=6)
+    page, _ = rank(index, term_counts("rust"))
+    assert [resume_id for resume_id, _ in page] == [5]
+
+
+def test_skipped_rows_are_remembered_until_seen_or_expired():
+    index = build_index()
+    index.skip_rows(range(5, 6), now=1000.0)
+    assert index.skipped_rows(since=900.0) == [5]
+    index.add(6, 14, 600.0, term_counts("Go developer"), row_id=5)
+    assert index.skipped_rows(since=900.0) == []
+
+    index.skip_rows([7], now=1000.0)
+    assert index.skipped_rows(since=1001.0) == []
+
+
+def test_canonical_skill():
+    assert canonical_skill('ReactJS') == 'react'
+    assert canonical_skill(' React.js ') == 'react'
+    assert canonical_skill('Golang') == 'go'
+    assert canonical_skill('python') == 'python'
+    assert canonical_skill('Underwater Basket Weaving') == 'underwater basket weaving'
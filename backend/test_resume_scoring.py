@@ -0,0 +1,107 @@
+import resume_scoring
+from resume_scoring import ResumeDocument
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 555 123 4567 | linkedin.com/in/janedoe
+
+Summary
+Backend engineer focused on reliable APIs and data pipelines.
+
+Experience
+Senior Software Engineer, Acme Corp
+• Built a Python and Flask billing API serving two million requests a day
+• Reduced PostgreSQL query latency by 40% with new indexes and caching
+• Led a team of four engineers through a migration to Kubernetes
+
+Projects
+• Designed an open source Docker image scanner used by 300 teams
+
+Education
+• B.Sc. Computer Science, State University
+
+Skills
+• Python, SQL, Docker, AWS, Kubernetes, Flask
+• communication and leadership
+
+Interests
+• hiking, chess and photography
+"""
+
+
+def test_bullets_come_from_experience_and_projects_only():
+    doc = ResumeDocument(RESUME)
+    assert doc.bullets == [
+        'Built a Python and Flask billing API serving two million requests a day',
+        'Reduced PostgreSQL query latency by 40% with new indexes and caching',
+        'Led a team of four engineers through a migration to Kubernetes',
+        'Designed an open source Docker image scanner used by 300 teams',
+    ]
+    score, findings, _, issues = resume_scoring.check_action_verbs(doc)
+    assert score == 100 and issues == 0
+    assert findings[0] == '4 of 4 bullets start with an action verb.'
+    # The lowercase skills and interests lines are not bullets to proofread
+    _, _, _, grammar_issues = resume_scoring.check_grammar(doc)
+    assert grammar_issues == 0
+
+
+def test_sentence_lines_are_used_without_bullet_glyphs():
+    doc = ResumeDocument(RESUME.replace('• ', ''))
+    assert 'Built a Python and Flask billing API serving two million requests a day' in doc.bullets
+    assert 'hiking, chess and photography' not in doc.bullets
+
+
+def test_no_experience_bullets():
+    doc = ResumeDocument("Skills\n• Python\n• SQL\n")
+    assert doc.bullets == []
+    score, findings, _, issues = resume_scoring.check_action_verbs(doc)
+    assert (score, issues) == (40, 1)
+    assert findings == ['No bullet points were found in experience or projects.']
+
+
+def test_ats_flags_missing_contact_details_and_headings():
+    complete, findings, _ = resume_scoring.check_ats(ResumeDocument(RESUME))
+    assert findings == [] and complete == 100
+
+    text = RESUME.replace('jane.doe@example.com', '').replace('+1 555 123 4567', '').replace('Education\n', '')
+    score, findings, suggestions = resume_scoring.check_ats(ResumeDocument(text))
+    assert 'No email address was found.' in findings
+    assert 'No phone number was found.' in findings
+    assert 'No standard "Education" heading was found.' in findings
+    assert score == 100 - 10 - 8 - 10
+    assert any('Education' in suggestion for suggestion in suggestions)
+
+
+def test_space_flags_short_and_crowded_text():
+    score, findings, _, issues = resume_scoring.check_space(ResumeDocument(RESUME))
+    assert 'The resume is short on content.' in findings
+    assert score == 75 and issues == 1
+
+    # Two pages of 900 words each
+    page = '\n'.join(' '.join(['word'] * 20) for _ in range(45))
+    score, findings, _, issues = resume_scoring.check_space(ResumeDocument(page + '\f' + page))
+    assert 'Pages look crowded.' in findings
+    assert score == 85 and issues == 1
+
+
+def test_grammar_checks():
+    text = RESUME.replace(
+        '• Led a team',
+        '• led the the managment of my team',
+    )
+    doc = ResumeDocument(text)
+    score, findings, _, issues = resume_scoring.check_grammar(doc)
+    assert 'Misspelled: managment (management).' in findings
+    assert '1 repeated word(s), e.g. "the the".' in findings
+    assert '1 bullet(s) use first-person pronouns.' in findings
+    assert '1 bullet(s) start with a lowercase letter.' in findings
+    assert issues == 4 and score == 84
+
+
+def test_scores_are_deterministic():
+    assert resume_scoring.analyze(RESUME) == resume_scoring.analyze(RESUME)
+    results = resume_scoring.analyze(RESUME)
+    assert set(results) == set(resume_scoring.LOCAL_CATEGORIES)
+    analysis = resume_scoring.build_analysis(results)
+    assert [category['id'] for category in analysis['scoreCategories']] == [
+        category for category in resume_scoring.CATEGORY_META if category in results
+    ]
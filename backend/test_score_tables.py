@@ -0,0 +1,59 @@
+import pytest
+
+import score_tables
+
+
+@pytest.mark.parametrize('value, expected', [
+    (85, 85.0),
+    ('72%', 72.0),
+    ('Score: 64.5/100', 64.5),
+    (140, 100.0),
+    (-5, 0.0),
+    (True, None),
+    ('n/a', None),
+    (float('nan'), None),
+    (None, None),
+])
+def test_parse_score(value, expected):
+    assert score_tables.parse_score(value) == expected
+
+
+def test_scores_are_pulled_from_results():
+    analysis = {'scoreCategories': [
+        {'id': 'ats', 'score': '80%', 'issues': '2'},
+        {'id': 'format', 'score': 'unknown'},
+        {'score': 50},
+    ]}
+    assert score_tables.analysis_scores(analysis) == [('ats', 80.0, 2)]
+
+    resume_data = {
+        'skillsAnalysis': {'jobMatchPercentage': 70, 'technical': [{'level': 80}, {'level': '60%'}]},
+        'marketAnalysis': {'demandScore': '90'},
+    }
+    assert sorted(score_tables.dashboard_scores(resume_data)) == [
+        ('demand', 90.0, None), ('job-match', 70.0, None), ('technical-skills', 70.0, None),
+    ]
+    assert score_tables.interview_scores({'metrics': {'overallScore': 75, 'confidence': 'high'}}) == [
+        ('interview-overall', 75.0, None),
+    ]
+    assert score_tables.dashboard_scores('not a dict') == []
+    assert score_tables.interview_scores(None) == []
+
+
+def test_aggregate():
+    day = 86400
+    result = score_tables.aggregate(
+        ['ats', 'ats', 'ats', 'format'],
+        [10, 20, 60, 100],
+        [0, day, 8 * day, 0],
+        bucket='week',
+    )
+    ats = result['ats']
+    assert ats['count'] == 3
+    assert ats['mean'] == 30.0
+    assert ats['min'] == 10.0 and ats['max'] == 60.0
+    assert ats['percentiles']['p50'] == 20.0
+    assert [bin['count'] for bin in ats['histogram']] == [0, 1, 1, 0, 0, 0, 1, 0, 0, 0]
+    assert [(week['count'], week['mean'], week['median']) for week in ats['trend']] == [(2, 15.0, 15.0), (1, 60.0, 60.0)]
+    # 100 falls in the last bin
+    assert result['format']['histogram'][-1]['count'] == 1
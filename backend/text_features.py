@@ -0,0 +1,78 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from skills import extract_skills
+
+# Sparse term features shared by the job catalog and resume search.
+# A document is a bag of lowercase word tokens plus one "skill:<name>"
+# feature per canonical skill, so "ReactJS" and "React.js" still match.
+
+# Extra weight for canonical skill mentions over plain words
+SKILL_WEIGHT = 3
+
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or our
+that the their this to was we were will with you your years year experience
+work working team role using use used including etc
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens, without stop words and single characters"""
+    return [
+        token for token in _TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def term_counts(text):
+    """Bag of tokens and skill features for a document"""
+    counts = Counter(tokenize(text))
+    for skill, count in extract_skills(text).items():
+        counts[f"skill:{skill}"] += count * SKILL_WEIGHT
+    return counts
+
+
+def tf_weight(count):
+    # Sublinear term frequency, so one repeated word can't dominate
+    return 1.0 + math.log(count)
+
+
+def smooth_idf(document_count, document_frequency):
+    """Smoothed inverse document frequency, works on NumPy arrays too"""
+    return np.log((1.0 + document_count) / (1.0 + document_frequency)) + 1.0
+
+
+def query_vector(counts, vocabulary, idf):
+    """Unit-length TF-IDF weights for the query terms found in vocabulary.
+
+    Returns (term_ids, weights) as arrays; terms the index has never seen
+    are left out.
+    """
+    term_ids = []
+    weights = []
+    for term, count in counts.items():
+        term_id = vocabulary.get(term)
+        if term_id is not None:
+            term_ids.append(term_id)
+            weights.append(tf_weight(count) * idf[term_id])
+    term_ids = np.array(term_ids, dtype=np.int64)
+    weights = np.array(weights, dtype=np.float32)
+    norm = np.linalg.norm(weights)
+    if norm > 0:
+        weights /= norm
+    return term_ids, weights
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first, skipping zeros"""
+    k = min(k, int(np.count_nonzero(scores)))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
@@ -0,0 +1,179 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import metrics
+
+# Per-request phase timing. Code marks its phases with span('name'); the
+# time spent in each is summed over the request and sent back in a
+# Server-Timing header, and requests slower than SLOW_REQUEST_SECONDS are
+# logged as one JSON line with their phases. Spans outside a request (e.g.
+# in background threads) cost a context variable lookup and are not kept.
+
+# Send the Server-Timing header
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+# Log requests slower than this, in seconds (0 = off)
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', 5))
+# Sample the stacks of requests running longer than REQUEST_SLO_SECONDS,
+# and log the most frequent ones with the slow request
+TRACE_PROFILE = os.environ.get('TRACE_PROFILE', '0') == '1'
+REQUEST_SLO_SECONDS = float(os.environ.get('REQUEST_SLO_SECONDS', 10))
+TRACE_SAMPLE_INTERVAL = float(os.environ.get('TRACE_SAMPLE_INTERVAL', 0.05))
+# Stacks logged per profiled request
+TRACE_PROFILE_STACKS = 5
+
+_trace = contextvars.ContextVar('trace', default=None)
+
+
+class Trace:
+    __slots__ = ('method', 'path', 'start', 'thread_id', 'spans', 'samples', 'finished')
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.start = time.perf_counter()
+        self.thread_id = threading.get_ident()
+        # name -> [seconds, count]
+        self.spans = {}
+        self.samples = Counter()
+        self.finished = False
+
+    def add(self, name, seconds):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+# Traces of the requests in flight, for the stack sampler
+_active = {}
+_active_lock = threading.Lock()
+_sampler = None
+
+
+def start(method, path):
+    """Begin tracing the current request"""
+    trace = Trace(method, path)
+    _trace.set(trace)
+    if TRACE_PROFILE:
+        with _active_lock:
+            _active[trace.thread_id] = trace
+        _start_sampler()
+    return trace
+
+
+def current():
+    return _trace.get()
+
+
+def add(name, seconds):
+    """Count time measured elsewhere towards a phase of the current request"""
+    trace = _trace.get()
+    if trace is not None and not trace.finished:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def span(name):
+    """Time a phase of the current request"""
+    trace = _trace.get()
+    if trace is None or trace.finished:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start_time)
+
+
+def server_timing(trace):
+    """Server-Timing header value: each phase, then the total"""
+    entries = []
+    for name, (seconds, count) in trace.spans.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if count > 1:
+            entry += f';desc="{count}x"'
+        entries.append(entry)
+    entries.append(f"total;dur={trace.elapsed() * 1000:.1f}")
+    return ', '.join(entries)
+
+
+def finish(trace, status, endpoint=None, user=None):
+    """End a request's trace; logs it if it was slow. Returns its duration."""
+    if trace.finished:
+        return trace.elapsed()
+    trace.finished = True
+    duration = trace.elapsed()
+    if TRACE_PROFILE:
+        with _active_lock:
+            _active.pop(trace.thread_id, None)
+
+    metrics.observe('request_seconds', duration)
+    if endpoint:
+        metrics.observe(f"request_{endpoint}_seconds", duration)
+
+    if SLOW_REQUEST_SECONDS and duration >= SLOW_REQUEST_SECONDS:
+        metrics.incr('slow_requests')
+        entry = {
+            'event': 'slow_request',
+            'method': trace.method,
+            'path': trace.path,
+            'endpoint': endpoint,
+            'status': status,
+            'user': user,
+            'seconds': round(duration, 3),
+            'spans': {name: {'seconds': round(seconds, 3), 'count': count}
+                      for name, (seconds, count) in trace.spans.items()},
+        }
+        if trace.samples:
+            entry['stacks'] = [
+                {'samples': count, 'stack': stack}
+                for stack, count in trace.samples.most_common(TRACE_PROFILE_STACKS)
+            ]
+        print(json.dumps(entry), flush=True)
+    return duration
+
+
+def _stack(frame):
+    """A frame's call stack, outermost first, as 'file:function:line;...'"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def _sample():
+    while True:
+        time.sleep(TRACE_SAMPLE_INTERVAL)
+        with _active_lock:
+            overdue = [trace for trace in _active.values() if trace.elapsed() >= REQUEST_SLO_SECONDS]
+        if not overdue:
+            continue
+        frames = sys._current_frames()
+        for trace in overdue:
+            frame = frames.get(trace.thread_id)
+            if frame is not None and not trace.finished:
+                trace.samples[_stack(frame)] += 1
+
+
+def _start_sampler():
+    global _sampler
+    if _sampler is not None:
+        return
+    with _active_lock:
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample, name='trace-sampler', daemon=True)
+            _sampler.start()
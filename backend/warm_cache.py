@@ -0,0 +1,203 @@
+"""Fill the caches for every user's latest resume.
+
+After a prompt change or a cache wipe, every user's first dashboard visit is
+slow. This walks the latest resume of each user and generates what is
+missing or stale: the extracted text, recruiter index terms and near-duplicate
+signature (used by job matching, ranking and the dashboard), the dashboard
+analysis and the interview question pool. Model calls go through the same
+scheduler as the app, in the background lane, but the scheduler's limits
+are per process: this command's calls come on top of the servers' own, so
+--max-calls bounds how many it adds.
+
+Progress is saved after each chunk of users, so an interrupted run picks up
+where it stopped; the checkpoint is removed when a run completes.
+
+    python warm_cache.py [--workers 2] [--max-calls 2] [--only dashboard,interview] [--force] [--batch] [--restart]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cache_files
+import llm
+import llm_scheduler
+from resume_text import get_resume_text
+from app import (
+    app, db, User, ResumeFile, ResumeResponse, RESPONSE_CACHE_FOLDER, QUESTION_POOL_SIZE,
+    DASHBOARD_MODEL, DASHBOARD_CACHE_VERSION, cached_version,
+    index_resume, sign_resume, refill_question_pool,
+    generate_dashboard_analysis, generate_dashboard_from_file, clean_dashboard_analysis, dashboard_file_prompt,
+    plan_dashboard_parts, save_dashboard_analysis,
+)
+
+TASKS = ('text', 'dashboard', 'interview')
+
+
+def latest_resumes(after_user_id, limit):
+    """(user_id, latest resume) for the next users by id"""
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.id > after_user_id)
+                .order_by(User.id).limit(limit).all()]
+    picked = []
+    for user_id in user_ids:
+        resume = ResumeFile.query.filter_by(user_id=user_id).order_by(ResumeFile.upload_date.desc()).first()
+        picked.append((user_id, resume))
+    return picked
+
+
+def file_path_of(resume):
+    return os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)
+
+
+def needs_dashboard(resume, force):
+    if force:
+        return True
+    response = ResumeResponse.query.filter_by(resume_file_id=resume.id).first()
+    if response is None or not os.path.exists(os.path.join(RESPONSE_CACHE_FOLDER, response.response_file)):
+        return True
+    # Made with an older prompt, model or schema
+    return cached_version('dashboard', resume.id) != DASHBOARD_CACHE_VERSION
+
+
+def warm_resume(resume_id, tasks, force, batch):
+    """Generate the missing artifacts of one resume; returns what was done"""
+    llm_scheduler.set_context(None, 'background')
+    with app.app_context():
+        resume = db.session.get(ResumeFile, resume_id)
+        done = []
+        if 'text' in tasks:
+            get_resume_text(file_path_of(resume))
+            index_resume(resume.id)
+            sign_resume(resume.id)
+            done.append('text')
+        if 'dashboard' in tasks and not batch and needs_dashboard(resume, force):
+            generate_dashboard_analysis(resume, reuse_parts=not force)
+            done.append('dashboard')
+        if 'interview' in tasks:
+            refill_question_pool(resume.id)
+            done.append('interview')
+        return done
+
+
+def warm_dashboards_batch(resume_ids, force):
+    """Dashboard analyses for many resumes as one batch prediction job"""
+    llm_scheduler.set_context(None, 'background')
+    model = DASHBOARD_MODEL
+    pending = []
+    for resume_id in resume_ids:
+        resume = db.session.get(ResumeFile, resume_id)
+        if not needs_dashboard(resume, force):
+            continue
+        plan = plan_dashboard_parts(resume, file_path_of(resume), reuse_parts=not force)
+        if plan is None:
+            pending.append((resume, None, (dashboard_file_prompt(), file_path_of(resume))))
+        elif plan[0] is None:
+            # Every part is cached already
+            save_dashboard_analysis(resume, plan[1](None))
+        else:
+            pending.append((resume, plan[1], (plan[0], None)))
+    if not pending:
+        return 0
+
+    texts = llm.generate_batch([request for _, _, request in pending], model=model)
+    for (resume, finish, _), text in zip(pending, texts):
+        try:
+            if text is None:
+                # Failed in the batch: retry on its own
+                generate_dashboard_analysis(resume, reuse_parts=not force)
+                continue
+            if finish is not None:
+                try:
+                    text = finish(text)
+                except ValueError:
+                    text = generate_dashboard_from_file(file_path_of(resume))
+            else:
+                text = clean_dashboard_analysis(text)
+            save_dashboard_analysis(resume, text)
+        except Exception as e:
+            db.session.rollback()
+            print(f"  resume {resume.id}: dashboard failed: {str(e)}")
+    return len(pending)
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {'last_user_id': 0, 'resumes': 0, 'failed': 0}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    # A crash never leaves a half-written checkpoint behind
+    cache_files.write_atomic(path, json.dumps(checkpoint))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2, help='resumes warmed at the same time')
+    parser.add_argument('--max-calls', type=int, default=2,
+                        help='model calls running at once, on top of those of the servers')
+    parser.add_argument('--only', default=','.join(TASKS), help=f"comma-separated subset of {', '.join(TASKS)}")
+    parser.add_argument('--force', action='store_true', help='regenerate dashboard analyses and parts that are already cached')
+    parser.add_argument('--batch', action='store_true', help="generate dashboard analyses with the provider's batch mode")
+    parser.add_argument('--chunk', type=int, default=50, help='users per checkpoint (and per batch job)')
+    parser.add_argument('--checkpoint', default=None, help='progress file (default: instance/warm_cache.json)')
+    parser.add_argument('--restart', action='store_true', help='ignore the saved progress and start over')
+    args = parser.parse_args()
+
+    tasks = {task.strip() for task in args.only.split(',') if task.strip()}
+    unknown = tasks - set(TASKS)
+    if unknown:
+        parser.error(f"unknown tasks: {', '.join(sorted(unknown))}")
+    if 'interview' in tasks and not QUESTION_POOL_SIZE:
+        print('QUESTION_POOL_SIZE is 0, skipping interview question pools')
+        tasks.discard('interview')
+
+    # This process has its own scheduler; keep what it adds to the
+    # provider's load small
+    llm_scheduler.scheduler.slots = max(1, args.max_calls)
+    llm_scheduler.scheduler.background_slots = max(1, args.max_calls)
+
+    checkpoint_path = args.checkpoint or os.path.join(app.instance_path, 'warm_cache.json')
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    with app.app_context():
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint['last_user_id']:
+            print(f"Resuming after user {checkpoint['last_user_id']}")
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            while True:
+                users = latest_resumes(checkpoint['last_user_id'], args.chunk)
+                if not users:
+                    break
+                resume_ids = [resume.id for _, resume in users
+                              if resume is not None and os.path.exists(file_path_of(resume))]
+
+                futures = {resume_id: executor.submit(warm_resume, resume_id, tasks, args.force, args.batch)
+                           for resume_id in resume_ids}
+                for resume_id, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        checkpoint['failed'] += 1
+                        print(f"  resume {resume_id}: {str(e)}")
+                if args.batch and 'dashboard' in tasks and resume_ids:
+                    warm_dashboards_batch(resume_ids, args.force)
+
+                checkpoint['resumes'] += len(resume_ids)
+                checkpoint['last_user_id'] = users[-1][0]
+                save_checkpoint(checkpoint_path, checkpoint)
+                print(f"Up to user {checkpoint['last_user_id']}: {checkpoint['resumes']} resumes, "
+                      f"{checkpoint['failed']} failed, {time.time() - start:.0f}s")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"Done: {checkpoint['resumes']} resumes warmed, {checkpoint['failed']} failed")
+
+
+if __name__ == '__main__':
+    main()
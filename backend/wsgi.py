@@ -0,0 +1,13 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+from app import app
+
+
+def create_app():
+    """Return the configured Flask app (gunicorn: "wsgi:create_app()")"""
+    return app
+
+
+application = create_app()
@@ -7,6 +7,12 @@ const MockInterviews = () => {
   const aiVideoRef = useRef(null);
   const timeoutRef = useRef(null); // Reference to track timeouts
   const processedTexts = useRef(new Set()); // More efficient Set for tracking processed texts
+  // Identifies this interview so answered turns can be scored on the backend as they happen
+  const sessionIdRef = useRef(
+    window.crypto?.randomUUID ? window.crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`
+  );
+  const turnIndexRef = useRef(0);
+  const conversationLogRef = useRef([]);
   const [stream, setStream] = useState(null);
   const [isMicOn, setIsMicOn] = useState(true);
   const [isCameraOn, setIsCameraOn] = useState(true);
@@ -71,6 +77,45 @@ const MockInterviews = () => {
     }
   }, []);
   
+  // Keep a ref to the latest log for callbacks created before it changed
+  useEffect(() => {
+    conversationLogRef.current = conversationLog;
+  }, [conversationLog]);
+  
+  // Send an answered turn to the backend so it is scored in the background
+  // while the interview continues
+  const submitTurn = (answerText) => {
+    const cookies = document.cookie.split(';');
+    const emailCookie = cookies.find(cookie => cookie.trim().startsWith('userEmail='));
+    
+    if (!emailCookie) {
+      return;
+    }
+    
+    const email = emailCookie.split('=')[1];
+    const lastQuestion = [...conversationLogRef.current].reverse().find(entry => entry.speaker === 'ai');
+    const turnIndex = turnIndexRef.current;
+    turnIndexRef.current += 1;
+    
+    fetch(`${import.meta.env.VITE_BACKEND_URL}/interview-turn`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        email,
+        sessionId: sessionIdRef.current,
+        turnIndex,
+        question: lastQuestion ? lastQuestion.text : '',
+        answer: answerText
+      }),
+      credentials: 'include'
+    }).catch(error => {
+      // Not fatal, the final analysis scores any missing turns
+      console.error('Error submitting interview turn:', error);
+    });
+  };
+  
   // Function to add entry to conversation log
   const addToConversationLog = (speaker, text, type) => {
     setConversationLog(prev => [...prev, {
@@ -310,6 +355,9 @@ const MockInterviews = () => {
               type: 'answer' 
             }]);
             
+            // Score this answer in the background
+            submitTurn(transcriptText);
+            
             // Disable user response
             setAllowUserResponse(false);
             
@@ -896,7 +944,9 @@ const MockInterviews = () => {
         
         const email = emailCookie.split('=')[1];
         
-        // Call the interview analysis API with the full conversation log
+        // Call the interview analysis API. With a sessionId the backend
+        // aggregates the turns already scored during the interview and only
+        // falls back to analyzing the full conversation log if it has none.
         const response = await fetch(`${import.meta.env.VITE_BACKEND_URL}/interview-analyze`, {
           method: 'POST',
           headers: {
@@ -904,6 +954,7 @@ const MockInterviews = () => {
           },
           body: JSON.stringify({ 
             email,
+            sessionId: sessionIdRef.current,
             conversationLog 
           }),
           credentials: 'include'
@@ -1046,6 +1097,9 @@ const MockInterviews = () => {
         type: 'answer' 
       }]);
       
+      // Score this answer in the background
+      submitTurn(currentTranscriptText);
+      
       // Stop listening
       if (recognition) {
         recognition.stop();
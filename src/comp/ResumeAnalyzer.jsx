@@ -5,6 +5,47 @@ import {
 } from 'recharts';
 import { useNavigate } from 'react-router-dom';
 
+// Poll a background job started by /bootstrap until it is done, for at
+// most a minute
+const waitForJob = async (job, email) => {
+  for (let attempt = 0; attempt < 30; attempt++) {
+    await new Promise(resolve => setTimeout(resolve, 2000));
+    const statusResponse = await fetch(`${import.meta.env.VITE_BACKEND_URL}/jobs/status`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ email, jobs: [job] }),
+      credentials: 'include'
+    });
+    if (!statusResponse.ok) {
+      return;
+    }
+    const status = (await statusResponse.json()).jobs[job];
+    if (!status || status.status !== 'pending') {
+      return;
+    }
+  }
+};
+
+const fetchDashboard = (email) => fetch(`${import.meta.env.VITE_BACKEND_URL}/dashboard/v1`, {
+  method: 'POST',
+  headers: {
+    'Content-Type': 'application/json',
+  },
+  body: JSON.stringify({ email }),
+  credentials: 'include'
+});
+
+// The analysis might be a JSON string or might have backtick delimiters
+const parseAnalysis = (analysisText) => {
+  if (analysisText.startsWith('```json') && analysisText.endsWith('```')) {
+    // Remove the backticks and json tag
+    analysisText = analysisText.replace(/^```json\s*/, '').replace(/\s*```$/, '');
+  }
+  return JSON.parse(analysisText);
+};
+
 const ResumeAnalyzer = () => {
   const [activeTab, setActiveTab] = useState('overview');
   const [userData, setUserData] = useState(null);
@@ -29,8 +70,8 @@ const ResumeAnalyzer = () => {
         
         const email = emailCookie.split('=')[1];
         
-        // Fetch user data
-        const userResponse = await fetch(`${import.meta.env.VITE_BACKEND_URL}/me`, {
+        // User, resumes and the cached dashboard analysis in one request
+        const bootstrapResponse = await fetch(`${import.meta.env.VITE_BACKEND_URL}/bootstrap`, {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
@@ -39,53 +80,75 @@ const ResumeAnalyzer = () => {
           credentials: 'include'
         });
 
-        if (!userResponse.ok) {
+        if (!bootstrapResponse.ok) {
           // If not authenticated or not found, redirect to login
-          if (userResponse.status === 401 || userResponse.status === 404) {
+          if (bootstrapResponse.status === 401 || bootstrapResponse.status === 404) {
             navigate('/login');
             return;
           }
           throw new Error('Failed to fetch user data');
         }
 
-        const userData = await userResponse.json();
-        setUserData(userData.user);
+        const bootstrap = await bootstrapResponse.json();
+        setUserData(bootstrap.user);
         
-        // Now fetch resume analysis data from the dashboard API
-        const dashboardResponse = await fetch(`${import.meta.env.VITE_BACKEND_URL}/dashboard/v1`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({ email }),
-          credentials: 'include'
-        });
+        if (bootstrap.dashboard.status === 'no_resume') {
+          setError('No resume found. Please upload your resume first.');
+          setLoading(false);
+          return;
+        }
         
-        if (!dashboardResponse.ok) {
-          if (dashboardResponse.status === 404) {
-            setError('No resume found. Please upload your resume first.');
-            setLoading(false);
-            return;
+        let dashboardData = bootstrap.dashboard;
+        if (dashboardData.status !== 'ready') {
+          // Being generated: wait for the job, then the dashboard API
+          // returns it from the cache
+          if (dashboardData.status === 'pending') {
+            await waitForJob(dashboardData.job, email);
+          }
+          
+          const dashboardResponse = await fetchDashboard(email);
+          
+          if (!dashboardResponse.ok) {
+            if (dashboardResponse.status === 404) {
+              setError('No resume found. Please upload your resume first.');
+              setLoading(false);
+              return;
+            }
+            throw new Error('Failed to fetch dashboard data');
           }
-          throw new Error('Failed to fetch dashboard data');
+          
+          dashboardData = await dashboardResponse.json();
         }
-        
-        const dashboardData = await dashboardResponse.json();
         console.log('Dashboard API Response:', dashboardData);
         
-        // Parse the analysis JSON
-        try {
-          // The analysis might be a JSON string or might have backtick delimiters
-          let analysisText = dashboardData.analysis;
-          
-          // Check if the analysis is wrapped in backticks
-          if (analysisText.startsWith('```json') && analysisText.endsWith('```')) {
-            // Remove the backticks and json tag
-            analysisText = analysisText.replace(/^```json\s*/, '').replace(/\s*```$/, '');
+        // Progressive mode: a quick preview (or nothing yet) while the full
+        // analysis is generated. Show the preview, then swap in the full one.
+        if (dashboardData.preview && dashboardData.job) {
+          if (dashboardData.analysis) {
+            try {
+              setResumeData(parseAnalysis(dashboardData.analysis));
+              setLoading(false);
+            } catch (parseError) {
+              console.error('Error parsing preview analysis:', parseError);
+            }
           }
+          await waitForJob(dashboardData.job, email);
           
-          // Parse the JSON
-          const parsedAnalysis = JSON.parse(analysisText);
+          const refinedResponse = await fetchDashboard(email);
+          if (refinedResponse.ok) {
+            const refined = await refinedResponse.json();
+            if (refined.analysis) {
+              dashboardData = refined;
+            }
+          }
+          if (!dashboardData.analysis) {
+            throw new Error('Dashboard analysis is taking longer than expected. Please try again later.');
+          }
+        }
+        
+        // Parse the analysis JSON
+        try {
+          const parsedAnalysis = parseAnalysis(dashboardData.analysis);
           console.log('Parsed resume data:', parsedAnalysis);
           
           setResumeData(parsedAnalysis);